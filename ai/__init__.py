@@ -1,4 +1,17 @@
-from .ai_logger import get_logger
-from .db import DB
+from typing import Any
 
 __all__ = ["get_logger", "DB"]
+
+
+def __getattr__(name: str) -> Any:
+    # Lazy: importing ai.shared.* (also used by the backend API) must not
+    # configure logging or open DB settings as a side effect
+    if name == "get_logger":
+        from .ai_logger import get_logger
+
+        return get_logger
+    if name == "DB":
+        from .db import DB
+
+        return DB
+    raise AttributeError(f"module 'ai' has no attribute {name!r}")
@@ -23,6 +23,18 @@ class Settings:
     perplexity_model: str
     cursor_api_key: str | None
     cursor_api_url: str
+    ai_cache_ttl_s: float
+    ai_cache_max_bytes: int
+    ai_cache_similarity: float
+    ai_hedge_after_s: float
+    ai_workers: int
+    ai_claim_batch: int
+    ai_job_limits: Dict[str, int]
+    ai_schedules: Dict[str, str]
+    telemetry_batch_size: int
+    telemetry_flush_s: float
+    telemetry_spool_dir: Path
+    telemetry_spool_max_bytes: int
 
 
 def _resolve_env_paths(repo_root: Path) -> list[Path]:
@@ -75,6 +87,29 @@ def load_env(repo_root: Path) -> Dict[str, str]:
     return merged
 
 
+def _parse_limits(raw: str) -> Dict[str, int]:
+    """Parses AI_JOB_LIMITS, e.g. "ai_generate=4,health_scan=1"."""
+    limits: Dict[str, int] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+def _parse_schedules(raw: str) -> Dict[str, str]:
+    """
+    Parses AI_SCHEDULES, e.g. "health_scan=*/2 * * * *;ai_backup=off":
+    per-schedule cron overrides ("off" disables), separated by ";".
+    """
+    schedules: Dict[str, str] = {}
+    for item in raw.split(";"):
+        name, _, cron = item.partition("=")
+        if name.strip() and cron.strip():
+            schedules[name.strip()] = cron.strip()
+    return schedules
+
+
 def build_settings(repo_root: Path) -> Settings:
     load_env(repo_root)
 
@@ -97,4 +132,16 @@ def build_settings(repo_root: Path) -> Settings:
         perplexity_model=os.getenv("PERPLEXITY_MODEL", "sonar"),
         cursor_api_key=os.getenv("CURSOR_API_KEY"),
         cursor_api_url=os.getenv("CURSOR_API_URL", "https://api.cursor.sh/v1"),
+        ai_cache_ttl_s=float(os.getenv("AI_CACHE_TTL_S", "3600")),
+        ai_cache_max_bytes=int(os.getenv("AI_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+        ai_cache_similarity=float(os.getenv("AI_CACHE_SIMILARITY", "0.94")),
+        ai_hedge_after_s=float(os.getenv("AI_HEDGE_AFTER_S", "2.0")),
+        ai_workers=int(os.getenv("AI_WORKERS", "4")),
+        ai_claim_batch=int(os.getenv("AI_CLAIM_BATCH", "8")),
+        ai_job_limits=_parse_limits(os.getenv("AI_JOB_LIMITS", "health_scan=1")),
+        ai_schedules=_parse_schedules(os.getenv("AI_SCHEDULES", "")),
+        telemetry_batch_size=int(os.getenv("AI_TELEMETRY_BATCH", "200")),
+        telemetry_flush_s=float(os.getenv("AI_TELEMETRY_FLUSH_S", "1.0")),
+        telemetry_spool_dir=Path(os.getenv("AI_TELEMETRY_SPOOL_DIR", str(log_dir / "spool"))),
+        telemetry_spool_max_bytes=int(os.getenv("AI_TELEMETRY_SPOOL_MAX_BYTES", str(64 * 1024 * 1024))),
     )
@@ -115,6 +115,18 @@ class Database:
             self._pool = None
             logger.info("DB pool closed")
 
+    # --------------------------------------------------
+    async def connect(self) -> Optional[asyncpg.Connection]:
+        """Dedicated connection outside the pool (LISTEN/NOTIFY). Caller closes it."""
+        if not self.enabled:
+            return None
+        try:
+            return await asyncpg.connect(dsn=self._dsn, command_timeout=12)
+        except Exception as exc:
+            self._last_error = str(exc)
+            logger.error("DB connect failed", extra={"error": str(exc)})
+            return None
+
     # --------------------------------------------------
     async def _ensure_pool(self) -> bool:
         if not self._pool:
@@ -190,6 +202,32 @@ class Database:
             logger.error("DB execute failed", extra={"error": str(exc)})
             return False
 
+    # --------------------------------------------------
+    async def executemany(self, query: str, rows: Iterable[Iterable[Any]]) -> bool:
+        """One statement, many parameter rows, one round-trip; all or nothing."""
+        if not await self._ensure_pool():
+            return False
+
+        values = [_normalize_params(row) for row in rows]
+        if not values:
+            return True
+
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.executemany(query, values)
+                self._last_ok_ts = time.time()
+                return True
+
+        except (asyncpg.InterfaceError, asyncpg.PostgresConnectionError) as exc:
+            logger.warning("DB connection dropped", extra={"error": str(exc)})
+            await self.close()
+            await self.init()
+            return await self.executemany(query, values)
+
+        except Exception as exc:
+            logger.error("DB executemany failed", extra={"error": str(exc)})
+            return False
+
     # --------------------------------------------------
     async def health_check(self) -> dict:
         row = await self.fetchrow("SELECT 1 AS ok;")
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 
 from ai.ai_logger import get_logger
-from ai.db import DB
+from ai.telemetry import TELEMETRY
 
 logger = get_logger("gcz-ai.memory")
 
@@ -15,13 +15,8 @@ async def add_memory(
     meta: Optional[Dict[str, Any]] = None,
 ) -> bool:
     logger.info("Recording memory", extra={"category": category, "source": source})
-    return await DB.execute(
-        """
-        INSERT INTO ai_memory (category, message, source, meta)
-        VALUES ($1, $2, $3, $4::jsonb)
-        """,
-        (category, message, source, meta or {}),
-    )
+    TELEMETRY.add("ai_memory", category, message, source, meta or {})
+    return True
 
 
 async def log_health(
@@ -30,13 +25,8 @@ async def log_health(
     details: Optional[Dict[str, Any]] = None,
 ) -> bool:
     logger.info("Recording health", extra={"service": service, "status": status})
-    return await DB.execute(
-        """
-        INSERT INTO service_health (service, status, details)
-        VALUES ($1, $2, $3::jsonb)
-        """,
-        (service, status, details or {}),
-    )
+    TELEMETRY.add("service_health", service, status, details or {})
+    return True
 
 
 async def log_anomaly(
@@ -45,13 +35,8 @@ async def log_anomaly(
     meta: Optional[Dict[str, Any]] = None,
 ) -> bool:
     logger.warning("Recording anomaly", extra={"type": anomaly_type, "anomaly_message": message})
-    return await DB.execute(
-        """
-        INSERT INTO anomalies (type, message, meta)
-        VALUES ($1, $2, $3::jsonb)
-        """,
-        (anomaly_type, message, meta or {}),
-    )
+    TELEMETRY.add("anomalies", anomaly_type, message, meta or {})
+    return True
 
 
 __all__ = ["add_memory", "log_health", "log_anomaly"]
@@ -24,8 +24,11 @@ from ai.config.loader import build_settings
 from ai.db import DB
 from ai.health_engine import run_health_scan
 from ai.memory_store import add_memory, log_anomaly
+from ai.telemetry import TELEMETRY
 from ai.shared.promo_rules import format_promo, load_rules
 from ai.tools.ai_clients import AIClient
+from ai.workflows import WorkflowEngine
+from ai.workflows.schedules import default_schedules
 
 # ======================================================
 # ENV + PATHS
@@ -75,6 +78,7 @@ app = FastAPI(
 # AI CLIENT + RULES
 # ======================================================
 AI_CLIENT: AIClient | None = None
+WORKFLOW_ENGINE: WorkflowEngine | None = None
 PROMO_RULES = load_rules()
 
 
@@ -163,17 +167,39 @@ class PromoFormatRequest(BaseModel):
 @app.on_event("startup")
 async def startup() -> None:
     await DB.init()
-    global AI_CLIENT, PROMO_RULES
+    global AI_CLIENT, PROMO_RULES, WORKFLOW_ENGINE
     settings = build_settings(ROOT)
     AI_CLIENT = AIClient(settings)
     PROMO_RULES = load_rules()
 
+    # Casino names pinned by the semantic cache (any casing)
+    if DB.enabled:
+        rows = await DB.fetch("SELECT name, slug FROM affiliates_master")
+        AI_CLIENT.cache.set_entities(
+            name for row in rows for name in (row.get("name"), row.get("slug")) if name
+        )
+
+    # Job queue + recurring jobs (health scan, syncs, backup) in-process
+    if DB.enabled:
+        WORKFLOW_ENGINE = WorkflowEngine(
+            AI_CLIENT,
+            workers=settings.ai_workers,
+            claim_batch=settings.ai_claim_batch,
+            type_limits=settings.ai_job_limits,
+        )
+        await WORKFLOW_ENGINE.ensure_tables()
+        await WORKFLOW_ENGINE.sync_schedules(default_schedules(settings.environment, settings.ai_schedules))
+        await WORKFLOW_ENGINE.start()
+
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
     global AI_CLIENT
+    if WORKFLOW_ENGINE:
+        await WORKFLOW_ENGINE.stop()
     if AI_CLIENT:
         await AI_CLIENT.close()
+    await TELEMETRY.close()
     await DB.close()
 
 
@@ -211,6 +237,10 @@ async def _build_health() -> Dict[str, Any]:
         "env": ENV,
         "redis": "up" if redis_ok else "down",
         "db": db_status,
+        "ai_cache": AI_CLIENT.cache.snapshot() if AI_CLIENT else None,
+        "ai_providers": AI_CLIENT.router.snapshot() if AI_CLIENT else None,
+        "jobs": WORKFLOW_ENGINE.snapshot() if WORKFLOW_ENGINE else None,
+        "telemetry": TELEMETRY.snapshot(),
         "issues": issues,
     }
 
@@ -341,7 +371,8 @@ async def promo_format(req: PromoFormatRequest, x_gcz_key: str | None = Header(d
 
     if AI_CLIENT and not req.force_fallback:
         prompt = _promo_prompt(payload, rules)
-        response = await AI_CLIENT.generate(prompt)
+        # Exact matches only: a near match would post another promo's text
+        response = await AI_CLIENT.generate(prompt, semantic=False)
         if response.mode == "ai" and response.text:
             message = response.text.strip()
             affiliate_link = payload.get("affiliate_link")
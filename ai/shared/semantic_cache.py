@@ -0,0 +1,286 @@
+"""
+Two-tier response cache for paid AI calls, shared by the backend API
+(backend/services/ai/semantic_cache.py) and AIClient. Standard library
+only, so either process can import it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SPACE = re.compile(r"\s+")
+_NT = re.compile(r"n['’]t\b", re.IGNORECASE)
+
+DEFAULT_THRESHOLD = 0.94
+# Near-neighbour candidates scored per lookup (most shared words first)
+MAX_CANDIDATES = 64
+# Fixed per-entry cost on top of prompt/value/vector bytes
+ENTRY_OVERHEAD = 256
+
+# Words that flip a question's meaning: "is X legit" vs "is X not legit"
+POLARITY_WORDS = frozenset({
+    "not", "no", "never", "nor", "none", "nothing", "without", "cannot",
+    "worst", "least", "fake", "scam", "unsafe", "illegal", "banned",
+})
+
+
+def _words(prompt: str) -> list:
+    return _WORD.findall(_NT.sub(" not", prompt or ""))
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, whitespace and trailing punctuation do not change the answer."""
+    return _SPACE.sub(" ", _NT.sub(" not", prompt or "")).strip().strip(".!?").strip().lower()
+
+
+def prompt_key(namespace: str, prompt: str) -> str:
+    return hashlib.sha1(f"{namespace}\x00{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+def _feature(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def embed(prompt: str) -> Dict[int, float]:
+    """
+    Sparse unit vector of hashed features: words, word bigrams and
+    character trigrams (typo tolerance). Local and free, so lookups never
+    call an embeddings API.
+    """
+    words = _WORD.findall(normalize_prompt(prompt))
+    weights: Dict[int, float] = {}
+
+    def add(token: str, weight: float) -> None:
+        f = _feature(token)
+        weights[f] = weights.get(f, 0.0) + weight
+
+    for i, word in enumerate(words):
+        add(f"w:{word}", 1.0)
+        if i:
+            add(f"b:{words[i - 1]} {word}", 0.7)
+        padded = f" {word} "
+        for j in range(len(padded) - 2):
+            add(f"c:{padded[j:j + 3]}", 0.25)
+
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {f: w / norm for f, w in weights.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(f, 0.0) for f, w in a.items())
+
+
+def entity_key(name: str) -> Tuple[str, ...]:
+    return tuple(w.lower() for w in _WORD.findall((name or "").replace("-", " ").replace("_", " ")))
+
+
+def pinned_tokens(prompt: str, entities: FrozenSet[Tuple[str, ...]] = frozenset(), max_entity_words: int = 0) -> FrozenSet[str]:
+    """
+    Tokens a near match must share exactly, whatever their case:
+    anything with a digit (amounts, codes), polarity words (not, never,
+    scam...), catalog names (casinos, any casing, multi-word) and
+    capitalized words after the first (names missing from the catalog).
+    """
+    raw = _words(prompt)
+    words = [w.lower() for w in raw]
+    pinned: Set[str] = set()
+    for i, (word, original) in enumerate(zip(words, raw)):
+        if any(c.isdigit() for c in word) or word in POLARITY_WORDS or (i and original[:1].isupper()):
+            pinned.add(word)
+        for n in range(1, max_entity_words + 1):
+            gram = tuple(words[i:i + n])
+            if len(gram) == n and gram in entities:
+                pinned.add(" ".join(gram))
+    return frozenset(pinned)
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    namespace: str
+    value: Any
+    vector: Dict[int, float]
+    words: FrozenSet[str]
+    pinned: FrozenSet[str]
+    expires: float
+    size: int
+
+
+class SemanticCache:
+    """
+    1. Exact: sha1 of (namespace, normalized prompt).
+    2. Semantic (unless the caller opts out): cosine similarity of hashed
+       n-gram vectors against entries in the same namespace sharing at
+       least one word; the best candidate at or above `threshold` with
+       identical pinned tokens wins.
+
+    Entries carry a per-call TTL; the cache is LRU-evicted to stay under
+    `max_bytes` (prompt + value + vector estimate).
+    """
+
+    def __init__(self, max_bytes: int, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.max_bytes = max_bytes
+        self.threshold = threshold
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._postings: Dict[Tuple[str, str], Set[str]] = {}  # (namespace, word) -> keys
+        self._entities: FrozenSet[Tuple[str, ...]] = frozenset()
+        self._max_entity_words = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    # --------------------------------------------------
+    def set_entities(self, names: Iterable[str]) -> None:
+        """
+        Catalog names (casinos, affiliates) pinned in any casing. Entries
+        stored before the change keep their old pins, so the near-match
+        tier is cleared.
+        """
+        entities = frozenset(key for key in (entity_key(n) for n in names) if key)
+        with self._lock:
+            if entities == self._entities:
+                return
+            self._entities = entities
+            self._max_entity_words = max((len(k) for k in entities), default=0)
+            for key in list(self._entries):
+                self._remove(key)
+
+    @property
+    def entity_count(self) -> int:
+        return len(self._entities)
+
+    def _pinned(self, prompt: str) -> FrozenSet[str]:
+        return pinned_tokens(prompt, self._entities, self._max_entity_words)
+
+    def get(self, namespace: str, prompt: str, semantic: bool = True) -> Optional[Any]:
+        key = prompt_key(namespace, prompt)
+        now = time.time()
+
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return entry.value
+            if not semantic:
+                self.stats["misses"] += 1
+                return None
+
+        vector = embed(prompt)
+        words = frozenset(_WORD.findall(normalize_prompt(prompt)))
+        pinned = self._pinned(prompt)
+
+        with self._lock:
+            shared: Dict[str, int] = {}
+            for word in words:
+                for candidate in self._postings.get((namespace, word), ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+
+            best_key, best_score = None, self.threshold
+            for candidate in sorted(shared, key=shared.get, reverse=True)[:MAX_CANDIDATES]:
+                entry = self._live(candidate, now)
+                if entry is None or entry.pinned != pinned:
+                    continue
+                score = cosine(vector, entry.vector)
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+
+            if best_key is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.stats["semantic_hits"] += 1
+            return self._entries[best_key].value
+
+    def set(self, namespace: str, prompt: str, value: Any, ttl: float) -> None:
+        key = prompt_key(namespace, prompt)
+        vector = embed(prompt)
+        words = frozenset(_WORD.findall(normalize_prompt(prompt)))
+        size = ENTRY_OVERHEAD + len(prompt.encode("utf-8")) + len(repr(value).encode("utf-8")) + 24 * len(vector)
+        if size > self.max_bytes:
+            return
+
+        entry = CacheEntry(namespace, value, vector, words, self._pinned(prompt), time.time() + ttl, size)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            for word in words:
+                self._postings.setdefault((namespace, word), set()).add(key)
+            self.stats["stores"] += 1
+
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if namespace is None or e.namespace == namespace]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "threshold": self.threshold,
+                "entities": len(self._entities),
+            }
+
+    # --------------------------------------------------
+    def _live(self, key: str, now: float) -> Optional[CacheEntry]:
+        """Entry for key unless expired (expired entries are dropped). Lock held."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires < now:
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        """Lock held."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for word in entry.words:
+            posting = self._postings.get((entry.namespace, word))
+            if posting is not None:
+                posting.discard(key)
+                if not posting:
+                    del self._postings[(entry.namespace, word)]
+
+
+__all__ = [
+    "SemanticCache",
+    "cosine",
+    "embed",
+    "entity_key",
+    "normalize_prompt",
+    "pinned_tokens",
+    "prompt_key",
+]
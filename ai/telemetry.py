@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai.ai_logger import get_logger
+from ai.config.loader import build_settings
+from ai.db import DB
+
+logger = get_logger("gcz-ai.telemetry")
+
+# One statement per table; every record carries its own event time, so
+# batched and replayed rows keep when they happened, not when written
+INSERT_SQL: Dict[str, str] = {
+    "ai_memory": """
+        INSERT INTO ai_memory (category, message, source, meta, created_at)
+        VALUES ($1, $2, $3, $4::jsonb, $5::timestamptz)
+    """,
+    "service_health": """
+        INSERT INTO service_health (service, status, details, created_at)
+        VALUES ($1, $2, $3::jsonb, $4::timestamptz)
+    """,
+    "anomalies": """
+        INSERT INTO anomalies (type, message, meta, created_at)
+        VALUES ($1, $2, $3::jsonb, $4::timestamptz)
+    """,
+}
+
+# Buffered records beyond this go straight to the spool (DB stalled)
+MAX_BUFFER = 10_000
+# Records written per executemany when replaying the spool
+REPLAY_BATCH = 1000
+# A spooled record failing this many replays while the DB is up is bad
+# data; it is moved to the rejected file instead of retried forever
+MAX_REPLAY_TRIES = 3
+
+SPOOL_FILE = "telemetry.jsonl"
+REJECTED_FILE = "telemetry.rejected.jsonl"
+
+
+@dataclass(slots=True)
+class TelemetryRecord:
+    table: str
+    values: Tuple[Any, ...]
+    at: datetime
+    tries: int = 0
+
+    def params(self) -> Tuple[Any, ...]:
+        return (*self.values, self.at)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"table": self.table, "values": list(self.values), "at": self.at.isoformat(), "tries": self.tries},
+            default=str,
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "TelemetryRecord":
+        data = json.loads(line)
+        return cls(data["table"], tuple(data["values"]), datetime.fromisoformat(data["at"]), data.get("tries", 0))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TelemetryWriter:
+    """
+    Buffered write path for ai_memory / service_health / anomalies.
+
+    `add` only appends to an in-memory buffer; a background task writes
+    it with one executemany per table once `batch_size` records are
+    waiting or `flush_s` after the first. Records a write fails on go to
+    a JSONL spool under `spool_dir` (capped at `spool_max_bytes`) and are
+    replayed after the next successful write. Pending records are
+    flushed when the event loop shuts the task down.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path,
+        batch_size: int = 200,
+        flush_s: float = 1.0,
+        spool_max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.spool_dir = spool_dir
+        self.batch_size = max(1, batch_size)
+        self.flush_s = flush_s
+        self.spool_max_bytes = spool_max_bytes
+        self._buffer: List[TelemetryRecord] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Future] = None
+        self._replaying = False
+        self._spool_pending = True  # a previous run may have left a spool
+        self.stats: Dict[str, int] = {
+            "queued": 0,
+            "written": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "rejected": 0,
+            "dropped": 0,
+        }
+
+    @property
+    def _spool_path(self) -> Path:
+        return self.spool_dir / SPOOL_FILE
+
+    # --------------------------------------------------
+    def add(self, table: str, *values: Any) -> None:
+        """Queues one row for `table`; must be called from a running event loop."""
+        if table not in INSERT_SQL:
+            raise ValueError(f"Unknown telemetry table: {table}")
+        self._buffer.append(TelemetryRecord(table, values, datetime.now(timezone.utc)))
+        self.stats["queued"] += 1
+
+        if len(self._buffer) >= MAX_BUFFER:
+            overflow, self._buffer = self._buffer, []
+            self._spool_write(overflow)
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._flush_loop(), name="gcz-ai-telemetry")
+        elif len(self._buffer) >= self.batch_size and self._wake is not None and not self._wake.done():
+            self._wake.set_result(None)
+
+    async def flush(self) -> bool:
+        """Writes everything buffered now; False if any of it was spooled instead."""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return True
+        if not DB.enabled:
+            self.stats["dropped"] += len(batch)  # no database configured: nothing to spool for
+            return False
+
+        try:
+            failed = await self._write(batch)
+        except asyncio.CancelledError:
+            self._spool_write(batch)
+            raise
+
+        self.stats["flushes"] += 1
+        self.stats["written"] += len(batch) - len(failed)
+        if failed:
+            self.stats["failed_flushes"] += 1
+            await asyncio.to_thread(self._spool_write, failed)
+            return False
+
+        if self._spool_pending:
+            await self._replay()
+        return True
+
+    async def close(self) -> None:
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "buffered": len(self._buffer),
+            "spool_bytes": self._spool_size(),
+        }
+
+    # --------------------------------------------------
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._buffer:
+                if len(self._buffer) < self.batch_size:
+                    self._wake = loop.create_future()
+                    await asyncio.wait({self._wake}, timeout=self.flush_s)
+                await self.flush()
+        except asyncio.CancelledError:
+            # Loop shutting down (asyncio.run exit, server stop): keep the tail
+            await self.flush()
+            raise
+
+    async def _write(self, records: List[TelemetryRecord]) -> List[TelemetryRecord]:
+        """Writes records grouped by table; returns the ones that were not written."""
+        by_table: Dict[str, List[TelemetryRecord]] = {}
+        for record in records:
+            by_table.setdefault(record.table, []).append(record)
+
+        failed: List[TelemetryRecord] = []
+        for table, rows in by_table.items():
+            try:
+                ok = await DB.executemany(INSERT_SQL[table], [r.params() for r in rows])
+            except (TypeError, ValueError) as exc:  # unserializable meta; the spool stringifies it
+                logger.error("Telemetry rows not serializable", extra={"table": table, "error": str(exc)})
+                ok = False
+            if not ok:
+                failed.extend(rows)
+        return failed
+
+    # --------------------------------------------------
+    #  Disk spool
+    # --------------------------------------------------
+    def _spool_size(self) -> int:
+        """Bytes awaiting replay; the rejected file does not count."""
+        if not self.spool_dir.is_dir():
+            return 0
+        return sum(
+            p.stat().st_size
+            for p in self.spool_dir.glob("telemetry*")
+            if p.is_file() and p.name != REJECTED_FILE
+        )
+
+    def _spool_write(self, records: List[TelemetryRecord], path: Optional[Path] = None) -> None:
+        data = "".join(record.to_json() + "\n" for record in records)
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            if path is None and self._spool_size() + len(data) > self.spool_max_bytes:
+                self.stats["dropped"] += len(records)
+                logger.error("Telemetry spool full, records dropped", extra={"records": len(records)})
+                return
+            with open(path or self._spool_path, "a", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as exc:
+            self.stats["dropped"] += len(records)
+            logger.error("Telemetry spool write failed", extra={"records": len(records), "error": str(exc)})
+            return
+
+        if path is None:
+            self._spool_pending = True
+            self.stats["spooled"] += len(records)
+            logger.warning("Telemetry spooled to disk", extra={"records": len(records), "spool": str(self._spool_path)})
+
+    def _claim_spool(self) -> List[Path]:
+        """
+        Renames spool files to <name>.<pid> so concurrent processes never
+        replay the same file; files claimed by a dead process are adopted.
+        """
+        if not self.spool_dir.is_dir():
+            return []
+        pid = os.getpid()
+        if self._spool_path.exists():
+            try:
+                os.replace(self._spool_path, self.spool_dir / f"telemetry-{pid}-{time.time_ns()}.replay")
+            except FileNotFoundError:
+                pass
+
+        claimed: List[Path] = []
+        for path in sorted(self.spool_dir.glob("telemetry-*.replay*")):
+            owner = path.suffix.lstrip(".")
+            if owner.isdigit() and int(owner) != pid and _pid_alive(int(owner)):
+                continue
+            target = path if owner == str(pid) else path.with_name(f"{path.name.split('.replay')[0]}.replay.{pid}")
+            try:
+                if target != path:
+                    os.replace(path, target)
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        return claimed
+
+    def _read_spool(self, path: Path) -> List[TelemetryRecord]:
+        records: List[TelemetryRecord] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(TelemetryRecord.from_json(line))
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn last line from a crash mid-write
+        return records
+
+    async def _isolate(self, records: List[TelemetryRecord]) -> List[TelemetryRecord]:
+        """
+        Bisects records that failed as a batch (executemany is all or
+        nothing per table), writing every half that succeeds. Returns the
+        records that still fail on their own.
+        """
+        if len(records) <= 1:
+            return records
+        mid = len(records) // 2
+        failed: List[TelemetryRecord] = []
+        for half in (records[:mid], records[mid:]):
+            failed += await self._isolate(await self._write(half))
+        return failed
+
+    async def _replay(self) -> None:
+        if self._replaying:
+            return
+        self._replaying = True
+        try:
+            self._spool_pending = False
+            for path in await asyncio.to_thread(self._claim_spool):
+                records = await asyncio.to_thread(self._read_spool, path)
+                failed: List[TelemetryRecord] = []
+                for i in range(0, len(records), REPLAY_BATCH):
+                    failed += await self._write(records[i:i + REPLAY_BATCH])
+
+                # With the DB up, a failed batch holds bad rows; write the
+                # good ones around them so only the bad rows use up tries
+                if failed and (await DB.health_check())["ok"]:
+                    failed = await self._isolate(failed)
+                self.stats["replayed"] += len(records) - len(failed)
+
+                # Only count a failed try against the record if the DB is up
+                db_up = bool(failed) and (await DB.health_check())["ok"]
+                retry, rejected = [], []
+                for record in failed:
+                    record.tries += 1 if db_up else 0
+                    (rejected if record.tries >= MAX_REPLAY_TRIES else retry).append(record)
+                if retry:
+                    await asyncio.to_thread(self._spool_write, retry)
+                if rejected:
+                    self.stats["rejected"] += len(rejected)
+                    await asyncio.to_thread(self._spool_write, rejected, self.spool_dir / REJECTED_FILE)
+                    logger.error("Telemetry records rejected", extra={"records": len(rejected)})
+                await asyncio.to_thread(path.unlink)
+                logger.info("Telemetry spool replayed", extra={"file": path.name, "records": len(records)})
+        except OSError as exc:
+            self._spool_pending = True
+            logger.error("Telemetry spool replay failed", extra={"error": str(exc)})
+        finally:
+            self._replaying = False
+
+
+def get_telemetry_writer() -> TelemetryWriter:
+    root = Path(__file__).resolve().parents[1]
+    settings = build_settings(root)
+    return TelemetryWriter(
+        settings.telemetry_spool_dir,
+        batch_size=settings.telemetry_batch_size,
+        flush_s=settings.telemetry_flush_s,
+        spool_max_bytes=settings.telemetry_spool_max_bytes,
+    )
+
+
+TELEMETRY = get_telemetry_writer()
+
+__all__ = ["TELEMETRY", "TelemetryRecord", "TelemetryWriter"]
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import random
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 
 from ai.ai_logger import get_logger
 from ai.config.loader import Settings
+from ai.tools.ai_router import ProviderRouter
+from ai.shared.semantic_cache import SemanticCache
 
 logger = get_logger("gcz-ai.ai-clients")
 
@@ -18,39 +22,126 @@ class AIResponse:
     mode: str
     text: str
     raw: Optional[Dict[str, Any]]
+    cached: bool = False
 
 
 class AIClient:
+    """
+    Routes prompts across the configured providers (see ProviderRouter):
+    fastest healthy provider first, a hedged request to the next provider
+    once the first exceeds its latency budget, failover on errors, and
+    jittered backoff only when a provider is tried again.
+    """
+
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._timeout = httpx.Timeout(settings.ai_timeout_s)
         self._client = httpx.AsyncClient(timeout=self._timeout)
+        self.cache = SemanticCache(settings.ai_cache_max_bytes, settings.ai_cache_similarity)
+        self._callers = {
+            "openai": self._call_openai,
+            "perplexity": self._call_perplexity,
+            "cursor": self._call_cursor,
+        }
+        configured = [
+            name
+            for name, key in (
+                ("openai", settings.openai_api_key),
+                ("perplexity", settings.perplexity_api_key),
+                ("cursor", settings.cursor_api_key),
+            )
+            if key
+        ]
+        self.router = ProviderRouter(configured, settings.ai_hedge_after_s)
 
     async def close(self) -> None:
         await self._client.aclose()
 
-    async def generate(self, prompt: str, provider: Optional[str] = None) -> AIResponse:
-        provider_choice = provider or self._pick_provider()
-        if not provider_choice:
+    async def generate(self, prompt: str, provider: Optional[str] = None, semantic: bool = True) -> AIResponse:
+        """`semantic=False` restricts the cache to exact prompt matches (generated content)."""
+        if provider and provider not in self._callers:
+            return self._fallback(prompt, "unknown-provider")
+        if not self.router.providers:
             return self._fallback(prompt, "no-provider")
 
-        if provider_choice == "openai":
-            return await self._call_openai(prompt)
-        if provider_choice == "perplexity":
-            return await self._call_perplexity(prompt)
-        if provider_choice == "cursor":
-            return await self._call_cursor(prompt)
-
-        return self._fallback(prompt, "unknown-provider")
-
-    def _pick_provider(self) -> Optional[str]:
-        if self._settings.openai_api_key:
-            return "openai"
-        if self._settings.perplexity_api_key:
-            return "perplexity"
-        if self._settings.cursor_api_key:
-            return "cursor"
-        return None
+        namespace = provider or "auto"
+        hit = self.cache.get(namespace, prompt, semantic=semantic)
+        if hit is not None:
+            logger.info("AI cache hit", extra={"provider": namespace})
+            return AIResponse(provider=namespace, mode="ai", text=hit, raw=None, cached=True)
+
+        order = [provider] if provider else self.router.rank()
+        if not order:
+            return self._fallback(prompt, "circuit-open")
+
+        response = await self._route(prompt, order)
+
+        # Fallbacks are never cached so the next call retries the provider
+        if response.mode == "ai" and response.text:
+            self.cache.set(namespace, prompt, response.text, self._settings.ai_cache_ttl_s)
+        return response
+
+    async def _route(self, prompt: str, order: List[str]) -> AIResponse:
+        max_attempts = self._settings.ai_retries + 1
+        tries: Dict[str, int] = {}
+        tasks: Dict[asyncio.Task, str] = {}
+        attempts = 0
+        hedged = False
+
+        def launch() -> str:
+            nonlocal attempts
+            name = order[attempts % len(order)]
+            attempts += 1
+            tries[name] = tries.get(name, 0) + 1
+            # Back off only when the same provider is tried again
+            delay = _backoff(tries[name] - 1)
+            tasks[asyncio.create_task(self._attempt(name, prompt, delay))] = name
+            return name
+
+        last = launch()
+        try:
+            while tasks:
+                can_hedge = not hedged and len(tasks) == 1 and len(order) > 1 and attempts < max_attempts
+                timeout = self.router.hedge_delay(last) if can_hedge else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedged = True
+                    last = launch()
+                    logger.info("AI hedged request", extra={"slow": tasks[next(iter(tasks))], "hedge": last})
+                    continue
+
+                for task in done:
+                    tasks.pop(task)
+                    result = task.result()
+                    if result is not None:
+                        return result
+
+                if not tasks and attempts < max_attempts:
+                    last = launch()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return self._fallback(prompt, f"{order[0]}-failure")
+
+    async def _attempt(self, provider: str, prompt: str, delay: float = 0.0) -> Optional[AIResponse]:
+        """One call; records latency/outcome with the router. None on failure."""
+        if delay:
+            await asyncio.sleep(delay)
+        started = time.monotonic()
+        try:
+            response = await self._callers[provider](prompt)
+        except asyncio.CancelledError:
+            # Lost a hedge race: still evidence this provider is slow
+            self.router.record_abandoned(provider, time.monotonic() - started)
+            raise
+        except Exception as exc:
+            self.router.record(provider, time.monotonic() - started, ok=False)
+            logger.error("AI request failed", extra={"provider": provider, "error": str(exc)})
+            return None
+        self.router.record(provider, time.monotonic() - started, ok=True)
+        return response
 
     async def _call_openai(self, prompt: str) -> AIResponse:
         headers = {"Authorization": f"Bearer {self._settings.openai_api_key}"}
@@ -58,7 +149,7 @@ class AIClient:
             "model": self._settings.openai_model,
             "messages": [{"role": "user", "content": prompt}],
         }
-        return await self._post_with_retries(
+        return await self._post(
             "openai",
             "https://api.openai.com/v1/chat/completions",
             headers,
@@ -72,7 +163,7 @@ class AIClient:
             "model": self._settings.perplexity_model,
             "messages": [{"role": "user", "content": prompt}],
         }
-        return await self._post_with_retries(
+        return await self._post(
             "perplexity",
             "https://api.perplexity.ai/chat/completions",
             headers,
@@ -84,7 +175,7 @@ class AIClient:
         headers = {"Authorization": f"Bearer {self._settings.cursor_api_key}"}
         payload = {"prompt": prompt}
         endpoint = f"{self._settings.cursor_api_url.rstrip('/')}/chat/completions"
-        return await self._post_with_retries(
+        return await self._post(
             "cursor",
             endpoint,
             headers,
@@ -92,7 +183,7 @@ class AIClient:
             lambda data: data.get("text") or data.get("message", ""),
         )
 
-    async def _post_with_retries(
+    async def _post(
         self,
         provider: str,
         url: str,
@@ -100,23 +191,21 @@ class AIClient:
         payload: Dict[str, Any],
         extract_text,
     ) -> AIResponse:
-        for attempt in range(1, self._settings.ai_retries + 2):
-            try:
-                response = await self._client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-                return AIResponse(provider=provider, mode="ai", text=extract_text(data), raw=data)
-            except Exception as exc:
-                logger.error(
-                    "AI request failed",
-                    extra={"provider": provider, "attempt": attempt, "error": str(exc)},
-                )
-                await asyncio.sleep(0.5 * attempt)
-        return self._fallback(payload.get("prompt", ""), f"{provider}-failure")
+        response = await self._client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        return AIResponse(provider=provider, mode="ai", text=extract_text(data), raw=data)
 
     def _fallback(self, prompt: str, reason: str) -> AIResponse:
         text = f"[fallback:{reason}] {prompt.strip()[:400]}"
         return AIResponse(provider="fallback", mode="fallback", text=text, raw=None)
 
 
+def _backoff(retry: int) -> float:
+    """0 for a first try, then 0.25s, 0.5s, 1s ... (capped at 4s) with full jitter."""
+    if retry <= 0:
+        return 0.0
+    return random.uniform(0, min(4.0, 0.25 * 2 ** (retry - 1)))
+
+
 __all__ = ["AIClient", "AIResponse"]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# Rolling window of recent calls per provider
+WINDOW_SIZE = 100
+# Breaker opens after this many consecutive failures ...
+BREAKER_FAILURES = 5
+# ... or when the windowed error rate reaches this (with enough samples)
+BREAKER_ERROR_RATE = 0.5
+BREAKER_MIN_SAMPLES = 10
+# Seconds an open breaker rejects calls before one half-open probe
+BREAKER_COOLDOWN_S = 30.0
+# Hedge no earlier than this, even for a provider with a tiny p95
+HEDGE_MIN_S = 0.25
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@dataclass
+class ProviderHealth:
+    """Rolling latency/error stats and circuit breaker for one provider."""
+
+    name: str
+    samples: Deque[Tuple[float, bool]] = field(default_factory=lambda: deque(maxlen=WINDOW_SIZE))
+    consecutive_failures: int = 0
+    state: str = "closed"  # closed | open | half-open
+    opened_at: float = 0.0
+
+    # --------------------------------------------------
+    def latencies(self) -> List[float]:
+        return sorted(latency for latency, ok in self.samples if ok)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return _percentile(self.latencies(), 0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return _percentile(self.latencies(), 0.95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    # --------------------------------------------------
+    def available(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if now - self.opened_at >= BREAKER_COOLDOWN_S:
+            # One probe per cooldown (a cancelled probe just waits for the next)
+            self.state = "half-open"
+            self.opened_at = now
+            return True
+        return False
+
+    def record(self, latency: float, ok: bool, now: float) -> None:
+        self.samples.append((latency, ok))
+        if ok:
+            self.consecutive_failures = 0
+            self.state = "closed"
+            return
+
+        self.consecutive_failures += 1
+        tripped = self.consecutive_failures >= BREAKER_FAILURES or (
+            len(self.samples) >= BREAKER_MIN_SAMPLES and self.error_rate >= BREAKER_ERROR_RATE
+        )
+        if self.state == "half-open" or tripped:
+            self.state = "open"
+            self.opened_at = now
+
+    def record_latency(self, latency: float) -> None:
+        """Lower-bound latency of a call abandoned for a faster hedge; breaker untouched."""
+        self.samples.append((latency, True))
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "p50_ms": round(self.p50 * 1000) if self.p50 is not None else None,
+            "p95_ms": round(self.p95 * 1000) if self.p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "samples": len(self.samples),
+        }
+
+
+class ProviderRouter:
+    """
+    Orders configured providers for a call: breaker-open providers are
+    skipped, the rest are ranked by p95 latency inflated by error rate.
+    Providers without samples keep their configured order and are tried
+    before slower measured ones, so new providers get measured.
+    """
+
+    def __init__(self, providers: Iterable[str], hedge_after_s: float) -> None:
+        self.providers = list(providers)
+        self.hedge_after_s = hedge_after_s
+        self.health: Dict[str, ProviderHealth] = {name: ProviderHealth(name) for name in self.providers}
+
+    def rank(self) -> List[str]:
+        now = time.monotonic()
+        candidates = [name for name in self.providers if self.health[name].available(now)]
+
+        def score(name: str) -> Tuple[float, int]:
+            h = self.health[name]
+            p95 = h.p95
+            if p95 is None:
+                # Unmeasured: try early; only-failures: try last
+                return (float("inf") if h.samples else 0.0), self.providers.index(name)
+            return p95 * (1 + 4 * h.error_rate), self.providers.index(name)
+
+        return sorted(candidates, key=score)
+
+    def hedge_delay(self, provider: str) -> float:
+        """How long to wait on `provider` before racing a second one."""
+        p95 = self.health[provider].p95
+        if p95 is None:
+            return self.hedge_after_s
+        return min(self.hedge_after_s, max(HEDGE_MIN_S, p95))
+
+    def record(self, provider: str, latency: float, ok: bool) -> None:
+        self.health[provider].record(latency, ok, time.monotonic())
+
+    def record_abandoned(self, provider: str, latency: float) -> None:
+        self.health[provider].record_latency(latency)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {name: h.snapshot() for name, h in self.health.items()}
+
+
+__all__ = ["ProviderHealth", "ProviderRouter"]
@@ -1,18 +1,214 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import random
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from ai.ai_logger import get_logger, set_trace_id
 from ai.db import DB
 from ai.tools.ai_clients import AIClient
 from ai.workflows.registry import WORKFLOW_REGISTRY
+from ai.workflows.schedules import CronSchedule, JobSchedule
 
 logger = get_logger("gcz-ai.workflow-engine")
 
+# NOTIFY channel raised by enqueue_job
+JOBS_CHANNEL = "ai_jobs"
+# Idle wait when LISTEN is active (safety net) / when it is not (polling)
+IDLE_POLL_S = 30.0
+FALLBACK_POLL_S = 1.0
+LISTEN_RETRY_S = 5.0
+# Rows scanned per claim, as a multiple of the free slots
+CLAIM_SCAN_FACTOR = 4
+
+# Priority lanes: lower runs first (any int is accepted)
+PRIORITY_LANES = {"high": 0, "normal": 50, "low": 100}
+
+# A running job's lease; workers renew it, expired leases are reclaimed
+VISIBILITY_TIMEOUT_S = 300
+LEASE_RENEW_S = VISIBILITY_TIMEOUT_S / 3
+
+# Retry delay: RETRY_BASE_S * 2^(attempt-1), capped, with jitter
+RETRY_BASE_S = 5.0
+RETRY_MAX_S = 900.0
+
+# Maintenance (lease reaper + archival) cadence and retention
+MAINTENANCE_INTERVAL_S = 60.0
+ARCHIVE_AFTER = "10 minutes"
+ARCHIVE_RETENTION = "30 days"
+ARCHIVE_BATCH = 1000
+
+# A claimed schedule is pushed this far ahead until its job is enqueued,
+# so a replica dying mid-fire only delays it
+SCHEDULE_LEASE_S = 60
+SCHEDULE_BATCH = 32
+
+# Claims up to $3 due queued jobs (priority lane, then run_at: a walk of
+# idx_ai_jobs_queued) in one round-trip and leases them for $5 seconds.
+# Types at their cap ($4, jsonb array) are skipped; the rest get at most
+# their remaining budget ($2 jsonb, default $3). Locked-but-unpicked rows
+# are released when the statement ends.
+CLAIM_JOBS_SQL = """
+WITH locked AS (
+    SELECT id, job_type, priority, run_at
+    FROM ai_jobs
+    WHERE status = 'queued'
+      AND run_at <= NOW()
+      AND NOT ($4::jsonb ? job_type)
+    ORDER BY priority, run_at
+    LIMIT $1
+    FOR UPDATE SKIP LOCKED
+),
+picked AS (
+    SELECT id
+    FROM (
+        SELECT id, priority, run_at,
+               row_number() OVER (PARTITION BY job_type ORDER BY priority, run_at) AS rn,
+               COALESCE(($2::jsonb ->> job_type)::int, $3) AS budget
+        FROM locked
+    ) ranked
+    WHERE rn <= budget
+    ORDER BY priority, run_at
+    LIMIT $3
+)
+UPDATE ai_jobs j
+SET status = 'running',
+    attempts = j.attempts + 1,
+    locked_until = NOW() + make_interval(secs => $5),
+    updated_at = NOW()
+FROM picked
+WHERE j.id = picked.id
+RETURNING j.*;
+"""
+
+
+# Expired leases (worker crashed / was killed): back to the queue, or to
+# the dead-letter table once attempts are used up
+REAP_DEAD_SQL = """
+WITH dead AS (
+    DELETE FROM ai_jobs
+    WHERE status = 'running'
+      AND locked_until < NOW()
+      AND attempts >= max_attempts
+    RETURNING id, job_type, payload, attempts
+)
+INSERT INTO ai_dead_letters (id, job_type, payload, error, attempts)
+SELECT id, job_type, payload, 'visibility timeout', attempts FROM dead;
+"""
+
+REAP_REQUEUE_SQL = """
+UPDATE ai_jobs
+SET status = 'queued',
+    locked_until = NULL,
+    run_at = NOW(),
+    last_error = 'visibility timeout',
+    updated_at = NOW()
+WHERE status = 'running'
+  AND locked_until < NOW()
+RETURNING id;
+"""
+
+ARCHIVE_SQL = f"""
+WITH done AS (
+    DELETE FROM ai_jobs
+    WHERE id IN (
+        SELECT id FROM ai_jobs
+        WHERE status = 'succeeded'
+          AND updated_at < NOW() - INTERVAL '{ARCHIVE_AFTER}'
+        LIMIT {ARCHIVE_BATCH}
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, job_type, payload, status, priority, attempts, last_error, created_at, updated_at
+)
+INSERT INTO ai_jobs_archive (id, job_type, payload, status, priority, attempts, last_error, created_at, finished_at)
+SELECT id, job_type, payload, status, priority, attempts, last_error, created_at, updated_at FROM done
+ON CONFLICT (id) DO NOTHING;
+"""
+
+PRUNE_ARCHIVE_SQL = f"""
+DELETE FROM ai_jobs_archive
+WHERE archived_at < NOW() - INTERVAL '{ARCHIVE_RETENTION}';
+"""
+
+
+# Due schedules, claimed once across replicas (SKIP LOCKED + lease)
+CLAIM_SCHEDULES_SQL = f"""
+WITH due AS (
+    SELECT name
+    FROM ai_job_schedules
+    WHERE enabled
+      AND next_run_at <= NOW()
+    ORDER BY next_run_at
+    LIMIT {SCHEDULE_BATCH}
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE ai_job_schedules s
+SET next_run_at = NOW() + make_interval(secs => $1),
+    updated_at = NOW()
+FROM due
+WHERE s.name = due.name
+RETURNING s.name, s.job_type, s.cron, s.payload, s.priority, s.max_attempts, NOW()::timestamp AS db_now;
+"""
+
+# Enqueues a schedule's job unless its previous run is still queued or
+# running (heavy jobs never overlap), and advances next_run_at
+FIRE_SCHEDULE_SQL = f"""
+WITH job AS (
+    INSERT INTO ai_jobs (id, job_type, payload, max_attempts, priority, schedule)
+    SELECT $1::uuid, $2::text, $3::jsonb, $4::int, $5::smallint, $6::text
+    WHERE NOT EXISTS (
+        SELECT 1 FROM ai_jobs
+        WHERE schedule = $6::text AND status IN ('queued', 'running')
+    )
+    RETURNING id, job_type
+),
+advanced AS (
+    UPDATE ai_job_schedules
+    SET next_run_at = $7::timestamp,
+        last_run_at = CASE WHEN EXISTS (SELECT 1 FROM job) THEN NOW() ELSE last_run_at END,
+        last_job_id = COALESCE((SELECT id FROM job), last_job_id),
+        updated_at = NOW()
+    WHERE name = $6::text
+)
+SELECT id, pg_notify('{JOBS_CHANNEL}', job_type) FROM job;
+"""
+
+UPSERT_SCHEDULE_SQL = """
+INSERT INTO ai_job_schedules (name, job_type, cron, payload, priority, max_attempts, enabled, next_run_at)
+VALUES ($1, $2, $3, $4::jsonb, $5, $6, TRUE, $7)
+ON CONFLICT (name) DO UPDATE
+SET job_type = EXCLUDED.job_type,
+    payload = EXCLUDED.payload,
+    priority = EXCLUDED.priority,
+    max_attempts = EXCLUDED.max_attempts,
+    enabled = TRUE,
+    -- keep the pending run unless the timing changed (or it was disabled)
+    next_run_at = CASE
+        WHEN ai_job_schedules.cron = EXCLUDED.cron AND ai_job_schedules.enabled
+        THEN ai_job_schedules.next_run_at
+        ELSE EXCLUDED.next_run_at
+    END,
+    cron = EXCLUDED.cron,
+    updated_at = NOW();
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: 5s, 10s, 20s ... capped at RETRY_MAX_S, times 0.5-1.0."""
+    delay = min(RETRY_MAX_S, RETRY_BASE_S * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def priority_value(priority: Union[int, str]) -> int:
+    if isinstance(priority, str):
+        return PRIORITY_LANES[priority]
+    return int(priority)
+
 
 @dataclass
 class JobResult:
@@ -22,10 +218,33 @@ class JobResult:
 
 
 class WorkflowEngine:
-    def __init__(self, ai_client: AIClient) -> None:
+    """
+    ai_jobs consumer: one dispatcher claims up to `claim_batch` jobs per
+    round-trip into a local queue drained by `workers` coroutines.
+    `type_limits` caps concurrently running jobs per job_type. The
+    dispatcher sleeps until a NOTIFY from enqueue_job, a freed worker
+    slot, or the next delayed run_at, and polls only when LISTEN is down.
+    """
+
+    def __init__(
+        self,
+        ai_client: AIClient,
+        workers: int = 4,
+        claim_batch: int = 8,
+        type_limits: Optional[Dict[str, int]] = None,
+    ) -> None:
         self._ai_client = ai_client
-        self._worker_task: Optional[asyncio.Task] = None
+        self._workers = max(1, workers)
+        self._claim_batch = max(1, claim_batch)
+        self._type_limits = dict(type_limits or {})
+        self._tasks: List[asyncio.Task] = []
         self._stop_event = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._active = 0  # claimed and not yet finalized
+        self._running: Dict[str, int] = {}
+        self._listening = False
+        self._schedules_due = 0.0  # monotonic time of the next schedule check
 
     async def ensure_tables(self) -> None:
         await DB.execute(
@@ -78,6 +297,63 @@ class WorkflowEngine:
             );
             """
         )
+        # Queue upgrade for existing deployments
+        await DB.execute(
+            """
+            ALTER TABLE ai_jobs ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 50;
+            ALTER TABLE ai_jobs ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP;
+
+            -- Claim walk: only queued rows are indexed, so history never slows it
+            CREATE INDEX IF NOT EXISTS idx_ai_jobs_queued
+                ON ai_jobs (priority, run_at) WHERE status = 'queued';
+            CREATE INDEX IF NOT EXISTS idx_ai_jobs_leases
+                ON ai_jobs (locked_until) WHERE status = 'running';
+            CREATE INDEX IF NOT EXISTS idx_ai_jobs_succeeded
+                ON ai_jobs (updated_at) WHERE status = 'succeeded';
+            """
+        )
+        await DB.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_job_schedules (
+                name TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                cron TEXT NOT NULL,
+                payload JSONB NOT NULL DEFAULT '{}',
+                priority SMALLINT NOT NULL DEFAULT 50,
+                max_attempts INT NOT NULL DEFAULT 3,
+                enabled BOOLEAN NOT NULL DEFAULT TRUE,
+                next_run_at TIMESTAMP NOT NULL,
+                last_run_at TIMESTAMP,
+                last_job_id UUID,
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+            CREATE INDEX IF NOT EXISTS idx_ai_job_schedules_due
+                ON ai_job_schedules (next_run_at) WHERE enabled;
+
+            -- Jobs fired by a schedule; used to skip overlapping runs
+            ALTER TABLE ai_jobs ADD COLUMN IF NOT EXISTS schedule TEXT;
+            CREATE INDEX IF NOT EXISTS idx_ai_jobs_schedule_open
+                ON ai_jobs (schedule) WHERE status IN ('queued', 'running');
+            """
+        )
+        await DB.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_jobs_archive (
+                id UUID PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                payload JSONB NOT NULL,
+                status TEXT NOT NULL,
+                priority SMALLINT NOT NULL,
+                attempts INT NOT NULL,
+                last_error TEXT,
+                created_at TIMESTAMP NOT NULL,
+                finished_at TIMESTAMP NOT NULL,
+                archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+            CREATE INDEX IF NOT EXISTS idx_ai_jobs_archive_archived_at
+                ON ai_jobs_archive (archived_at);
+            """
+        )
         await DB.execute(
             """
             CREATE TABLE IF NOT EXISTS ai_dead_letters (
@@ -93,16 +369,24 @@ class WorkflowEngine:
         )
 
     async def start(self) -> None:
-        if self._worker_task and not self._worker_task.done():
+        if any(not t.done() for t in self._tasks):
             return
         self._stop_event.clear()
-        self._worker_task = asyncio.create_task(self._worker_loop(), name="gcz-ai-worker")
-        logger.info("Workflow engine started")
+        self._tasks = [
+            asyncio.create_task(self._listen_loop(), name="gcz-ai-listen"),
+            asyncio.create_task(self._dispatch_loop(), name="gcz-ai-dispatch"),
+        ] + [
+            asyncio.create_task(self._worker_loop(), name=f"gcz-ai-worker-{i}")
+            for i in range(self._workers)
+        ]
+        logger.info("Workflow engine started", extra={"workers": self._workers, "claim_batch": self._claim_batch})
 
     async def stop(self) -> None:
+        """Stops claiming; workers finish the jobs already claimed."""
         self._stop_event.set()
-        if self._worker_task:
-            await self._worker_task
+        self._wake.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
         logger.info("Workflow engine stopped")
 
     async def enqueue_job(
@@ -110,56 +394,277 @@ class WorkflowEngine:
         job_type: str,
         payload: Dict[str, Any],
         max_attempts: int = 3,
+        priority: Union[int, str] = "normal",
+        run_at: Optional[datetime] = None,
     ) -> str:
+        """`run_at` is a naive timestamp in the database's timezone (default: now)."""
         job_id = str(uuid4())
+        # NOTIFY is delivered on commit, so listeners never see a missing row
         await DB.execute(
-            """
-            INSERT INTO ai_jobs (id, job_type, payload, max_attempts)
-            VALUES ($1, $2, $3::jsonb, $4)
+            f"""
+            WITH job AS (
+                INSERT INTO ai_jobs (id, job_type, payload, max_attempts, priority, run_at)
+                VALUES ($1, $2, $3::jsonb, $4, $5, COALESCE($6::timestamp, NOW()))
+                RETURNING job_type
+            )
+            SELECT pg_notify('{JOBS_CHANNEL}', job_type) FROM job
             """,
-            (job_id, job_type, payload, max_attempts),
+            (job_id, job_type, payload, max_attempts, priority_value(priority), run_at),
         )
         return job_id
 
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self._workers,
+            "active": self._active,
+            "running": {k: v for k, v in self._running.items() if v},
+            "listening": self._listening,
+        }
+
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        return await DB.fetchrow(
+        job = await DB.fetchrow(
             "SELECT * FROM ai_jobs WHERE id = $1",
             (job_id,),
         )
+        if job:
+            return job
+        return await DB.fetchrow(
+            "SELECT * FROM ai_jobs_archive WHERE id = $1",
+            (job_id,),
+        )
 
-    async def _worker_loop(self) -> None:
+    # --------------------------------------------------
+    #  Schedules
+    # --------------------------------------------------
+    async def add_schedule(self, schedule: JobSchedule) -> None:
+        """Creates or updates a recurring job; safe to call from every replica."""
+        if schedule.job_type not in WORKFLOW_REGISTRY:
+            raise ValueError(f"Unknown job_type: {schedule.job_type}")
+        row = await DB.fetchrow("SELECT NOW()::timestamp AS db_now")
+        if not row:
+            return
+        next_run_at = CronSchedule.parse(schedule.cron).next_after(row["db_now"])
+        await DB.execute(
+            UPSERT_SCHEDULE_SQL,
+            (
+                schedule.name,
+                schedule.job_type,
+                schedule.cron,
+                schedule.payload,
+                priority_value(schedule.priority),
+                schedule.max_attempts,
+                next_run_at,
+            ),
+        )
+        self._schedules_due = 0.0
+
+    async def sync_schedules(self, schedules: Iterable[JobSchedule]) -> None:
+        """Makes `schedules` the enabled set: upserts them and disables the rest."""
+        schedules = list(schedules)
+        for schedule in schedules:
+            await self.add_schedule(schedule)
+        await DB.execute(
+            """
+            UPDATE ai_job_schedules
+            SET enabled = FALSE, updated_at = NOW()
+            WHERE enabled AND NOT ($1::jsonb ? name)
+            """,
+            ([s.name for s in schedules],),
+        )
+        logger.info("Job schedules synced", extra={"schedules": [s.name for s in schedules]})
+
+    async def list_schedules(self) -> List[Dict[str, Any]]:
+        return await DB.fetch("SELECT * FROM ai_job_schedules ORDER BY name")
+
+    async def _fire_schedules(self) -> None:
+        if time.monotonic() < self._schedules_due:
+            return
+
+        for row in await DB.fetch(CLAIM_SCHEDULES_SQL, (SCHEDULE_LEASE_S,)):
+            try:
+                next_run_at = CronSchedule.parse(row["cron"]).next_after(row["db_now"])
+            except ValueError as exc:
+                logger.error("Invalid job schedule", extra={"schedule": row["name"], "error": str(exc)})
+                continue  # retried after the lease; fix or disable the row
+            fired = await DB.fetchrow(
+                FIRE_SCHEDULE_SQL,
+                (
+                    str(uuid4()),
+                    row["job_type"],
+                    row["payload"],
+                    row["max_attempts"],
+                    row["priority"],
+                    row["name"],
+                    next_run_at,
+                ),
+            )
+            if not fired:
+                logger.info("Scheduled job skipped, previous run still open", extra={"schedule": row["name"]})
+
+        row = await DB.fetchrow(
+            """
+            SELECT EXTRACT(EPOCH FROM (MIN(next_run_at) - NOW())) AS wait_s
+            FROM ai_job_schedules
+            WHERE enabled
+            """
+        )
+        wait_s = row.get("wait_s") if row else None
+        # Re-read periodically: other replicas may add or change schedules
+        wait_s = IDLE_POLL_S if wait_s is None else min(IDLE_POLL_S, max(0.05, float(wait_s)))
+        self._schedules_due = time.monotonic() + wait_s
+
+    # --------------------------------------------------
+    #  Dispatch
+    # --------------------------------------------------
+    async def _dispatch_loop(self) -> None:
+        next_maintenance = 0.0
         while not self._stop_event.is_set():
-            job = await self._claim_next_job()
-            if not job:
+            if time.monotonic() >= next_maintenance:
+                await self._maintain()
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL_S
+            await self._fire_schedules()
+
+            self._wake.clear()
+            free = self._workers - self._active
+            claimed = await self._claim_jobs(min(free, self._claim_batch)) if free > 0 else []
+
+            for job in claimed:
+                self._active += 1
+                self._running[job["job_type"]] = self._running.get(job["job_type"], 0) + 1
+                self._queue.put_nowait(job)
+
+            if claimed and len(claimed) == min(free, self._claim_batch):
+                continue  # more may be waiting
+
+            schedules_in = max(0.05, self._schedules_due - time.monotonic())
+            await self._idle(min(await self._idle_timeout(free > 0), schedules_in, MAINTENANCE_INTERVAL_S))
+
+        for _ in range(self._workers):
+            self._queue.put_nowait(None)
+
+    async def _idle(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _idle_timeout(self, has_capacity: bool) -> float:
+        if not self._listening:
+            return FALLBACK_POLL_S
+        if not has_capacity:
+            return IDLE_POLL_S  # a finishing worker wakes us
+        # Delayed jobs (retries) do not NOTIFY when they become due. Rows
+        # already due were just left unclaimed (type at its cap, or locked
+        # by another replica); a finishing worker or NOTIFY wakes us for
+        # those, so they must not turn this into a busy poll.
+        _, saturated = self._type_budgets()
+        row = await DB.fetchrow(
+            """
+            SELECT EXTRACT(EPOCH FROM (MIN(run_at) - NOW())) AS wait_s
+            FROM ai_jobs
+            WHERE status = 'queued'
+              AND run_at > NOW()
+              AND NOT ($1::jsonb ? job_type)
+            """,
+            (saturated,),
+        )
+        wait_s = row.get("wait_s") if row else None
+        if wait_s is None:
+            return IDLE_POLL_S
+        return min(IDLE_POLL_S, max(0.05, float(wait_s)))
+
+    def _type_budgets(self) -> Tuple[Dict[str, int], List[str]]:
+        """Free slots per capped job_type, and the capped types with none left."""
+        budgets: Dict[str, int] = {}
+        saturated: List[str] = []
+        for job_type, cap in self._type_limits.items():
+            remaining = cap - self._running.get(job_type, 0)
+            if remaining <= 0:
+                saturated.append(job_type)
+            else:
+                budgets[job_type] = remaining
+        return budgets, saturated
+
+    async def _claim_jobs(self, limit: int) -> List[Dict[str, Any]]:
+        budgets, saturated = self._type_budgets()
+        return await DB.fetch(
+            CLAIM_JOBS_SQL,
+            (limit * CLAIM_SCAN_FACTOR, budgets, limit, saturated, VISIBILITY_TIMEOUT_S),
+        )
+
+    async def _maintain(self) -> None:
+        """Reclaim expired leases and archive finished jobs (safe on every replica)."""
+        await DB.execute(REAP_DEAD_SQL)
+        reclaimed = await DB.fetch(REAP_REQUEUE_SQL)
+        if reclaimed:
+            logger.warning("Reclaimed jobs with expired leases", extra={"count": len(reclaimed)})
+        await DB.execute(ARCHIVE_SQL)
+        await DB.execute(PRUNE_ARCHIVE_SQL)
+
+    async def _listen_loop(self) -> None:
+        """Holds a dedicated LISTEN connection, reconnecting if it drops."""
+        while not self._stop_event.is_set():
+            conn = await DB.connect()
+            if conn is not None:
                 try:
-                    await asyncio.wait_for(self._stop_event.wait(), timeout=1.0)
-                except asyncio.TimeoutError:
-                    continue
-                continue
+                    await conn.add_listener(JOBS_CHANNEL, self._on_notify)
+                    self._listening = True
+                    self._wake.set()  # catch anything enqueued while we were down
+                    while not self._stop_event.is_set() and not conn.is_closed():
+                        await self._sleep_until_stop(LISTEN_RETRY_S)
+                except Exception as exc:
+                    logger.warning("LISTEN connection lost", extra={"error": str(exc)})
+                finally:
+                    self._listening = False
+                    if not conn.is_closed():
+                        await conn.close()
+
+            await self._sleep_until_stop(LISTEN_RETRY_S)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._wake.set()
+
+    async def _sleep_until_stop(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # --------------------------------------------------
+    #  Workers
+    # --------------------------------------------------
+    async def _worker_loop(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
 
             trace_id = job.get("id", str(uuid4()))
-            set_trace_id(trace_id)
-            result = await self._run_job(job)
-            await self._finalize_job(job, result)
+            set_trace_id(str(trace_id))
+            renew = asyncio.create_task(self._renew_lease(job["id"], job.get("attempts", 0)))
+            try:
+                result = await self._run_job(job)
+            finally:
+                renew.cancel()
+            try:
+                await self._finalize_job(job, result)
+            finally:
+                self._active -= 1
+                self._running[job["job_type"]] -= 1
+                self._wake.set()
 
-    async def _claim_next_job(self) -> Optional[Dict[str, Any]]:
-        return await DB.fetchrow(
-            """
-            UPDATE ai_jobs
-            SET status = 'running',
-                attempts = attempts + 1,
-                updated_at = NOW()
-            WHERE id = (
-                SELECT id FROM ai_jobs
-                WHERE status = 'queued'
-                  AND run_at <= NOW()
-                ORDER BY created_at ASC
-                FOR UPDATE SKIP LOCKED
-                LIMIT 1
+    async def _renew_lease(self, job_id, attempts: int) -> None:
+        """Keeps a long job's lease ahead of the reaper while it runs."""
+        while True:
+            await asyncio.sleep(LEASE_RENEW_S)
+            await DB.execute(
+                """
+                UPDATE ai_jobs
+                SET locked_until = NOW() + make_interval(secs => $2)
+                WHERE id = $1 AND status = 'running' AND attempts = $3
+                """,
+                (job_id, VISIBILITY_TIMEOUT_S, attempts),
             )
-            RETURNING *;
-            """
-        )
 
     async def _run_job(self, job: Dict[str, Any]) -> JobResult:
         job_type = job.get("job_type")
@@ -167,55 +672,82 @@ class WorkflowEngine:
         if not handler:
             return JobResult(False, {}, error=f"Unknown job_type: {job_type}")
 
+        payload = job.get("payload") or {}
+        if isinstance(payload, str):  # jsonb without a codec comes back as text
+            payload = json.loads(payload)
+
         try:
-            output = await handler(job.get("payload", {}), self._ai_client)
+            output = await handler(payload, self._ai_client)
             return JobResult(True, output)
         except Exception as exc:
             logger.error("Job execution failed", extra={"job_id": job.get("id"), "error": str(exc)})
             return JobResult(False, {}, error=str(exc))
 
     async def _finalize_job(self, job: Dict[str, Any], result: JobResult) -> None:
+        """
+        Records the outcome, but only while this worker still owns the job:
+        after a lost lease the reaper may have requeued it (attempts then
+        differs once reclaimed), and that owner's state must not be
+        overwritten.
+        """
         job_id = job.get("id")
         attempts = job.get("attempts", 0)
         max_attempts = job.get("max_attempts", 3)
 
         if result.success:
-            await DB.execute(
+            row = await DB.fetchrow(
                 """
                 UPDATE ai_jobs
                 SET status = 'succeeded',
+                    locked_until = NULL,
                     updated_at = NOW(),
                     last_error = NULL
-                WHERE id = $1
+                WHERE id = $1 AND status = 'running' AND attempts = $2
+                RETURNING id
                 """,
-                (job_id,),
+                (job_id, attempts),
             )
+            if row is None:
+                logger.warning("Job result dropped, lease lost", extra={"job_id": job_id})
             return
 
         if attempts >= max_attempts:
-            await DB.execute(
+            row = await DB.fetchrow(
                 """
+                WITH dead AS (
+                    DELETE FROM ai_jobs
+                    WHERE id = $1 AND status = 'running' AND attempts = $2
+                    RETURNING id, job_type, payload, attempts
+                )
                 INSERT INTO ai_dead_letters (id, job_type, payload, error, attempts)
-                VALUES ($1, $2, $3::jsonb, $4, $5)
+                SELECT id, job_type, payload, $3, attempts FROM dead
+                RETURNING id
                 """,
-                (job_id, job.get("job_type"), job.get("payload", {}), result.error, attempts),
+                (job_id, attempts, result.error),
             )
-            await DB.execute("DELETE FROM ai_jobs WHERE id = $1", (job_id,))
+            if row is None:
+                logger.warning("Job result dropped, lease lost", extra={"job_id": job_id})
+                return
             logger.error("Job moved to dead letter queue", extra={"job_id": job_id})
             return
 
-        await DB.execute(
+        delay = retry_delay(attempts)
+        row = await DB.fetchrow(
             """
             UPDATE ai_jobs
             SET status = 'queued',
+                locked_until = NULL,
                 updated_at = NOW(),
-                last_error = $2,
-                run_at = NOW() + INTERVAL '5 seconds'
-            WHERE id = $1
+                last_error = $3,
+                run_at = NOW() + make_interval(secs => $4)
+            WHERE id = $1 AND status = 'running' AND attempts = $2
+            RETURNING id
             """,
-            (job_id, result.error or "unknown error"),
+            (job_id, attempts, result.error or "unknown error", delay),
         )
-        logger.warning("Job re-queued after failure", extra={"job_id": job_id})
-
+        if row is None:
+            logger.warning("Job result dropped, lease lost", extra={"job_id": job_id})
+            return
+        logger.warning("Job re-queued after failure", extra={"job_id": job_id, "retry_in_s": round(delay, 1)})
 
 __all__ = ["WorkflowEngine"]
@@ -1,8 +1,11 @@
 from ai.workflows.tasks import (
+    backend_script,
+    workflow_ai_backup,
     workflow_ai_generate,
     workflow_echo,
     workflow_health_scan,
     workflow_memory_add,
+    workflow_promo_intel_scan,
 )
 
 WORKFLOW_REGISTRY = {
@@ -10,4 +13,12 @@ WORKFLOW_REGISTRY = {
     "memory_add": workflow_memory_add,
     "ai_generate": workflow_ai_generate,
     "echo": workflow_echo,
+    # Scheduled maintenance (see ai/workflows/schedules.py)
+    "sync_casinos": backend_script("sync_casinos"),
+    "sync_promos": backend_script("sync_promos"),
+    "sync_raffles": backend_script("sync_raffles"),
+    "sync_giveaways": backend_script("sync_giveaways"),
+    "rebuild_redirects": backend_script("rebuild_redirects"),
+    "ai_backup": workflow_ai_backup,
+    "promo_intel_scan": workflow_promo_intel_scan,
 }
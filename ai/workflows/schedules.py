@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Union
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# minute, hour, day of month, month, day of week (0 or 7 = Sunday)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Give up on expressions that never match (e.g. "0 0 30 2 *")
+MAX_LOOKAHEAD_YEARS = 5
+
+
+def _parse_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, _, end_text = base.partition("-")
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = high if step_text else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field: {text!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """Standard 5-field cron expression (plus @hourly/@daily/... aliases)."""
+
+    expression: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_field(text, low, high) for text, (low, high) in zip(fields, FIELD_RANGES)
+            )
+        except ValueError as exc:
+            raise ValueError(f"Invalid cron expression {expression!r}: {exc}") from exc
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(d % 7 for d in weekdays),
+            any_day=fields[2] == "*",
+            any_weekday=fields[4] == "*",
+        )
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Cron rule: when both are restricted, either one may match
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment` (same tz-ness as `moment`)."""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t.year + MAX_LOOKAHEAD_YEARS
+        while t.year <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+@dataclass(frozen=True)
+class JobSchedule:
+    """A recurring ai_jobs entry, stored in ai_job_schedules by name."""
+
+    name: str
+    job_type: str
+    cron: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    priority: Union[int, str] = "normal"
+    max_attempts: int = 3
+
+    def __post_init__(self) -> None:
+        CronSchedule.parse(self.cron)  # fail at startup, not at fire time
+
+
+# The loops and cron entries this replaces: HealthMonitor (every
+# AI_MONITOR_INTERVAL), the backend sync scripts, ai_backup.py and the
+# monthly sandbox promo intel scan.
+DEFAULT_SCHEDULES: List[JobSchedule] = [
+    JobSchedule("health_scan", "health_scan", "* * * * *", priority="high", max_attempts=1),
+    JobSchedule("sync_promos", "sync_promos", "*/10 * * * *"),
+    JobSchedule("sync_casinos", "sync_casinos", "*/15 * * * *"),
+    JobSchedule("rebuild_redirects", "rebuild_redirects", "5 * * * *"),
+    JobSchedule("sync_raffles", "sync_raffles", "*/30 * * * *", priority="low"),
+    JobSchedule("sync_giveaways", "sync_giveaways", "*/30 * * * *", priority="low"),
+    JobSchedule("ai_backup", "ai_backup", "30 3 * * *", priority="low", max_attempts=2),
+]
+
+SANDBOX_SCHEDULES: List[JobSchedule] = [
+    JobSchedule("promo_intel_scan", "promo_intel_scan", "0 4 1 * *", priority="low", max_attempts=1),
+]
+
+
+def default_schedules(environment: str, overrides: Optional[Mapping[str, str]] = None) -> List[JobSchedule]:
+    """
+    Built-in schedules for this environment. `overrides` maps a schedule
+    name to a replacement cron expression, or "off" to disable it.
+    """
+    overrides = overrides or {}
+    schedules = DEFAULT_SCHEDULES + (SANDBOX_SCHEDULES if environment == "sandbox" else [])
+    result: List[JobSchedule] = []
+    for schedule in schedules:
+        cron = overrides.get(schedule.name, schedule.cron)
+        if cron == "off":
+            continue
+        result.append(
+            JobSchedule(
+                schedule.name,
+                schedule.job_type,
+                cron,
+                schedule.payload,
+                schedule.priority,
+                schedule.max_attempts,
+            )
+        )
+    return result
+
+
+__all__ = ["CronSchedule", "JobSchedule", "DEFAULT_SCHEDULES", "default_schedules"]
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
 
 from ai.ai_logger import get_logger
 from ai.health_engine import run_health_scan
@@ -9,6 +13,58 @@ from ai.tools.ai_clients import AIClient
 
 logger = get_logger("gcz-ai.workflows")
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+# Seconds a script may run before it is killed (the job then retries)
+SCRIPT_TIMEOUT_S = 1800.0
+# Output kept in the job result / error
+OUTPUT_TAIL_CHARS = 2000
+
+Workflow = Callable[[Dict[str, Any], AIClient], Awaitable[Dict[str, Any]]]
+
+
+async def _run_script(name: str, args: List[str], cwd: Path) -> Dict[str, Any]:
+    """
+    Runs a maintenance script in its own interpreter. The backend scripts
+    need backend/ on sys.path and their own DB pool/logging, so they are
+    never imported into the AI process.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        *args,
+        cwd=str(cwd),
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=SCRIPT_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise RuntimeError(f"{name} timed out after {SCRIPT_TIMEOUT_S:.0f}s")
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
+
+    output = out.decode("utf-8", errors="replace")[-OUTPUT_TAIL_CHARS:]
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} exited with {proc.returncode}: {output}")
+    logger.info("Script finished", extra={"script": name})
+    return {"ok": True, "output": output}
+
+
+def backend_script(name: str) -> Workflow:
+    """Workflow running one of backend/scripts (`python -m scripts <name>`)."""
+
+    async def workflow(payload: Dict[str, Any], ai_client: AIClient) -> Dict[str, Any]:
+        return await _run_script(name, ["-m", "scripts", name], BACKEND_ROOT)
+
+    workflow.__name__ = f"workflow_{name}"
+    return workflow
+
 
 async def workflow_health_scan(payload: Dict[str, Any], ai_client: AIClient) -> Dict[str, Any]:
     logger.info("Workflow health_scan started")
@@ -37,6 +93,15 @@ async def workflow_ai_generate(payload: Dict[str, Any], ai_client: AIClient) ->
     }
 
 
+async def workflow_ai_backup(payload: Dict[str, Any], ai_client: AIClient) -> Dict[str, Any]:
+    return await _run_script("ai_backup", [str(REPO_ROOT / "ai" / "ai_backup.py")], REPO_ROOT)
+
+
+async def workflow_promo_intel_scan(payload: Dict[str, Any], ai_client: AIClient) -> Dict[str, Any]:
+    # Refuses to run outside GCZ_ENV=sandbox
+    return await _run_script("promo_intel_scan", ["-m", "ai.sandbox.promo_intel_scan"], REPO_ROOT)
+
+
 async def workflow_echo(payload: Dict[str, Any], ai_client: AIClient) -> Dict[str, Any]:
     return {"ok": True, "payload": payload}
 
@@ -45,5 +110,8 @@ __all__ = [
     "workflow_health_scan",
     "workflow_memory_add",
     "workflow_ai_generate",
+    "workflow_ai_backup",
+    "workflow_promo_intel_scan",
+    "backend_script",
     "workflow_echo",
 ]
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+
+"""
+backend/catalog.py
+
+Canonical loader for master_affiliates.csv.
+
+The CSV is parsed once per change into an immutable Catalog of
+__slots__ records with stable slugs and normalized lookup keys.
+Consumers (redirect engine, drops engine, import/sync scripts) read
+from the shared loader instead of parsing the file themselves, and
+long-running services subscribe to be handed each new Catalog.
+"""
+
+import asyncio
+import csv
+import os
+import re
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from backend.logger import get_logger
+
+CSV_PATH = os.getenv("GCZ_AFFILIATES_CSV", "/var/www/html/gcz/master_affiliates.csv")
+REFRESH_SECONDS = 60
+
+logger = get_logger("gcz-catalog")
+
+# Columns carried from the CSV (superset of the current file header;
+# matches what affiliates_service.upsert_affiliate reads).
+FIELDS = (
+    "name",
+    "affiliate_url",
+    "priority",
+    "category",
+    "status",
+    "level",
+    "date_added",
+    "bonus_code",
+    "bonus_description",
+    "icon_url",
+    "resolved_domain",
+    "redemption_speed",
+    "redemption_minimum",
+    "redemption_type",
+    "created_by",
+    "source",
+    "top_pick",
+    "jurisdiction",
+    "sc_allowed",
+    "crypto_allowed",
+    "cwallet_allowed",
+    "lootbox_allowed",
+    "show_in_profile",
+    "sort_order",
+    "slug",
+    "description",
+)
+
+# Suffixes stripped from names to build lookup aliases
+# ("Stake.us" -> "stake", "Fortune Coins Casino" -> "fortunecoins").
+ALIAS_SUFFIXES = ("casino", "sweeps", "social", "com", "us", "net", "io", "gg")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+# ============================================================
+#  NORMALIZATION (single source of truth)
+# ============================================================
+
+@lru_cache(maxsize=8192)
+def normalize_key(name: Optional[str]) -> str:
+    """Lookup key: lowercase alphanumerics only. Memoized."""
+    if not name:
+        return ""
+    return _NON_ALNUM.sub("", name.lower())
+
+
+def slugify(name: Optional[str]) -> str:
+    """Slug as stored in affiliates_master.slug."""
+    if not name:
+        return ""
+    return name.lower().strip().replace(" ", "-").replace("_", "-")
+
+
+def category_key(category: Optional[str]) -> str:
+    """Category bucket used by the drops engine URLs."""
+    if not category:
+        return "unknown"
+    return category.lower().strip().replace(" ", "")
+
+
+# ============================================================
+#  RECORDS
+# ============================================================
+
+class AffiliateRecord:
+    """One CSV row. Raw column values are kept verbatim (CSV strings)."""
+
+    __slots__ = FIELDS + ("key", "slug_key", "category_key", "aliases", "icon")
+
+    def __init__(self, row: Dict[str, Optional[str]]):
+        for field in FIELDS:
+            setattr(self, field, row.get(field))
+
+        name = self.name
+        self.slug = self.slug or slugify(name)
+        self.key = normalize_key(name)
+        self.slug_key = normalize_key(self.slug)
+        self.category_key = category_key(self.category)
+        self.aliases = self._alias_keys()
+        self.icon = self.icon_url or (
+            f"https://www.google.com/s2/favicons?sz=256&domain={self.resolved_domain}"
+            if self.resolved_domain
+            else None
+        )
+
+    @property
+    def linkable(self) -> bool:
+        return bool(self.name and self.affiliate_url)
+
+    def _alias_keys(self) -> Tuple[str, ...]:
+        """Secondary lookup keys: slug, domain and name variants."""
+        candidates = [self.slug, self.resolved_domain]
+
+        domain = (self.resolved_domain or "").lower()
+        if "." in domain:
+            candidates.append(domain.rsplit(".", 1)[0])
+
+        for suffix in ALIAS_SUFFIXES:
+            if self.key.endswith(suffix) and len(self.key) > len(suffix) + 2:
+                candidates.append(self.key[: -len(suffix)])
+
+        keys: List[str] = []
+        for candidate in candidates:
+            key = normalize_key(candidate)
+            if key and key != self.key and key not in keys:
+                keys.append(key)
+        return tuple(keys)
+
+    def as_row(self) -> Dict[str, str]:
+        """Plain dict of the columns present in the CSV."""
+        return {field: getattr(self, field) for field in FIELDS if getattr(self, field) is not None}
+
+
+class Catalog:
+    """
+    Immutable record set built from one version of the CSV.
+    `keys` maps primary keys and aliases to records; primary names win.
+    """
+
+    __slots__ = ("records", "by_key", "by_slug", "keys", "signature", "built_at")
+
+    def __init__(self, records: List[AffiliateRecord], signature: Optional[Tuple[int, int]]):
+        self.records: Tuple[AffiliateRecord, ...] = tuple(records)
+
+        by_key: Dict[str, AffiliateRecord] = {}
+        by_slug: Dict[str, AffiliateRecord] = {}
+        aliases: Dict[str, AffiliateRecord] = {}
+        for record in self.records:
+            by_key[record.key] = record
+            by_slug.setdefault(record.slug, record)
+            for alias in record.aliases:
+                aliases.setdefault(alias, record)
+
+        self.by_key: Mapping[str, AffiliateRecord] = MappingProxyType(by_key)
+        self.by_slug: Mapping[str, AffiliateRecord] = MappingProxyType(by_slug)
+        self.keys: Mapping[str, AffiliateRecord] = MappingProxyType({**aliases, **by_key})
+        self.signature = signature
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def linkable(self) -> Tuple[AffiliateRecord, ...]:
+        return tuple(r for r in self.records if r.linkable)
+
+    def lookup(self, name: Optional[str]) -> Optional[AffiliateRecord]:
+        return self.keys.get(normalize_key(name))
+
+
+EMPTY_CATALOG = Catalog([], None)
+
+
+# ============================================================
+#  LOADER
+# ============================================================
+
+Subscriber = Callable[[Catalog], None]
+
+
+class CatalogLoader:
+    """
+    Stat-gated loader. Reparses only when (mtime_ns, size) changes and
+    publishes the new Catalog with a single reference swap, then calls
+    each subscriber with it (in a worker thread, so subscribers may do
+    CPU work such as pre-encoding responses).
+    """
+
+    def __init__(self, path: str = CSV_PATH):
+        self.path = path
+        self._catalog: Catalog = EMPTY_CATALOG
+        self._subscribers: List[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+
+    # --------------------------------------------------
+    @property
+    def current(self) -> Catalog:
+        return self._catalog
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Register a callback; it is invoked immediately if a catalog is loaded."""
+        self._subscribers.append(callback)
+        if self._catalog is not EMPTY_CATALOG:
+            self._notify_one(callback, self._catalog)
+
+    # --------------------------------------------------
+    def signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def parse(self, signature: Optional[Tuple[int, int]]) -> Optional[Catalog]:
+        """Parse the CSV into a new Catalog (sync). None on failure."""
+        records: List[AffiliateRecord] = []
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if not row.get("name"):
+                        logger.warning(f"[CATALOG] Skipping row without name: {row}")
+                        continue
+                    records.append(AffiliateRecord(row))
+        except Exception as e:
+            logger.error(f"[CATALOG] Failed to load {self.path}: {e}")
+            return None
+
+        catalog = Catalog(records, signature)
+        logger.info(
+            f"[CATALOG] Loaded {len(catalog)} affiliates "
+            f"({len(catalog.linkable)} linkable, {len(catalog.keys)} keys)"
+        )
+        return catalog
+
+    def load_sync(self, force: bool = False) -> Catalog:
+        """Blocking load for scripts. Returns the current catalog."""
+        signature = self.signature()
+        if force or signature != self._catalog.signature:
+            catalog = self.parse(signature)
+            if catalog is not None:
+                self._publish(catalog)
+        return self._catalog
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Reload if the file changed. Returns True when a new catalog was published."""
+        signature = await asyncio.to_thread(self.signature)
+        if not force and signature == self._catalog.signature:
+            return False
+
+        catalog = await asyncio.to_thread(self.parse, signature)
+        if catalog is None:
+            return False
+
+        await asyncio.to_thread(self._publish, catalog)
+        return True
+
+    # --------------------------------------------------
+    def _publish(self, catalog: Catalog) -> None:
+        self._catalog = catalog
+        for callback in list(self._subscribers):
+            self._notify_one(callback, catalog)
+
+    def _notify_one(self, callback: Subscriber, catalog: Catalog) -> None:
+        try:
+            callback(catalog)
+        except Exception as e:
+            logger.error(f"[CATALOG] Subscriber {callback!r} failed: {e}")
+
+    # --------------------------------------------------
+    async def start(self, interval: int = REFRESH_SECONDS) -> None:
+        """Initial load + background refresher (idempotent per process)."""
+        if self._task and not self._task.done():
+            return
+        await self.refresh(force=self._catalog is EMPTY_CATALOG)
+        self._task = asyncio.create_task(self._refresh_loop(interval))
+
+    async def _refresh_loop(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"[CATALOG] Refresh failed: {e}")
+
+
+CATALOG = CatalogLoader()
+
+
+def get_catalog() -> CatalogLoader:
+    return CATALOG
+
+
+__all__ = [
+    "AffiliateRecord",
+    "Catalog",
+    "CatalogLoader",
+    "EMPTY_CATALOG",
+    "CATALOG",
+    "get_catalog",
+    "normalize_key",
+    "slugify",
+    "category_key",
+]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+"""
+Buffered affiliate click tracking for the redirect engine.
+
+Redirect handlers call ClickTracker.record(), which only does a
+put_nowait() onto a bounded in-process queue — it never awaits and never
+touches the DB. A single background task drains the queue and writes
+batches to affiliate_clicks every CLICK_FLUSH_MS or CLICK_BATCH_SIZE
+events, whichever comes first. When the queue is full, events are
+dropped and counted instead of slowing the redirect down.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+CLICK_QUEUE_MAX = int(os.getenv("CLICK_QUEUE_MAX", "10000"))
+CLICK_BATCH_SIZE = int(os.getenv("CLICK_BATCH_SIZE", "500"))
+CLICK_FLUSH_MS = int(os.getenv("CLICK_FLUSH_MS", "250"))
+CLICK_SHUTDOWN_TIMEOUT_S = float(os.getenv("CLICK_SHUTDOWN_TIMEOUT_S", "10"))
+
+# (slug, referrer, user_agent, ip_address, clicked_at)
+ClickRecord = Tuple[str, Optional[str], Optional[str], Optional[str], datetime]
+
+# The CSV the redirect engine serves from carries no affiliate ids, so the
+# id is resolved server-side by slug in the same statement as the insert.
+INSERT_CLICKS_SQL = """
+    INSERT INTO affiliate_clicks (affiliate_id, slug, referrer, user_agent, ip_address, clicked_at)
+    SELECT am.id, c.slug, c.referrer, c.user_agent, c.ip_address, c.clicked_at
+    FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::timestamp[])
+         AS c(slug, referrer, user_agent, ip_address, clicked_at)
+    JOIN LATERAL (
+        SELECT id FROM affiliates_master WHERE slug = c.slug ORDER BY id LIMIT 1
+    ) am ON TRUE
+"""
+
+
+class ClickTracker:
+    def __init__(
+        self,
+        get_pool: Callable[[], Awaitable[Any]],
+        logger,
+        max_queue: int = CLICK_QUEUE_MAX,
+        batch_size: int = CLICK_BATCH_SIZE,
+        flush_ms: int = CLICK_FLUSH_MS,
+    ):
+        self._get_pool = get_pool
+        self._logger = logger
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._flush_s = flush_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "unmatched": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_flush_at": None,
+        }
+
+    # --------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+        }
+
+    # --------------------------------------------------
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._task = asyncio.create_task(self._run(), name="gcz-click-tracker")
+
+    async def stop(self) -> None:
+        """Stop accepting clicks and flush whatever is still queued."""
+        if not self._task:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._task, timeout=CLICK_SHUTDOWN_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            self._logger.error("clicks.shutdown_timeout", extra={"queued": self._queue.qsize()})
+        self._task = None
+
+    # --------------------------------------------------
+    def record(
+        self,
+        slug: str,
+        referrer: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None,
+    ) -> bool:
+        """Enqueue a click. Never blocks; returns False if the click was dropped."""
+        if self._stopping or self._queue is None:
+            self.stats["dropped"] += 1
+            return False
+        try:
+            self._queue.put_nowait((slug, referrer, user_agent, ip_address, datetime.utcnow()))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    # --------------------------------------------------
+    async def _run(self) -> None:
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> List[ClickRecord]:
+        """Wait for the first click, then gather until the batch fills or the window closes."""
+        queue = self._queue
+        batch: List[ClickRecord] = []
+
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=self._flush_s))
+        except asyncio.TimeoutError:
+            return batch
+
+        deadline = time.monotonic() + self._flush_s
+        while len(batch) < self._batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: List[ClickRecord]) -> None:
+        columns = list(zip(*batch))
+        try:
+            pool = await self._get_pool()
+            status = await pool.execute(INSERT_CLICKS_SQL, *columns)
+        except Exception:
+            self.stats["failed"] += len(batch)
+            self._logger.exception("clicks.flush_failed", extra={"batch": len(batch)})
+            return
+
+        # asyncpg returns "INSERT 0 <rows>"
+        written = int(status.rsplit(" ", 1)[-1]) if status else 0
+        self.stats["written"] += written
+        self.stats["unmatched"] += len(batch) - written
+        self.stats["batches"] += 1
+        self.stats["last_flush_at"] = time.time()
@@ -2,7 +2,7 @@ import asyncpg
 import asyncio
 import os
 
-NEON_URL = os.getenv("GCZ_DB")
+NEON_URL = os.getenv("GCZ_DB") or os.getenv("DATABASE_URL")
 
 _pool = None
 _pool_lock = asyncio.Lock()
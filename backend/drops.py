@@ -1,21 +1,27 @@
 #!/usr/bin/env python3
 
-import csv
-import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
 import time
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from backend.catalog import CATALOG, REFRESH_SECONDS, Catalog, category_key
 from backend.logging_config import (
     RequestContextMiddleware,
     configure_logging,
     get_request_id,
 )
 
-CSV_PATH = "/var/www/html/gcz/master_affiliates.csv"
-REFRESH_SECONDS = 60
+DROPS_GZIP = os.getenv("DROPS_GZIP", "true").lower() == "true"
+GZIP_MIN_BYTES = 1024
+CACHE_CONTROL = f"public, max-age={REFRESH_SECONDS}"
 
 logger = configure_logging("gcz-drops")
 
@@ -23,78 +29,119 @@ app = FastAPI(title="GambleCodez Drops Engine")
 app.state.started_at = time.time()
 app.add_middleware(RequestContextMiddleware, logger=logger)
 
-DROPS: List[Dict[str, Any]] = []
-DROPS_BY_CATEGORY: Dict[str, List[Dict[str, Any]]] = {}
 
+def encode_json(content: Any) -> bytes:
+    """Same encoding JSONResponse uses, done once per snapshot instead of per request."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
 
-def normalize(s: str | None) -> str:
-    if not s:
-        return "unknown"
-    return s.lower().strip().replace(" ", "")
 
+class EncodedPayload:
+    """Pre-serialized JSON body with its strong ETag and optional gzip variant."""
 
-def load_drops_sync():
-    """Load drops from the master affiliates CSV (sync, safe)."""
-    new_list = []
-    new_categories = {}
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
 
-    try:
-        with open(CSV_PATH, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-
-            for row in reader:
-                # Validate required fields
-                if not row.get("name") or not row.get("affiliate_url"):
-                    logger.warning("drops.invalid_row", extra={"row": row})
-                    continue
-
-                entry = {
-                    "name": row.get("name"),
-                    "url": row.get("affiliate_url"),
-                    "category": row.get("category"),
-                    "level": row.get("level"),
-                    "icon": row.get("icon_url"),
-                    "bonus_code": row.get("bonus_code"),
-                    "bonus_description": row.get("bonus_description"),
-                }
-
-                new_list.append(entry)
-
-                cat = normalize(row.get("category"))
-                new_categories.setdefault(cat, []).append(entry)
-
-        logger.info(
-            "drops.loaded",
-            extra={"drops": len(new_list), "categories": len(new_categories)},
+    def __init__(self, content: Any):
+        self.body = encode_json(content)
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.gzip_body = (
+            gzip.compress(self.body, compresslevel=6, mtime=0)
+            if DROPS_GZIP and len(self.body) >= GZIP_MIN_BYTES
+            else None
         )
-        return new_list, new_categories
+        self.gzip_etag = self.etag[:-1] + '-gz"'
 
-    except Exception:
-        logger.exception("drops.load_failed")
-        return [], {}
 
+class DropsSnapshot:
+    """
+    Immutable result of one CSV load. Every response body is encoded here,
+    once, and handlers only pick the right bytes. Published by swapping
+    the module-level SNAPSHOT reference.
+    """
 
-async def refresh_loop():
-    """Async background refresher."""
-    global DROPS, DROPS_BY_CATEGORY
+    __slots__ = ("version", "drops", "all", "categories", "top", "entries", "built_at")
 
-    while True:
-        drops, categories = await asyncio.to_thread(load_drops_sync)
-        DROPS = drops
-        DROPS_BY_CATEGORY = categories
-        await asyncio.sleep(REFRESH_SECONDS)
+    def __init__(self, drops: List[Dict[str, Any]], categories: Dict[str, List[Dict[str, Any]]]):
+        self.drops = tuple(drops)
+        self.all = EncodedPayload(drops)
+        self.version = self.all.etag.strip('"')
+        self.categories: Mapping[str, EncodedPayload] = MappingProxyType(
+            {key: EncodedPayload(items) for key, items in categories.items()}
+        )
+        self.top = EncodedPayload(
+            [d for d in drops if (d.get("level") or "").lower() == "top"]
+        )
+        self.entries: Tuple[EncodedPayload, ...] = tuple(EncodedPayload(d) for d in drops)
+        self.built_at = time.time()
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Load once and start async refresher."""
-    global DROPS, DROPS_BY_CATEGORY
+SNAPSHOT = DropsSnapshot([], {})
+
+
+def serve_payload(request: Request, payload: EncodedPayload) -> Response:
+    """Serve a pre-encoded payload with If-None-Match / gzip negotiation."""
+    use_gzip = payload.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", "")
+    etag = payload.gzip_etag if use_gzip else payload.etag
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match == "*" or etag in if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzip_body, media_type="application/json", headers=headers)
 
-    drops, categories = await asyncio.to_thread(load_drops_sync)
-    DROPS = drops
-    DROPS_BY_CATEGORY = categories
+    return Response(payload.body, media_type="application/json", headers=headers)
 
-    asyncio.create_task(refresh_loop())
+
+def build_snapshot(catalog: Catalog) -> DropsSnapshot:
+    """Derive the drops view from a catalog and pre-encode every response."""
+    new_list = []
+    new_categories = {}
+
+    for record in catalog.linkable:
+        entry = {
+            "name": record.name,
+            "url": record.affiliate_url,
+            "category": record.category,
+            "level": record.level,
+            "icon": record.icon_url,
+            "bonus_code": record.bonus_code,
+            "bonus_description": record.bonus_description,
+        }
+
+        new_list.append(entry)
+        new_categories.setdefault(record.category_key, []).append(entry)
+
+    return DropsSnapshot(new_list, new_categories)
+
+
+def on_catalog(catalog: Catalog) -> None:
+    """Catalog subscriber: rebuild and swap the drops snapshot."""
+    global SNAPSHOT
+
+    SNAPSHOT = build_snapshot(catalog)
+    logger.info(
+        "drops.loaded",
+        extra={
+            "drops": len(SNAPSHOT.drops),
+            "categories": len(SNAPSHOT.categories),
+            "version": SNAPSHOT.version,
+        },
+    )
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Subscribe to the shared catalog (loads once, then refreshes on change)."""
+    CATALOG.subscribe(on_catalog)
+    await CATALOG.start()
 
 
 @app.exception_handler(Exception)
@@ -118,7 +165,8 @@ def drops_health():
     return {
         "status": "ok",
         "service": "gcz-drops",
-        "count": len(DROPS),
+        "count": len(SNAPSHOT.drops),
+        "version": SNAPSHOT.version,
         "uptime_s": int(time.time() - app.state.started_at),
     }
 
@@ -128,7 +176,8 @@ def drops_health_root():
     return {
         "status": "ok",
         "service": "gcz-drops",
-        "count": len(DROPS),
+        "count": len(SNAPSHOT.drops),
+        "version": SNAPSHOT.version,
         "uptime_s": int(time.time() - app.state.started_at),
     }
 
@@ -138,8 +187,8 @@ def drops_health_root():
 # ------------------------------------------------------------
 
 @app.get("/api/drops/list")
-def drops_list():
-    return JSONResponse(content=DROPS)
+async def drops_list(request: Request):
+    return serve_payload(request, SNAPSHOT.all)
 
 
 # ------------------------------------------------------------
@@ -147,11 +196,11 @@ def drops_list():
 # ------------------------------------------------------------
 
 @app.get("/api/drops/random")
-def drops_random():
-    if not DROPS:
+async def drops_random():
+    entries = SNAPSHOT.entries
+    if not entries:
         raise HTTPException(status_code=404, detail="No drops available")
-    import random
-    return JSONResponse(content=random.choice(DROPS))
+    return Response(random.choice(entries).body, media_type="application/json")
 
 
 # ------------------------------------------------------------
@@ -159,11 +208,11 @@ def drops_random():
 # ------------------------------------------------------------
 
 @app.get("/api/drops/category/{category}")
-def drops_by_category(category: str):
-    key = normalize(category)
-    if key not in DROPS_BY_CATEGORY:
+async def drops_by_category(category: str, request: Request):
+    payload = SNAPSHOT.categories.get(category_key(category))
+    if payload is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    return JSONResponse(content=DROPS_BY_CATEGORY[key])
+    return serve_payload(request, payload)
 
 
 # ------------------------------------------------------------
@@ -171,9 +220,8 @@ def drops_by_category(category: str):
 # ------------------------------------------------------------
 
 @app.get("/api/drops/top")
-def drops_top():
-    top = [d for d in DROPS if d.get("level", "").lower() == "top"]
-    return JSONResponse(content=top)
+async def drops_top(request: Request):
+    return serve_payload(request, SNAPSHOT.top)
 
 
 # ------------------------------------------------------------
@@ -23,11 +23,17 @@ from backend.logging_config import (
     configure_logging,
     get_request_id,
 )
-from middleware.rate_limit import rate_limiter
 
 settings = get_settings()
 load_env(settings.ENV_FILE)
 
+# After load_env: these read provider keys and tuning from the environment
+from middleware.rate_limit import rate_limiter, rate_limit_snapshot
+from services.cache import CACHE, invalidation_listener
+from services.roles import ROLE_SERVICE
+from services.ai.http_client import close_http_client
+from services.ai.semantic_cache import AI_RESPONSE_CACHE
+
 logger = configure_logging("gcz-main")
 
 # ============================
@@ -68,6 +74,25 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.on_event("shutdown")
+async def close_ai_http_client():
+    await close_http_client()
+
+
+# Scripts (sync_casinos, CSV import...) publish cache invalidations
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    app.state.cache_listener = asyncio.create_task(invalidation_listener())
+
+
+@app.on_event("shutdown")
+async def stop_cache_invalidation_listener():
+    task = getattr(app.state, "cache_listener", None)
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
 # ============================
 # RATE LIMIT MIDDLEWARE
 # ============================
@@ -92,6 +117,7 @@ from routes import (
     auth_roles_router,
     drops_intake_router,
     live_dashboard_router,
+    exports_router,
 )
 
 # ============================
@@ -103,6 +129,10 @@ async def api_health():
         "status": "ok",
         "service": "gcz-api",
         "uptime_s": int(time.time() - app.state.started_at),
+        "cache": CACHE.snapshot(),
+        "rate_limit": rate_limit_snapshot(),
+        "roles": ROLE_SERVICE.snapshot(),
+        "ai_cache": AI_RESPONSE_CACHE.snapshot(),
     }
 
 
@@ -306,3 +336,4 @@ app.include_router(sc_router)
 app.include_router(auth_roles_router)
 app.include_router(drops_intake_router)
 app.include_router(live_dashboard_router)
+app.include_router(exports_router)
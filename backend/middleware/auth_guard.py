@@ -1,9 +1,8 @@
 from fastapi import Request, HTTPException
-from backend.config import get_settings
+from fastapi.responses import JSONResponse
 from backend.logger import get_logger
-import jwt
+from services.auth import bearer_token, principal_from_token
 
-settings = get_settings()
 logger = get_logger("gcz-auth-guard")
 
 
@@ -12,34 +11,16 @@ async def auth_guard(request: Request, call_next):
     Global JWT authentication middleware.
     Expects:
         Authorization: Bearer <token>
-    """
-    auth_header = request.headers.get("Authorization")
-
-    if not auth_header:
-        logger.warning("[AUTH_GUARD] Missing Authorization header")
-        raise HTTPException(status_code=401, detail="Missing token")
-
-    # Support "Bearer <token>"
-    token = auth_header.replace("Bearer ", "").strip()
 
+    Verification is shared with the get_principal dependency (same
+    options, same claims cache); the principal is left on
+    request.state so routes do not verify the token again.
+    """
     try:
-        jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=["HS256"],
-            options={"verify_aud": False},
-        )
-
-    except jwt.ExpiredSignatureError:
-        logger.warning("[AUTH_GUARD] Token expired")
-        raise HTTPException(status_code=401, detail="Token expired")
-
-    except jwt.InvalidTokenError as e:
-        logger.warning(f"[AUTH_GUARD] Invalid token: {e}")
-        raise HTTPException(status_code=401, detail="Invalid token")
+        request.state.principal = await principal_from_token(bearer_token(request))
 
-    except Exception as e:
-        logger.error(f"[AUTH_GUARD] Unexpected JWT error: {e}")
-        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException as e:
+        logger.warning(f"[AUTH_GUARD] {e.detail}")
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
 
-    return await call_next(request)
\ No newline at end of file
+    return await call_next(request)
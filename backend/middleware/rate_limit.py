@@ -1,32 +1,212 @@
+import os
 import time
-from fastapi import Request, HTTPException
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
 from backend.logger import get_logger
+from services.auth import decode_token
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional shared backend
+    aioredis = None
 
 logger = get_logger("gcz-rate-limit")
 
 RATE_LIMIT_WINDOW = 5       # seconds
 RATE_LIMIT_MAX = 20         # max requests per window
 
-requests_log = {}
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_SWEEP_SECONDS = 30
+
+
+class RateLimitPolicy:
+    """
+    `limit` requests per `period` seconds, with bursts up to `burst`
+    (defaults to `limit`). Enforced with GCRA: one float per key.
+    """
+
+    __slots__ = ("name", "limit", "period", "burst", "interval", "tolerance")
+
+    def __init__(self, name: str, limit: int, period: float, burst: Optional[int] = None):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.burst = burst or limit
+        self.interval = period / limit              # emission interval
+        self.tolerance = self.interval * self.burst  # how far TAT may run ahead of now
+
+
+DEFAULT_POLICY = RateLimitPolicy("default", RATE_LIMIT_MAX, RATE_LIMIT_WINDOW)
+
+# Authenticated users (JWT telegram_id) are keyed by identity, not IP,
+# so users behind a shared NAT do not throttle each other.
+IDENTITY_POLICY = RateLimitPolicy("user", RATE_LIMIT_MAX * 2, RATE_LIMIT_WINDOW)
+
+# Longest matching prefix wins; None exempts the route.
+ROUTE_POLICIES: Dict[str, Optional[RateLimitPolicy]] = {
+    "/health": None,
+    "/api/health": None,
+    "/ai/health": None,
+    # Login endpoints only: /api/auth/me and /validate run on every navigation
+    "/api/auth/login": RateLimitPolicy("auth", 10, 60, burst=5),
+    "/api/auth/telegram": RateLimitPolicy("auth", 10, 60, burst=5),
+    "/api/redeem": RateLimitPolicy("redeem", 10, 60, burst=5),
+    "/api/sc": RateLimitPolicy("sc", 30, 60, burst=10),
+}
+
+_ROUTE_PREFIXES: Tuple[str, ...] = tuple(sorted(ROUTE_POLICIES, key=len, reverse=True))
+
+
+# ============================================================
+#  BACKENDS
+# ============================================================
+
+class MemoryBackend:
+    """
+    Per-process GCRA state: key -> theoretical arrival time (monotonic).
+    Keys whose TAT is in the past are indistinguishable from new keys,
+    so the periodic sweep drops them without changing any decision.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tat: Dict[str, float] = {}
+        self._next_sweep = time.monotonic() + RATE_LIMIT_SWEEP_SECONDS
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        now = time.monotonic()
+        if now >= self._next_sweep or len(self._tat) >= self.max_keys:
+            self._sweep(now)
 
+        tat = max(self._tat.get(key, now), now) + policy.interval
+        if tat - now > policy.tolerance:
+            return False, tat - policy.tolerance - now
+
+        self._tat[key] = tat
+        return True, 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._tat = {k: t for k, t in self._tat.items() if t > now}
+        # Still full of live keys (scanner flood): drop the oldest entries
+        overflow = len(self._tat) - self.max_keys + 1
+        if overflow > 0:
+            for k in list(self._tat)[:overflow]:
+                del self._tat[k]
+        self._next_sweep = now + RATE_LIMIT_SWEEP_SECONDS
+
+
+# KEYS[1] = bucket key; ARGV = interval, tolerance (ms)
+GCRA_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+tat = tat + interval
+if tat - now > tolerance then
+  return tat - tolerance - now
+end
+redis.call('SET', KEYS[1], tat, 'PX', math.ceil(tat - now))
+return 0
+"""
+
+
+class RedisBackend:
+    """GCRA in one Lua call so limits hold across uvicorn workers. Keys expire when idle."""
+
+    def __init__(self, url: str):
+        self._redis = aioredis.from_url(url)
+        self._script = self._redis.register_script(GCRA_LUA)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        wait_ms = await self._script(
+            keys=[f"gcz:rl:{key}"],
+            args=[int(policy.interval * 1000), int(policy.tolerance * 1000)],
+        )
+        wait_ms = int(wait_ms)
+        return wait_ms <= 0, wait_ms / 1000
+
+
+_memory = MemoryBackend()
+_redis: Optional[RedisBackend] = None
+
+if RATE_LIMIT_REDIS_URL:
+    if aioredis is None:
+        logger.warning("[RATE_LIMIT] RATE_LIMIT_REDIS_URL set but redis is not installed; using memory")
+    else:
+        _redis = RedisBackend(RATE_LIMIT_REDIS_URL)
+
+
+# ============================================================
+#  POLICY + IDENTITY
+# ============================================================
+
+def route_policy(path: str) -> Optional[RateLimitPolicy]:
+    for prefix in _ROUTE_PREFIXES:
+        if path.startswith(prefix):
+            return ROUTE_POLICIES[prefix]
+    return DEFAULT_POLICY
+
+
+def request_identity(request: Request) -> Tuple[str, bool]:
+    """("tg:<telegram_id>", True) for a valid JWT, else ("ip:<addr>", False)."""
+    auth_header = request.headers.get("authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        try:
+            claims = decode_token(auth_header[7:].strip())
+            return f"tg:{claims['telegram_id']}", True
+        except HTTPException:
+            pass
+
+    ip = request.client.host if request.client else "unknown"
+    return f"ip:{ip}", False
+
+
+async def check_rate_limit(key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+    if _redis is not None:
+        try:
+            return await _redis.hit(key, policy)
+        except Exception as e:
+            logger.error(f"[RATE_LIMIT] Redis backend failed, using memory: {e}")
+    return await _memory.hit(key, policy)
+
+
+# ============================================================
+#  MIDDLEWARE
+# ============================================================
 
 async def rate_limiter(request: Request, call_next):
     """
-    Simple IP-based rate limiter.
-    Allows RATE_LIMIT_MAX requests per RATE_LIMIT_WINDOW seconds.
+    Per-route, per-identity rate limiter (GCRA).
+    Defaults to RATE_LIMIT_MAX requests per RATE_LIMIT_WINDOW seconds per IP.
     """
-    ip = request.client.host
-    now = time.monotonic()
+    policy = route_policy(request.url.path)
+    if policy is None:
+        return await call_next(request)
+
+    identity, authenticated = request_identity(request)
+    if authenticated and policy is DEFAULT_POLICY:
+        policy = IDENTITY_POLICY
 
-    if ip not in requests_log:
-        requests_log[ip] = []
+    allowed, retry_after = await check_rate_limit(f"{policy.name}:{identity}", policy)
+    if not allowed:
+        logger.warning(f"[RATE_LIMIT] Too many requests from {identity} ({policy.name})")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
 
-    # Keep only timestamps inside the window
-    requests_log[ip] = [t for t in requests_log[ip] if now - t < RATE_LIMIT_WINDOW]
-    requests_log[ip].append(now)
+    return await call_next(request)
 
-    if len(requests_log[ip]) > RATE_LIMIT_MAX:
-        logger.warning(f"[RATE_LIMIT] Too many requests from {ip}")
-        raise HTTPException(status_code=429, detail="Too many requests")
 
-    return await call_next(request)
\ No newline at end of file
+def rate_limit_snapshot() -> Dict[str, object]:
+    return {"backend": "redis" if _redis is not None else "memory", "keys": len(_memory)}
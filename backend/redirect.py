@@ -1,22 +1,24 @@
 #!/usr/bin/env python3
 
-import csv
-import asyncio
-import re
+import os
 import time
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import quote
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 
+from backend.catalog import CATALOG, EMPTY_CATALOG, AffiliateRecord, Catalog, normalize_key
+from backend.click_tracker import ClickTracker
+from backend.database import get_db
 from backend.logging_config import (
     RequestContextMiddleware,
     configure_logging,
     get_request_id,
 )
 
-CSV_PATH = "/var/www/html/gcz/master_affiliates.csv"
-REFRESH_SECONDS = 60
+CLICK_TRACKING = os.getenv("CLICK_TRACKING", "true").lower() == "true"
 
 logger = configure_logging("gcz-redirect")
 
@@ -24,66 +26,96 @@ app = FastAPI(title="GambleCodez Redirect Engine")
 app.state.started_at = time.time()
 app.add_middleware(RequestContextMiddleware, logger=logger)
 
-REDIRECT_MAP: Dict[str, Dict[str, Any]] = {}
+CLICKS = ClickTracker(get_db, logger)
 
+# Same quoting RedirectResponse applies to the Location header.
+_LOCATION_SAFE = ":/%#?=@[]!$&'()*+,;"
 
-def normalize(name: str | None) -> str:
-    if not name:
-        return ""
-    return re.sub(r"[^a-z0-9]", "", name.lower())
 
+class PrebuiltRedirectResponse(RedirectResponse):
+    """
+    RedirectResponse backed by header bytes computed at index build time.
+    Skips quoting/encoding per request; the list is copied because
+    middleware appends headers (X-Request-ID) in place.
+    """
 
-def load_redirects_sync():
-    """Load CSV into in-memory redirect map (sync, safe)."""
-    new_map = {}
+    def __init__(self, raw_headers: Tuple[Tuple[bytes, bytes], ...], status_code: int = 307):
+        self.status_code = status_code
+        self.background = None
+        self.body = b""
+        self.raw_headers = list(raw_headers)
 
-    try:
-        with open(CSV_PATH, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
 
-            for row in reader:
-                if not row.get("name") or not row.get("affiliate_url"):
-                    logger.warning("redirects.invalid_row", extra={"row": row})
-                    continue
+class RedirectEntry:
+    __slots__ = ("url", "slug", "meta", "raw_headers")
 
-                key = normalize(row["name"])
+    def __init__(self, record: AffiliateRecord):
+        self.url = record.affiliate_url
+        self.slug = record.slug
+        self.meta = MappingProxyType({"url": self.url, "icon": record.icon, "level": record.level})
+        self.raw_headers = (
+            (b"content-length", b"0"),
+            (b"location", quote(self.url, safe=_LOCATION_SAFE).encode("latin-1")),
+        )
 
-                icon = row.get("icon_url") or (
-                    f"https://www.google.com/s2/favicons?sz=256&domain={row.get('resolved_domain')}"
-                    if row.get("resolved_domain")
-                    else None
-                )
 
-                new_map[key] = {
-                    "url": row.get("affiliate_url"),
-                    "icon": icon,
-                    "level": row.get("level"),
-                }
+class RedirectIndex:
+    """
+    Immutable, precompiled redirect index derived from one Catalog.
+    Published with a single reference swap, so readers never observe a
+    half-built map.
+    """
 
-        logger.info("redirects.loaded", extra={"entries": len(new_map)})
-        return new_map
+    __slots__ = ("entries", "keys", "built_at")
 
-    except Exception:
-        logger.exception("redirects.load_failed")
-        return {}
+    def __init__(self, catalog: Catalog):
+        entries: Dict[int, RedirectEntry] = {}
+        keys: Dict[str, RedirectEntry] = {}
 
+        # catalog.keys already resolves aliases with primary names winning
+        for key, record in catalog.keys.items():
+            if not record.linkable:
+                continue
+            entry = entries.get(id(record))
+            if entry is None:
+                entry = entries[id(record)] = RedirectEntry(record)
+            keys[key] = entry
 
-async def refresh_loop():
-    """Async background refresher."""
-    global REDIRECT_MAP
+        self.entries: Tuple[RedirectEntry, ...] = tuple(entries.values())
+        self.keys: Mapping[str, RedirectEntry] = MappingProxyType(keys)
+        self.built_at = time.time()
 
-    while True:
-        REDIRECT_MAP = await asyncio.to_thread(load_redirects_sync)
-        await asyncio.sleep(REFRESH_SECONDS)
+    def lookup(self, sitename: str) -> Optional[RedirectEntry]:
+        return self.keys.get(normalize_key(sitename))
+
+
+INDEX: RedirectIndex = RedirectIndex(EMPTY_CATALOG)
+
+
+def on_catalog(catalog: Catalog) -> None:
+    """Catalog subscriber: rebuild and swap the redirect index."""
+    global INDEX
+
+    INDEX = RedirectIndex(catalog)
+    logger.info(
+        "redirects.loaded",
+        extra={"entries": len(INDEX.entries), "keys": len(INDEX.keys)},
+    )
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Load once and start async refresher."""
-    global REDIRECT_MAP
+    """Subscribe to the shared catalog and start the click writer."""
+    CATALOG.subscribe(on_catalog)
+    await CATALOG.start()
+    if CLICK_TRACKING:
+        CLICKS.start()
 
-    REDIRECT_MAP = await asyncio.to_thread(load_redirects_sync)
-    asyncio.create_task(refresh_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered clicks before the worker exits."""
+    await CLICKS.stop()
 
 
 @app.exception_handler(Exception)
@@ -107,7 +139,8 @@ def health():
     return {
         "status": "ok",
         "service": "gcz-redirect",
-        "entries": len(REDIRECT_MAP),
+        "entries": len(INDEX.entries),
+        "clicks": CLICKS.snapshot(),
         "uptime_s": int(time.time() - app.state.started_at),
     }
 
@@ -117,7 +150,8 @@ def health_api():
     return {
         "status": "ok",
         "service": "gcz-redirect",
-        "entries": len(REDIRECT_MAP),
+        "entries": len(INDEX.entries),
+        "clicks": CLICKS.snapshot(),
         "uptime_s": int(time.time() - app.state.started_at),
     }
 
@@ -128,11 +162,21 @@ def health_api():
 
 @app.get("/redirect/{sitename}")
 @app.get("/affiliates/redirect/{sitename}")
-def do_redirect(sitename: str):
-    key = normalize(sitename)
-    if key in REDIRECT_MAP:
-        return RedirectResponse(REDIRECT_MAP[key]["url"])
-    raise HTTPException(status_code=404, detail="Affiliate not found")
+async def do_redirect(sitename: str, request: Request):
+    entry = INDEX.lookup(sitename)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Affiliate not found")
+
+    # Fire-and-forget: only enqueues, the DB write happens in batches
+    headers = request.headers
+    CLICKS.record(
+        entry.slug,
+        headers.get("referer"),
+        headers.get("user-agent"),
+        headers.get("x-forwarded-for", "").split(",")[0].strip()
+        or (request.client.host if request.client else None),
+    )
+    return PrebuiltRedirectResponse(entry.raw_headers)
 
 
 # ------------------------------------------------------------
@@ -141,11 +185,11 @@ def do_redirect(sitename: str):
 
 @app.get("/meta/{sitename}")
 @app.get("/affiliates/meta/{sitename}")
-def get_meta(sitename: str):
-    key = normalize(sitename)
-    if key in REDIRECT_MAP:
-        return JSONResponse(content=REDIRECT_MAP[key])
-    raise HTTPException(status_code=404, detail="Not found")
+async def get_meta(sitename: str):
+    entry = INDEX.lookup(sitename)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return JSONResponse(content=dict(entry.meta))
 
 
 # ------------------------------------------------------------
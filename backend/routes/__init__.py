@@ -11,6 +11,7 @@ from .sc import router as sc_router
 from .auth_roles import router as auth_roles_router
 from .drops_intake import router as drops_intake_router
 from .live_dashboard import router as live_dashboard_router
+from .exports import router as exports_router
 
 __all__ = [
     "ai_router",
@@ -26,4 +27,5 @@ __all__ = [
     "auth_roles_router",
     "drops_intake_router",
     "live_dashboard_router",
+    "exports_router",
 ]
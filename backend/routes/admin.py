@@ -1,35 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from services.db import get_db
 from services.auth import require_admin
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Keyset,
+    estimate_rows,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
 from backend.logger import get_logger
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 logger = get_logger("gcz-admin")
 
+USER_FIELDS = ("id", "user_id", "telegram_id", "telegram_username", "username", "admin_level", "locked", "created_at")
+USER_DEFAULT_FIELDS = ("telegram_id", "username", "created_at")
+USER_KEYSET = Keyset(("created_at", "DESC", "timestamp"), ("id", "DESC", "int"))
+
 
 @router.get("/users")
-async def list_users(admin_id: int):
+async def list_users(
+    admin_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
-    Returns all users for the admin panel.
+    Returns one page of users for the admin panel, newest first.
+    Keyset-paged on (created_at, id): pass nextCursor back as cursor.
     Fully async, pool-safe, and GCZ aligned.
     """
     # Admin validation (async)
     await require_admin(admin_id)
 
+    columns = parse_fields(fields, USER_FIELDS, USER_DEFAULT_FIELDS)
     db = await get_db()
 
     try:
-        rows = await db.fetch(
-            """
-            SELECT telegram_id, username, created_at
-            FROM users
-            ORDER BY created_at DESC
-            """
+        items, next_cursor = await fetch_page(
+            db,
+            select=columns,
+            from_sql="users",
+            keyset=USER_KEYSET,
+            cursor=cursor,
+            limit=limit,
         )
 
         logger.info(f"[ADMIN] User list requested by admin {admin_id}")
 
-        return [dict(r) for r in rows]
+        return page_response(items, next_cursor, limit, await estimate_rows(db, "users"))
+
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"[ADMIN] Failed to load users: {e}")
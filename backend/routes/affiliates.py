@@ -1,61 +1,111 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Query
 from services.db import get_db
+from services.cache import cached
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Keyset,
+    cached_count,
+    estimate_rows,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
 from backend.logger import get_logger
 import random
+import re
 
 router = APIRouter(prefix="/api/affiliates", tags=["Affiliates"])
 logger = get_logger("gcz-affiliates")
 
+# Public affiliate columns, in response order
+AFFILIATE_FIELDS = (
+    "id",
+    "name",
+    "affiliate_url",
+    "priority",
+    "category",
+    "status",
+    "level",
+    "date_added",
+    "bonus_code",
+    "bonus_description",
+    "icon_url",
+    "resolved_domain",
+    "redemption_speed",
+    "redemption_minimum",
+    "redemption_type",
+    "created_by",
+    "source",
+    "top_pick",
+    "jurisdiction",
+    "sc_allowed",
+    "crypto_allowed",
+    "cwallet_allowed",
+    "lootbox_allowed",
+    "show_in_profile",
+    "sort_order",
+    "slug",
+    "description",
+)
+AFFILIATE_SELECT = ", ".join(AFFILIATE_FIELDS)
+
+# Keyset order for paged lists; name is unique
+AFFILIATE_KEYSET = Keyset(("COALESCE(priority, 0)", "DESC", "int"), ("name", "ASC", "str"))
+
+SEARCH_MAX_LIMIT = 100
+_SEARCH_TOKEN = re.compile(r"[a-z0-9]+")
+
 
 # ============================================================
 #  GET ALL AFFILIATES
 # ============================================================
 
 @router.get("/")
-async def list_affiliates():
+@cached("affiliates", ttl=300, stale_ttl=600)
+async def list_affiliates(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Returns full affiliate metadata from affiliates_master.
     This table is synced from /var/www/html/gcz/master_affiliates.csv.
+    Cached; invalidated by the CSV import.
+
+    Without limit/cursor the whole list is returned (legacy shape). With
+    either, a keyset page on (priority, name) is returned as
+    {items, nextCursor, limit, total}. fields= projects columns.
     """
+    columns = parse_fields(fields, AFFILIATE_FIELDS)
     db = await get_db()
 
     try:
-        rows = await db.fetch(
-            """
-            SELECT
-                id,
-                name,
-                affiliate_url,
-                priority,
-                category,
-                status,
-                level,
-                date_added,
-                bonus_code,
-                bonus_description,
-                icon_url,
-                resolved_domain,
-                redemption_speed,
-                redemption_minimum,
-                redemption_type,
-                created_by,
-                source,
-                top_pick,
-                jurisdiction,
-                sc_allowed,
-                crypto_allowed,
-                cwallet_allowed,
-                lootbox_allowed,
-                show_in_profile,
-                sort_order,
-                slug,
-                description
-            FROM affiliates_master
-            ORDER BY priority DESC, name ASC
-            """
+        if limit is None and cursor is None:
+            rows = await db.fetch(
+                f"""
+                SELECT {", ".join(columns)}
+                FROM affiliates_master
+                ORDER BY priority DESC, name ASC
+                """
+            )
+            return [dict(r) for r in rows]
+
+        limit = limit or DEFAULT_PAGE_SIZE
+        items, next_cursor = await fetch_page(
+            db,
+            select=columns,
+            from_sql="affiliates_master",
+            keyset=AFFILIATE_KEYSET,
+            cursor=cursor,
+            limit=limit,
         )
+        return page_response(items, next_cursor, limit, await estimate_rows(db, "affiliates_master"))
 
-        return [dict(r) for r in rows]
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"[AFFILIATES] Failed to load affiliates: {e}")
@@ -72,8 +122,8 @@ async def get_affiliate(slug: str):
 
     try:
         row = await db.fetchrow(
-            """
-            SELECT *
+            f"""
+            SELECT {AFFILIATE_SELECT}
             FROM affiliates_master
             WHERE slug = $1
             LIMIT 1
@@ -98,25 +148,47 @@ async def get_affiliate(slug: str):
 #  SEARCH AFFILIATES
 # ============================================================
 
+def prefix_tsquery(q: str) -> str:
+    """'stake coi' -> 'stake:* & coi:*' (tokens are alphanumeric, so safe for to_tsquery)."""
+    return " & ".join(f"{token}:*" for token in _SEARCH_TOKEN.findall(q.lower()))
+
+
+# $1 lowered query (trigram), $2 prefix tsquery, $3 limit, $4 offset.
+# search_vector / trigram indexes: sql/migrations/20261018_affiliates_search.sql
+SEARCH_SQL = f"""
+    SELECT {AFFILIATE_SELECT}
+    FROM affiliates_master, to_tsquery('simple', $2) AS tsq
+    WHERE search_vector @@ tsq
+       OR lower(name) % $1
+       OR slug % $1
+    ORDER BY
+        ts_rank(search_vector, tsq) + similarity(lower(name), $1) DESC,
+        priority DESC,
+        name ASC
+    LIMIT $3 OFFSET $4
+"""
+
+
 @router.get("/search/query")
-async def search_affiliates(q: str = Query(..., min_length=2)):
+@cached("affiliates", ttl=60)
+async def search_affiliates(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Ranked affiliate search: prefix full-text match over name, slug,
+    category, domain and description, plus trigram similarity on
+    name/slug for typos. Cached per query for search-as-you-type.
+    """
+    tsquery = prefix_tsquery(q)
+    if not tsquery:
+        return []
+
     db = await get_db()
 
     try:
-        rows = await db.fetch(
-            """
-            SELECT *
-            FROM affiliates_master
-            WHERE
-                LOWER(name) LIKE LOWER('%' || $1 || '%')
-                OR LOWER(category) LIKE LOWER('%' || $1 || '%')
-                OR LOWER(description) LIKE LOWER('%' || $1 || '%')
-                OR LOWER(slug) LIKE LOWER('%' || $1 || '%')
-                OR LOWER(resolved_domain) LIKE LOWER('%' || $1 || '%')
-            ORDER BY priority DESC
-            """,
-            q,
-        )
+        rows = await db.fetch(SEARCH_SQL, q.lower().strip(), tsquery, limit, offset)
 
         return [dict(r) for r in rows]
 
@@ -135,8 +207,8 @@ async def top_picks():
 
     try:
         rows = await db.fetch(
-            """
-            SELECT *
+            f"""
+            SELECT {AFFILIATE_SELECT}
             FROM affiliates_master
             WHERE top_pick = TRUE
             ORDER BY priority DESC, name ASC
@@ -154,21 +226,47 @@ async def top_picks():
 # ============================================================
 
 @router.get("/category/{category}")
-async def affiliates_by_category(category: str):
+async def affiliates_by_category(
+    category: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Same paging/projection contract as the full list."""
+    columns = parse_fields(fields, AFFILIATE_FIELDS)
     db = await get_db()
 
     try:
-        rows = await db.fetch(
-            """
-            SELECT *
-            FROM affiliates_master
-            WHERE LOWER(category) = LOWER($1)
-            ORDER BY priority DESC, name ASC
-            """,
-            category,
+        if limit is None and cursor is None:
+            rows = await db.fetch(
+                f"""
+                SELECT {", ".join(columns)}
+                FROM affiliates_master
+                WHERE LOWER(category) = LOWER($1)
+                ORDER BY priority DESC, name ASC
+                """,
+                category,
+            )
+            return [dict(r) for r in rows]
+
+        limit = limit or DEFAULT_PAGE_SIZE
+        items, next_cursor = await fetch_page(
+            db,
+            select=columns,
+            from_sql="affiliates_master",
+            keyset=AFFILIATE_KEYSET,
+            where="LOWER(category) = LOWER($1)",
+            params=[category],
+            cursor=cursor,
+            limit=limit,
         )
+        total = await cached_count(
+            db, "SELECT count(*) FROM affiliates_master WHERE LOWER(category) = LOWER($1)", category
+        )
+        return page_response(items, next_cursor, limit, total)
 
-        return [dict(r) for r in rows]
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"[AFFILIATES] Category filter failed: {e}")
@@ -185,8 +283,8 @@ async def affiliates_by_level(level: int):
 
     try:
         rows = await db.fetch(
-            """
-            SELECT *
+            f"""
+            SELECT {AFFILIATE_SELECT}
             FROM affiliates_master
             WHERE level = $1
             ORDER BY priority DESC, name ASC
@@ -211,8 +309,8 @@ async def random_affiliate():
 
     try:
         rows = await db.fetch(
-            """
-            SELECT *
+            f"""
+            SELECT {AFFILIATE_SELECT}
             FROM affiliates_master
             WHERE status = 'active'
             """
@@ -2,6 +2,12 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from backend.logger import get_logger
+from services.ai.semantic_cache import (
+    AI_CACHE_TTLS,
+    AI_RESPONSE_CACHE,
+    SEMANTIC_NAMESPACES,
+    refresh_cache_entities,
+)
 
 # Async Perplexity client
 from services.ai import (
@@ -24,6 +30,24 @@ class PerplexityRequest(BaseModel):
     prompt: str
 
 
+# ============================================================
+#  RESPONSE CACHE
+# ============================================================
+
+async def cached_answer(namespace: str, prompt: str, call) -> str:
+    """Serve repeated / near-identical prompts from AI_RESPONSE_CACHE; errors are not cached."""
+    await refresh_cache_entities()
+    answer = AI_RESPONSE_CACHE.get(namespace, prompt, semantic=namespace in SEMANTIC_NAMESPACES)
+    if answer is not None:
+        logger.info(f"[AI] /{namespace} cache hit")
+        return answer
+
+    answer = await call(prompt)
+    if answer and not answer.startswith("Error:"):
+        AI_RESPONSE_CACHE.set(namespace, prompt, answer, ttl=AI_CACHE_TTLS[namespace])
+    return answer
+
+
 # ============================================================
 #  /perplexity  (chat completion)
 # ============================================================
@@ -36,7 +60,7 @@ async def ai_perplexity(payload: PerplexityRequest):
 
     try:
         logger.info(f"[AI] /perplexity: {prompt[:80]}...")
-        answer = await ask_perplexity(prompt)
+        answer = await cached_answer("perplexity", prompt, ask_perplexity)
         return {"answer": answer}
 
     except Exception as e:
@@ -56,7 +80,7 @@ async def ai_perplexity_search(payload: PerplexityRequest):
 
     try:
         logger.info(f"[AI] /perplexity-search: {prompt[:80]}...")
-        answer = await perplexity_search(prompt)
+        answer = await cached_answer("perplexity-search", prompt, perplexity_search)
         return {"answer": answer}
 
     except Exception as e:
@@ -98,19 +122,11 @@ async def ai_perplexity_stream(payload: PerplexityRequest):
     if not prompt:
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
 
-    try:
-        logger.info(f"[AI] /perplexity-stream: {prompt[:80]}...")
-
-        async def event_stream():
-            async for chunk in stream_perplexity(prompt):
-                # chunk is already formatted as SSE: "data: ...\n\n"
-                yield chunk
+    logger.info(f"[AI] /perplexity-stream: {prompt[:80]}...")
 
-        return StreamingResponse(event_stream(), media_type="text/event-stream")
-
-    except Exception as e:
-        logger.error(f"[AI] /perplexity-stream error: {e}")
-        raise HTTPException(status_code=500, detail="AI streaming error")
+    # stream_perplexity is an async generator of SSE chunks ("data: ...\n\n");
+    # upstream errors arrive as an `error` event since headers are already sent
+    return StreamingResponse(stream_perplexity(prompt), media_type="text/event-stream")
 
 
 # ============================================================
@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 import jwt
 
 from config import get_settings
 from backend.logger import get_logger
+from services.roles import ROLE_SERVICE
 
 # God‑Mode auth service functions
 from services.auth import (
     telegram_login,
-    verify_session,
     get_role,
     verify_telegram_signature,
     get_role_for_user,
+    decode_token,
+    get_principal,
+    session_response,
+    Principal,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
@@ -83,7 +87,7 @@ async def login(payload: TelegramAuth):
             {
                 "telegram_id": payload.telegram_id,
                 "username": payload.username,
-                "role": role,
+                **ROLE_SERVICE.claims(payload.telegram_id, role),
                 "iss": ISSUER,
                 "exp": datetime.utcnow() + timedelta(days=TOKEN_LIFETIME_DAYS),
             },
@@ -116,24 +120,7 @@ async def validate(token: str):
     """
     Validates JWT and returns decoded payload.
     """
-    try:
-        decoded = jwt.decode(
-            token,
-            SECRET,
-            algorithms=["HS256"],
-            issuer=ISSUER,
-        )
-
-        return {"valid": True, "data": decoded}
-
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-
-    except jwt.InvalidIssuerError:
-        raise HTTPException(status_code=401, detail="Invalid token issuer")
-
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return {"valid": True, "data": dict(decode_token(token))}
 
 
 # ============================================================
@@ -141,18 +128,13 @@ async def validate(token: str):
 # ============================================================
 
 @router.get("/me")
-async def auth_me(request: Request):
+async def auth_me(principal: Principal = Depends(get_principal)):
     """
-    Validates a JWT token and returns the user.
+    Returns the user for a verified JWT.
     Frontend must send:
         Authorization: Bearer <token>
     """
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        raise HTTPException(status_code=401, detail="Missing token")
-
-    token = auth_header.replace("Bearer ", "").strip()
-    return await verify_session(token)
+    return await session_response(principal)
 
 
 # ============================================================
@@ -1,20 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from services.db import get_db
+from services.auth import Principal, get_principal
+from services.roles import ROLE_LEVELS, ROLE_SERVICE, normalize_role
 from backend.logger import get_logger
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 logger = get_logger("gcz-auth-roles")
 
-# Canonical role levels
-ROLE_LEVELS = {
-    "user": 0,
-    "mod": 1,
-    "manager": 2,
-    "admin": 3,
-    "super_admin": 4,
-}
-
 SUPER_ADMIN_TELEGRAM_ID = "6668510825"
 
 
@@ -24,56 +18,8 @@ class RoleResponse(BaseModel):
     level: int
 
 
-# ============================================================
-#  DB ROLE LOOKUP
-# ============================================================
-
-async def fetch_role_from_db(db, telegram_id: str):
-    """
-    Fetch role from telegram_roles table.
-    Returns None if no entry exists.
-    """
-    try:
-        row = await db.fetchrow(
-            """
-            SELECT role
-            FROM telegram_roles
-            WHERE telegram_id = $1
-            LIMIT 1
-            """,
-            telegram_id,
-        )
-        return row["role"] if row else None
-
-    except Exception as e:
-        logger.error(f"[AUTH-ROLES] DB lookup failed for {telegram_id}: {e}")
-        return None
-
-
-# ============================================================
-#  ROLE NORMALIZATION
-# ============================================================
-
-def normalize_role(role: str):
-    if not role:
-        return "user"
-
-    role = role.lower().strip()
-
-    # Aliases
-    if role in ["mod", "moderator"]:
-        return "mod"
-
-    if role in ["manager", "mgr"]:
-        return "manager"
-
-    if role in ["admin", "administrator"]:
-        return "admin"
-
-    if role in ["superadmin", "super_admin", "owner", "root"]:
-        return "super_admin"
-
-    return "user"
+class RoleUpdate(BaseModel):
+    role: Optional[str] = None  # None / "user" removes the DB role
 
 
 # ============================================================
@@ -81,13 +27,13 @@ def normalize_role(role: str):
 # ============================================================
 
 @router.get("/role/{telegram_id}", response_model=RoleResponse)
-async def get_role(telegram_id: str, db=Depends(get_db)):
+async def get_role(telegram_id: str):
     """
     GCZ canonical role resolver.
 
     Supports:
     - Super admin override
-    - DB-backed roles
+    - DB-backed roles (cached, see services/roles.py)
     - Fallback to USER
     """
 
@@ -102,17 +48,57 @@ async def get_role(telegram_id: str, db=Depends(get_db)):
             level=ROLE_LEVELS["super_admin"],
         )
 
-    # DB ROLE LOOKUP
-    db_role = await fetch_role_from_db(db, telegram_id)
-    normalized = normalize_role(db_role)
+    if not telegram_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid telegram_id")
 
-    logger.info(
-        f"[AUTH-ROLES] Resolved role for {telegram_id}: "
-        f"db_role={db_role} normalized={normalized}"
-    )
+    role = await ROLE_SERVICE.get_role(telegram_id)
 
     return RoleResponse(
         telegram_id=telegram_id,
-        role=normalized,
-        level=ROLE_LEVELS[normalized],
-    )
\ No newline at end of file
+        role=role,
+        level=ROLE_LEVELS[role],
+    )
+
+
+# ============================================================
+#  ROLE CHANGES (cache invalidation hooks)
+# ============================================================
+
+@router.post("/role/{telegram_id}", response_model=RoleResponse)
+async def set_role(
+    telegram_id: int,
+    payload: RoleUpdate,
+    principal: Principal = Depends(get_principal),
+):
+    """
+    Assign or remove a user's DB role (super admins only, verified from
+    the bearer token). The cached role and any token role claims for
+    that user are invalidated immediately.
+    """
+    if principal.role != "super_admin":
+        raise HTTPException(status_code=403, detail="Super admin access required")
+
+    role = normalize_role(payload.role)
+    try:
+        if role == "user":
+            await ROLE_SERVICE.clear_role(telegram_id)
+        else:
+            await ROLE_SERVICE.set_role(telegram_id, payload.role.strip().lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"[AUTH-ROLES] Role for {telegram_id} set to {role} by {principal.user_id}")
+    return RoleResponse(telegram_id=str(telegram_id), role=role, level=ROLE_LEVELS[role])
+
+
+@router.post("/role/{telegram_id}/invalidate")
+async def invalidate_role(telegram_id: int, principal: Principal = Depends(get_principal)):
+    """
+    For writers outside this process (the bot's role commands): drop the
+    cached role after changing telegramuserroles directly. Needs an
+    admin bearer token.
+    """
+    if not principal.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    ROLE_SERVICE.invalidate(telegram_id)
+    return {"success": True, "telegram_id": str(telegram_id)}
\ No newline at end of file
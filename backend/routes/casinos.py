@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from services.db import get_db
+from services.cache import cached
 from backend.logger import get_logger
 
 router = APIRouter(prefix="/api/casinos", tags=["Casinos"])
@@ -7,10 +8,12 @@ logger = get_logger("gcz-casinos")
 
 
 @router.get("/")
+@cached("casinos", ttl=300, stale_ttl=600)
 async def casinos():
     """
     Returns all active casinos with full GCZ metadata.
     Pool‑safe, error‑safe, and optimized.
+    Cached; invalidated by sync_casinos.
     """
     db = await get_db()
 
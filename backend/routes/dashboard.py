@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from services.db import get_db
+from services.cache import cached
 from backend.logger import get_logger
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
@@ -7,10 +8,12 @@ logger = get_logger("gcz-dashboard")
 
 
 @router.get("/stats")
+@cached("dashboard", ttl=30, stale_ttl=60)
 async def stats():
     """
     Ultra‑optimized GCZ dashboard stats.
     Uses a single DB round‑trip and never closes the pool.
+    Cached for 30s (served stale for up to 60s more while refreshing).
     """
     db = await get_db()
 
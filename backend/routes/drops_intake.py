@@ -1,21 +1,36 @@
+import hashlib
 import os
-import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from backend.logger import get_logger
+from services.affiliate_resolver import get_affiliate_resolver
+from services.cache import TTLCache
 from services.db import get_db
+from services.promo_schema import (
+    CODE_REGEX,
+    URL_REGEX,
+    extract_code,
+    extract_url,
+    load_promo_columns,
+    promo_fingerprint,
+)
 
 router = APIRouter(prefix="/api/drops", tags=["Drops"])
 logger = get_logger("gcz-drops-intake")
 
-_PROMO_COLUMNS: Optional[set] = None
+PROMO_DEDUPE_DAYS = int(os.getenv("PROMO_DEDUPE_DAYS", "7"))
+PROMO_DEDUPE_WINDOW_S = PROMO_DEDUPE_DAYS * 86400
 
-CODE_REGEX = re.compile(r"\b[A-Z0-9]{4,20}\b")
-URL_REGEX = re.compile(r"https?://[^\s]+", re.IGNORECASE)
+# Seconds left of a stored promo's dedupe window, for remember_fingerprint
+REMAINING_WINDOW_SQL = f"EXTRACT(EPOCH FROM created_at - (NOW() - INTERVAL '{PROMO_DEDUPE_DAYS} days'))::float8 AS remaining_s"
+
+# fingerprint hash -> promo id, so repeated floods never reach the DB
+RECENT_FINGERPRINTS = TTLCache(max_entries=int(os.getenv("PROMO_DEDUPE_LRU", "4096")))
 
 
 class PromoIntakeRequest(BaseModel):
@@ -110,28 +125,55 @@ def normalize_tags(tags: Any) -> List[str]:
     return []
 
 
-async def load_promo_columns(db) -> set:
-    global _PROMO_COLUMNS
-    if _PROMO_COLUMNS is not None:
-        return _PROMO_COLUMNS
-    try:
-        rows = await db.fetch(
-            """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema = 'public' AND table_name = 'promos'
-            """
-        )
-        _PROMO_COLUMNS = {row["column_name"] for row in rows}
-    except Exception as exc:
-        logger.warning("[PROMO] Failed to read promos columns: %s", exc)
-        _PROMO_COLUMNS = set()
-    return _PROMO_COLUMNS
+def fingerprint_hashes(text: str) -> List[str]:
+    """
+    content_hash values for the current and previous dedupe window.
+    The window number is part of the hash, so the unique index on
+    promos.content_hash enforces one promo per fingerprint per window;
+    checking the previous window too makes the lookup a sliding window.
+    """
+    base = hashlib.sha1(promo_fingerprint(text).encode("utf-8")).hexdigest()
+    window = int(time.time() // PROMO_DEDUPE_WINDOW_S)
+    return [f"{base}:{window}", f"{base}:{window - 1}"]
+
+
+def remember_fingerprint(content_hash: str, promo_id: int, remaining_s: float = PROMO_DEDUPE_WINDOW_S) -> None:
+    """
+    Caches a fingerprint only as long as the DB lookup would still match
+    it: `remaining_s` left of the promo's dedupe window, and never past
+    the point where the hash's window bucket leaves the sliding window.
+    """
+    window = int(content_hash.rsplit(":", 1)[1])
+    ttl = min(remaining_s, (window + 2) * PROMO_DEDUPE_WINDOW_S - time.time())
+    if ttl > 0:
+        RECENT_FINGERPRINTS.set(content_hash, promo_id, ttl=ttl)
 
 
-async def find_duplicate(db, columns: set, text: str) -> Optional[int]:
+
+async def find_duplicate(db, columns: set, text: str, hashes: List[str]) -> Optional[int]:
     if not text:
         return None
+
+    for h in hashes:
+        cached_id = RECENT_FINGERPRINTS.get(h)
+        if cached_id is not None:
+            return cached_id
+
+    if "content_hash" in columns:
+        result = await db.fetchrow(
+            f"""
+            SELECT id, content_hash, {REMAINING_WINDOW_SQL} FROM promos
+            WHERE content_hash = ANY($1::text[])
+              AND created_at > NOW() - INTERVAL '{PROMO_DEDUPE_DAYS} days'
+            LIMIT 1
+            """,
+            hashes,
+        )
+        if result:
+            remember_fingerprint(result["content_hash"], result["id"], result["remaining_s"])
+        return result["id"] if result else None
+
+    # Legacy schema without content_hash: exact text match
     column = None
     for candidate in ("raw_text", "content", "clean_text", "cleaned_text"):
         if candidate in columns:
@@ -139,147 +181,373 @@ async def find_duplicate(db, columns: set, text: str) -> Optional[int]:
             break
     if not column:
         return None
-    window_days = int(os.getenv("PROMO_DEDUPE_DAYS", "7"))
     query = f"""
         SELECT id FROM promos
         WHERE {column} = $1
-          AND created_at > NOW() - INTERVAL '{window_days} days'
+          AND created_at > NOW() - INTERVAL '{PROMO_DEDUPE_DAYS} days'
         LIMIT 1
     """
     result = await db.fetchrow(query, text)
     return result["id"] if result else None
 
 
-async def find_affiliate_id(db, casino_name: Optional[str], affiliate_url: Optional[str]) -> Optional[int]:
-    if casino_name:
-        row = await db.fetchrow(
-            "SELECT id FROM affiliates_master WHERE lower(name) = lower($1) LIMIT 1",
-            casino_name,
-        )
-        if row:
-            return row["id"]
-    if affiliate_url:
-        row = await db.fetchrow(
-            "SELECT id FROM affiliates_master WHERE affiliate_url = $1 OR url = $1 LIMIT 1",
-            affiliate_url,
-        )
-        if row:
-            return row["id"]
-    return None
+INTAKE_BATCH_MAX = int(os.getenv("PROMO_INTAKE_BATCH_MAX", "500"))
+INTAKE_SOURCES = {"discord", "ai", "manual", "site_form", "web", "bot", "telegram"}
 
 
-@router.post("/intake")
-async def promo_intake(payload: PromoIntakeRequest):
-    raw_text = normalize_text(payload.raw_text or payload.content or payload.description)
-    if not raw_text:
-        raise HTTPException(status_code=400, detail="raw_text or description required")
+def duplicate_response(promo_id: int) -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "duplicate": True,
+        "promo_id": promo_id,
+        "raw_drop": {"id": promo_id},
+    }
 
-    description = normalize_text(payload.description or raw_text)
-    title = clean_title(payload.title or description)
-    raw_tags = payload.tags or (payload.metadata or {}).get("tags") if payload.metadata else payload.tags
-    tags = normalize_tags(raw_tags)
-    source = (payload.source or "discord").lower()
-    if source not in {"discord", "ai", "manual", "site_form", "web", "bot", "telegram"}:
-        source = "manual"
 
-    channel = detect_channel(raw_text, payload.source_channel_id)
-    review = review_promo(raw_text)
+class PreparedPromo:
+    """Normalized, classified intake message plus its promos row (minus affiliate_id)."""
 
-    db = await get_db()
-    columns = await load_promo_columns(db)
+    __slots__ = ("payload", "raw_text", "description", "title", "tags", "source", "channel", "hashes", "row")
 
-    existing_id = await find_duplicate(db, columns, raw_text)
-    if existing_id:
-        logger.info("[PROMO] Duplicate intake ignored id=%s", existing_id)
+    def __init__(self, payload: "PromoIntakeRequest", columns: set, now: datetime):
+        self.payload = payload
+        self.raw_text = normalize_text(payload.raw_text or payload.content or payload.description)
+        if not self.raw_text:
+            raise ValueError("raw_text or description required")
+
+        description = self.description = normalize_text(payload.description or self.raw_text)
+        title = self.title = clean_title(payload.title or description)
+        raw_tags = payload.tags or (payload.metadata or {}).get("tags") if payload.metadata else payload.tags
+        tags = self.tags = normalize_tags(raw_tags)
+        source = (payload.source or "discord").lower()
+        if source not in INTAKE_SOURCES:
+            source = "manual"
+        self.source = source
+
+        channel = self.channel = detect_channel(self.raw_text, payload.source_channel_id)
+        review = review_promo(self.raw_text)
+        self.hashes = fingerprint_hashes(self.raw_text)
+
+        status = "approved" if should_auto_approve(review) else "pending"
+
+        row: Dict[str, Any] = {
+            "source": source,
+            "channel": channel,
+            "content": description,
+            "clean_text": title or description,
+            "submitted_by": payload.source_user_id or payload.source_username or "system",
+            "status": status,
+            "affiliate_id": None,
+            "raw_text": self.raw_text,
+            "cleaned_text": title or description,
+            "ai_type": review.get("type"),
+            "ai_confidence": review.get("confidence"),
+            "ai_decision": review.get("decision"),
+        }
+
+        if status == "approved":
+            row.update(
+                {
+                    "reviewed_by": "auto",
+                    "reviewed_at": now,
+                    "approved_by": "auto",
+                    "approved_at": now,
+                }
+            )
+
+        if payload.source_user_id:
+            row["created_by_discord_id"] = payload.source_user_id
+
+        if "expires_at" in columns and payload.expiry:
+            row["expires_at"] = payload.expiry
+        if "expiry" in columns and payload.expiry:
+            row["expiry"] = payload.expiry
+        if "title" in columns and title:
+            row["title"] = title
+        if "casino_name" in columns and payload.casino_name:
+            row["casino_name"] = payload.casino_name
+        if "affiliate_url" in columns and payload.affiliate_url:
+            row["affiliate_url"] = payload.affiliate_url
+        if "tags" in columns and tags:
+            row["tags"] = tags
+        if "metadata" in columns and payload.metadata:
+            row["metadata"] = payload.metadata
+
+        # Extract the code / URL once here so readers (live dashboard) never
+        # have to regex the text on every poll.
+        if channel == "codes" and "bonus_code" in columns:
+            row["bonus_code"] = extract_code(description) or None
+        if channel == "links" and "promo_url" in columns:
+            row["promo_url"] = extract_url(description) or None
+        if "content_hash" in columns:
+            row["content_hash"] = self.hashes[0]
+
+        self.row = {key: value for key, value in row.items() if key in columns}
+
+    def stored_response(self, promo_id: int) -> Dict[str, Any]:
+        payload = self.payload
         return {
             "ok": True,
-            "duplicate": True,
-            "promo_id": existing_id,
-            "raw_drop": {"id": existing_id},
+            "promo_id": promo_id,
+            "raw_drop": {"id": promo_id},
+            "promo": {
+                "casino_name": payload.casino_name,
+                "affiliate_url": payload.affiliate_url,
+                "title": self.title,
+                "description": self.description,
+                "expiry": payload.expiry,
+                "tags": self.tags or [],
+                "source": self.source,
+            },
         }
 
-    affiliate_id = await find_affiliate_id(db, payload.casino_name, payload.affiliate_url)
 
-    status = "approved" if should_auto_approve(review) else "pending"
-    now = datetime.utcnow()
+def build_insert(rows: List[Dict[str, Any]], returning: str) -> Tuple[str, List[Any]]:
+    """
+    Multi-row INSERT for promos. Columns are the union across rows;
+    cells a row does not set use DEFAULT. A concurrent intake of the same
+    fingerprint loses on the unique content_hash index.
+    """
+    keys: List[str] = []
+    for row in rows:
+        keys.extend(k for k in row if k not in keys)
+
+    values: List[Any] = []
+    tuples = []
+    for row in rows:
+        cells = []
+        for key in keys:
+            if key in row:
+                values.append(row[key])
+                cells.append(f"${len(values)}")
+            else:
+                cells.append("DEFAULT")
+        tuples.append(f"({', '.join(cells)})")
+
+    on_conflict = (
+        "ON CONFLICT (content_hash) WHERE content_hash IS NOT NULL DO NOTHING"
+        if "content_hash" in keys
+        else ""
+    )
+    query = f"""
+        INSERT INTO promos ({", ".join(keys)})
+        VALUES {", ".join(tuples)}
+        {on_conflict}
+        RETURNING {returning}
+    """
+    return query, values
 
-    promo_payload: Dict[str, Any] = {
-        "source": source,
-        "channel": channel,
-        "content": description,
-        "clean_text": title or description,
-        "submitted_by": payload.source_user_id or payload.source_username or "system",
-        "status": status,
-        "affiliate_id": affiliate_id,
-        "raw_text": raw_text,
-        "cleaned_text": title or description,
-        "ai_type": review.get("type"),
-        "ai_confidence": review.get("confidence"),
-        "ai_decision": review.get("decision"),
-    }
 
-    if status == "approved":
-        promo_payload.update(
-            {
-                "reviewed_by": "auto",
-                "reviewed_at": now,
-                "approved_by": "auto",
-                "approved_at": now,
-            }
+@router.post("/intake")
+async def promo_intake(payload: PromoIntakeRequest):
+    db = await get_db()
+    columns = await load_promo_columns(db)
+
+    try:
+        prepared = PreparedPromo(payload, columns, datetime.utcnow())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    hashes = prepared.hashes
+    existing_id = await find_duplicate(db, columns, prepared.raw_text, hashes)
+    if existing_id:
+        logger.info("[PROMO] Duplicate intake ignored id=%s", existing_id)
+        return duplicate_response(existing_id)
+
+    if "affiliate_id" in prepared.row:
+        prepared.row["affiliate_id"] = await get_affiliate_resolver().resolve(
+            payload.casino_name, payload.affiliate_url, prepared.raw_text
         )
 
-    if payload.source_user_id:
-        promo_payload["created_by_discord_id"] = payload.source_user_id
-
-    if "expires_at" in columns and payload.expiry:
-        promo_payload["expires_at"] = payload.expiry
-    if "expiry" in columns and payload.expiry:
-        promo_payload["expiry"] = payload.expiry
-    if "title" in columns and title:
-        promo_payload["title"] = title
-    if "casino_name" in columns and payload.casino_name:
-        promo_payload["casino_name"] = payload.casino_name
-    if "affiliate_url" in columns and payload.affiliate_url:
-        promo_payload["affiliate_url"] = payload.affiliate_url
-    if "tags" in columns and tags:
-        promo_payload["tags"] = tags
-    if "metadata" in columns and payload.metadata:
-        promo_payload["metadata"] = payload.metadata
-
-    available_keys = [key for key in promo_payload.keys() if key in columns]
-    if not available_keys:
+    if not prepared.row:
         logger.error("[PROMO] No compatible columns found for promo insert")
         raise HTTPException(status_code=500, detail="Promos table schema mismatch")
 
-    placeholders = [f"${idx + 1}" for idx in range(len(available_keys))]
-    values = [promo_payload[key] for key in available_keys]
-
-    query = f"""
-        INSERT INTO promos ({", ".join(available_keys)})
-        VALUES ({", ".join(placeholders)})
-        RETURNING id
-    """
+    query, values = build_insert([prepared.row], "id")
 
     try:
         row = await db.fetchrow(query, *values)
+        winner = None
+        if row is None:
+            winner = await db.fetchrow(
+                f"SELECT id, {REMAINING_WINDOW_SQL} FROM promos WHERE content_hash = $1", hashes[0]
+            )
     except Exception as exc:
         logger.exception("[PROMO] Failed to insert promo")
         raise HTTPException(status_code=500, detail="Failed to store promo") from exc
 
+    if row is None:
+        if winner is None:
+            # The promo that won the conflict was deleted before we read it
+            logger.warning("[PROMO] Conflicting promo vanished for %s", hashes[0])
+            raise HTTPException(status_code=409, detail="Conflicting promo was removed, retry")
+        remember_fingerprint(hashes[0], winner["id"], winner["remaining_s"])
+        logger.info("[PROMO] Duplicate intake ignored id=%s", winner["id"])
+        return duplicate_response(winner["id"])
+
     promo_id = row["id"]
-    logger.info("[PROMO] Intake stored id=%s source=%s channel=%s", promo_id, source, channel)
+    if "content_hash" in prepared.row:
+        remember_fingerprint(hashes[0], promo_id)
+    logger.info("[PROMO] Intake stored id=%s source=%s channel=%s", promo_id, prepared.source, prepared.channel)
 
-    return {
-        "ok": True,
-        "promo_id": promo_id,
-        "raw_drop": {"id": promo_id},
-        "promo": {
-            "casino_name": payload.casino_name,
-            "affiliate_url": payload.affiliate_url,
-            "title": title,
-            "description": description,
-            "expiry": payload.expiry,
-            "tags": tags or [],
-            "source": source,
-        },
-    }
+    return prepared.stored_response(promo_id)
+
+
+# ============================================================
+#  BATCH INTAKE
+# ============================================================
+
+class PromoIntakeBatchRequest(BaseModel):
+    promos: List[PromoIntakeRequest]
+
+
+async def find_batch_duplicates(db, columns: set, prepared: List[PreparedPromo]) -> Dict[str, int]:
+    """
+    Existing promo ids for a batch, keyed by fingerprint hash (or raw text
+    on schemas without content_hash). LRU first, then one query.
+    """
+    found: Dict[str, int] = {}
+
+    if "content_hash" in columns:
+        wanted = []
+        for p in prepared:
+            for h in p.hashes:
+                cached_id = RECENT_FINGERPRINTS.get(h)
+                if cached_id is not None:
+                    found[h] = cached_id
+                else:
+                    wanted.append(h)
+        if wanted:
+            rows = await db.fetch(
+                f"""
+                SELECT id, content_hash, {REMAINING_WINDOW_SQL} FROM promos
+                WHERE content_hash = ANY($1::text[])
+                  AND created_at > NOW() - INTERVAL '{PROMO_DEDUPE_DAYS} days'
+                """,
+                wanted,
+            )
+            for r in rows:
+                found[r["content_hash"]] = r["id"]
+                remember_fingerprint(r["content_hash"], r["id"], r["remaining_s"])
+        return found
+
+    column = next((c for c in ("raw_text", "content", "clean_text", "cleaned_text") if c in columns), None)
+    if column:
+        rows = await db.fetch(
+            f"""
+            SELECT id, {column} AS text FROM promos
+            WHERE {column} = ANY($1::text[])
+              AND created_at > NOW() - INTERVAL '{PROMO_DEDUPE_DAYS} days'
+            """,
+            [p.raw_text for p in prepared],
+        )
+        for r in rows:
+            found.setdefault(r["text"], r["id"])
+    return found
+
+
+@router.post("/intake/batch")
+async def promo_intake_batch(payload: PromoIntakeBatchRequest):
+    """
+    Intake for many messages at once (forwarder backlog flushes).
+    Classification runs over the whole batch in-process; duplicates are
+    resolved within the batch and against the DB with one lookup, and
+    survivors are stored with a single multi-row INSERT ... RETURNING.
+    Results are returned in request order, one per message.
+    """
+    items = payload.promos
+    if len(items) > INTAKE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {INTAKE_BATCH_MAX} promos per batch")
+
+    db = await get_db()
+    columns = await load_promo_columns(db)
+    if not columns:
+        logger.error("[PROMO] No compatible columns found for promo insert")
+        raise HTTPException(status_code=500, detail="Promos table schema mismatch")
+
+    now = datetime.utcnow()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    prepared: Dict[int, PreparedPromo] = {}
+    for idx, item in enumerate(items):
+        try:
+            prepared[idx] = PreparedPromo(item, columns, now)
+        except ValueError as exc:
+            results[idx] = {"ok": False, "error": str(exc)}
+
+    use_hash = "content_hash" in columns
+
+    def dedupe_keys(p: PreparedPromo) -> List[str]:
+        return p.hashes if use_hash else [p.raw_text]
+
+    existing = await find_batch_duplicates(db, columns, list(prepared.values()))
+
+    # First occurrence of each fingerprint is stored; later ones point at it
+    survivors: Dict[str, int] = {}
+    followers: Dict[int, str] = {}
+    for idx, p in prepared.items():
+        keys = dedupe_keys(p)
+        existing_id = next((existing[k] for k in keys if k in existing), None)
+        if existing_id is not None:
+            results[idx] = duplicate_response(existing_id)
+            continue
+        key = next((k for k in keys if k in survivors), None)
+        if key is not None:
+            followers[idx] = key
+            continue
+        survivors[keys[0]] = idx
+
+    if survivors and "affiliate_id" in columns:
+        affiliates = await get_affiliate_resolver().get()
+        for idx in survivors.values():
+            p = prepared[idx]
+            p.row["affiliate_id"] = affiliates.resolve(p.payload.casino_name, p.payload.affiliate_url, p.raw_text)
+
+    stored: Dict[str, int] = {}
+    if survivors:
+        order = list(survivors.items())
+        query, values = build_insert(
+            [prepared[idx].row for _, idx in order],
+            "id, content_hash" if use_hash else "id",
+        )
+        try:
+            rows = await db.fetch(query, *values)
+            if use_hash:
+                stored = {r["content_hash"]: r["id"] for r in rows}
+                lost = [key for key, _ in order if key not in stored]
+                if lost:
+                    for r in await db.fetch(
+                        f"SELECT id, content_hash, {REMAINING_WINDOW_SQL} FROM promos WHERE content_hash = ANY($1::text[])",
+                        lost,
+                    ):
+                        results[survivors[r["content_hash"]]] = duplicate_response(r["id"])
+                        existing[r["content_hash"]] = r["id"]
+                        remember_fingerprint(r["content_hash"], r["id"], r["remaining_s"])
+                    # Conflict winners deleted before the lookup above
+                    for key in lost:
+                        if key not in existing:
+                            results[survivors[key]] = {"ok": False, "error": "not stored"}
+            else:
+                # VALUES order is preserved by RETURNING for a plain INSERT
+                stored = {key: r["id"] for (key, _), r in zip(order, rows)}
+        except Exception as exc:
+            logger.exception("[PROMO] Failed to insert promo batch")
+            raise HTTPException(status_code=500, detail="Failed to store promos") from exc
+
+    for key, promo_id in stored.items():
+        idx = survivors[key]
+        results[idx] = prepared[idx].stored_response(promo_id)
+        if use_hash:
+            remember_fingerprint(key, promo_id)
+
+    for idx, key in followers.items():
+        promo_id = stored.get(key) or existing.get(key)
+        results[idx] = duplicate_response(promo_id) if promo_id else {"ok": False, "error": "not stored"}
+
+    logger.info(
+        "[PROMO] Batch intake received=%s stored=%s duplicates=%s",
+        len(items),
+        len(stored),
+        sum(1 for r in results if r and r.get("duplicate")),
+    )
+
+    return {"ok": True, "count": len(items), "stored": len(stored), "results": results}
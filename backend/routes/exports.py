@@ -0,0 +1,273 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.logger import get_logger
+from services.auth import Principal, get_principal
+from services.db import get_db
+from services.promo_schema import load_promo_columns
+
+router = APIRouter(prefix="/api/admin/export", tags=["Admin Export"])
+logger = get_logger("gcz-export")
+
+# Rows pulled per server-side cursor round-trip
+EXPORT_PREFETCH = 1000
+# Bytes buffered before a chunk is yielded to the client
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# pin_hash is deliberately not exportable
+USER_EXPORT_COLUMNS = (
+    "id",
+    "user_id",
+    "telegram_id",
+    "telegram_username",
+    "username",
+    "full_name",
+    "email",
+    "cwallet_id",
+    "jurisdiction",
+    "admin_level",
+    "locked",
+    "created_at",
+    "updated_at",
+)
+
+CLICK_EXPORT_COLUMNS = (
+    "id",
+    "affiliate_id",
+    "user_id",
+    "slug",
+    "referrer",
+    "user_agent",
+    "ip_address",
+    "clicked_at",
+)
+
+PROMO_EXPORT_COLUMNS = (
+    "id",
+    "source",
+    "channel",
+    "type",
+    "status",
+    "affiliate_id",
+    "casino_name",
+    "site",
+    "title",
+    "content",
+    "description",
+    "bonus_code",
+    "code",
+    "promo_url",
+    "url",
+    "submitted_by",
+    "reviewed_by",
+    "reviewed_at",
+    "approved_by",
+    "approved_at",
+    "expires_at",
+    "active",
+    "created_at",
+    "updated_at",
+)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(value)
+
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class RowEncoder:
+    """Encodes records as NDJSON or CSV (header first) into str chunks."""
+
+    def __init__(self, fmt: str, columns: Sequence[str]):
+        self.fmt = fmt
+        self.columns = list(columns)
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer) if fmt == "csv" else None
+
+    def header(self) -> str:
+        if self._csv is None:
+            return ""
+        self._csv.writerow(self.columns)
+        return self._drain()
+
+    def encode(self, record) -> str:
+        if self._csv is not None:
+            self._csv.writerow([_csv_value(record[c]) for c in self.columns])
+            return self._drain()
+        return json.dumps(dict(record), default=_json_default, ensure_ascii=False) + "\n"
+
+    def _drain(self) -> str:
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return value
+
+
+async def stream_query(
+    query: str,
+    args: Sequence[Any],
+    columns: Sequence[str],
+    fmt: str,
+    compress: bool,
+    label: str,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a query through an asyncpg server-side cursor. Memory is
+    bounded by EXPORT_PREFETCH rows plus one EXPORT_CHUNK_BYTES buffer;
+    the pooled connection is held only while the response streams.
+    """
+    encoder = RowEncoder(fmt, columns)
+    gzipper = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    parts: List[str] = [encoder.header()]
+    size = len(parts[0])
+    rows = 0
+
+    def flush() -> bytes:
+        data = "".join(parts).encode("utf-8")
+        parts.clear()
+        return gzipper.compress(data) if gzipper else data
+
+    pool = await get_db()
+    try:
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                async for record in conn.cursor(query, *args, prefetch=EXPORT_PREFETCH):
+                    line = encoder.encode(record)
+                    parts.append(line)
+                    size += len(line)
+                    rows += 1
+                    if size >= EXPORT_CHUNK_BYTES:
+                        chunk = flush()
+                        size = 0
+                        if chunk:
+                            yield chunk
+
+        tail = flush()
+        if gzipper:
+            tail += gzipper.flush()
+        if tail:
+            yield tail
+        logger.info(f"[EXPORT] {label} export finished ({rows} rows, {fmt})")
+
+    except Exception as e:
+        # Headers are already sent; the truncated body is the only signal
+        logger.error(f"[EXPORT] {label} export failed after {rows} rows: {e}")
+        raise
+
+
+def export_response(
+    table: str,
+    columns: Sequence[str],
+    time_column: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    fmt: str,
+    compress: bool,
+) -> StreamingResponse:
+    conditions = []
+    args: List[Any] = []
+    if since:
+        args.append(since)
+        conditions.append(f"{time_column} >= ${len(args)}")
+    if until:
+        args.append(until)
+        conditions.append(f"{time_column} < ${len(args)}")
+
+    query = f"""
+        SELECT {", ".join(columns)}
+        FROM {table}
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY id
+    """
+
+    # gzip is transfer encoding: clients that ask for it save the plain file
+    filename = f"{table}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_query(query, args, columns, fmt, compress, table),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+
+# ============================================================
+#  EXPORTS
+# ============================================================
+
+FORMAT_QUERY = Query("ndjson", pattern="^(ndjson|csv)$")
+
+
+async def require_export_admin(principal: Principal = Depends(get_principal)) -> Principal:
+    """Exports carry PII (emails, wallets, IPs): verified admin bearer token only."""
+    if not principal.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return principal
+
+
+@router.get("/users")
+async def export_users(
+    format: str = FORMAT_QUERY,
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    principal: Principal = Depends(require_export_admin),
+):
+    """Streams users (created_at in [since, until)) as NDJSON or CSV."""
+    logger.info(f"[EXPORT] Users export requested by admin {principal.user_id}")
+    return export_response("users", USER_EXPORT_COLUMNS, "created_at", since, until, format, gzip)
+
+
+@router.get("/clicks")
+async def export_clicks(
+    format: str = FORMAT_QUERY,
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    principal: Principal = Depends(require_export_admin),
+):
+    """Streams affiliate_clicks (clicked_at in [since, until)) as NDJSON or CSV."""
+    logger.info(f"[EXPORT] Clicks export requested by admin {principal.user_id}")
+    return export_response("affiliate_clicks", CLICK_EXPORT_COLUMNS, "clicked_at", since, until, format, gzip)
+
+
+@router.get("/promos")
+async def export_promos(
+    format: str = FORMAT_QUERY,
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    principal: Principal = Depends(require_export_admin),
+):
+    """Streams promos (created_at in [since, until)) as NDJSON or CSV."""
+    db = await get_db()
+    available = await load_promo_columns(db)
+    columns = [c for c in PROMO_EXPORT_COLUMNS if c in available]
+    if not columns:
+        raise HTTPException(status_code=500, detail="Promos table schema mismatch")
+
+    logger.info(f"[EXPORT] Promos export requested by admin {principal.user_id}")
+    return export_response("promos", columns, "created_at", since, until, format, gzip)
@@ -1,89 +1,90 @@
-import os
-import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, FrozenSet, Optional
 
 from fastapi import APIRouter
 
 from backend.logger import get_logger
+from services.cache import cached
 from services.db import get_db
+from services.promo_schema import load_promo_columns
 
 router = APIRouter(prefix="/api", tags=["Live Dashboard"])
 logger = get_logger("gcz-live-dashboard")
 
-_PROMO_COLUMNS: Optional[set] = None
-
-CODE_REGEX = re.compile(r"\b[A-Z0-9]{4,20}\b")
-URL_REGEX = re.compile(r"https?://[^\s]+", re.IGNORECASE)
-
-
-def extract_code(text: str) -> str:
-    match = CODE_REGEX.search(text or "")
-    return match.group(0) if match else ""
-
-
-def extract_url(text: str) -> str:
-    match = URL_REGEX.search(text or "")
-    if not match:
-        return ""
-    return match.group(0).rstrip(".,;!?")
-
-
-async def load_promo_columns(db) -> set:
-    global _PROMO_COLUMNS
-    if _PROMO_COLUMNS is not None:
-        return _PROMO_COLUMNS
-    try:
-        rows = await db.fetch(
-            """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema = 'public' AND table_name = 'promos'
-            """
-        )
-        _PROMO_COLUMNS = {row["column_name"] for row in rows}
-    except Exception as exc:
-        logger.warning("[LIVE] Failed to read promos columns: %s", exc)
-        _PROMO_COLUMNS = set()
-    return _PROMO_COLUMNS
-
-
-def resolve_site(row: Dict[str, Any]) -> str:
-    return (
-        row.get("affiliate_name")
-        or row.get("casino_name")
-        or row.get("site")
-        or "Unknown"
-    )
+CODE_CHANNELS = ("codes", "code")
+LINK_CHANNELS = ("links", "link", "url")
+
+STATUS_FILTERS = {
+    "live": ["approved", "pending"],
+    "all": ["approved", "pending", "denied", "archived"],
+}
+
+
+def _first_of(columns: FrozenSet[str], candidates, prefix: str = "p.") -> str:
+    """COALESCE over the candidate columns that exist, treating '' like NULL (Python `or`)."""
+    present = [f"NULLIF({prefix}{c}, '')" for c in candidates if c in columns]
+    return f"COALESCE({', '.join(present)}, '')" if present else "''"
+
+
+@lru_cache(maxsize=4)
+def build_dashboard_query(columns: FrozenSet[str]) -> Optional[str]:
+    """
+    Compile the live dashboard query for the promos columns that exist.
 
+    Codes and links come back from one round-trip as two LIMITed branches
+    of a UNION ALL (each can walk idx_promos_created_at). Code / URL are
+    read from the columns intake fills in; no regex on read.
+    Parameters: $1 statuses (text[]), $2 per-channel limit.
+    """
+    channel_column = "channel" if "channel" in columns else "type" if "type" in columns else None
+    if not channel_column:
+        return None
 
-def resolve_description(row: Dict[str, Any]) -> str:
-    return (
-        row.get("description")
-        or row.get("content")
-        or row.get("raw_text")
-        or row.get("clean_text")
-        or ""
+    join_clause = ""
+    site_sources = []
+    if "affiliate_id" in columns:
+        join_clause = "LEFT JOIN affiliates_master am ON p.affiliate_id = am.id"
+        site_sources.append("NULLIF(am.name, '')")
+    site_sources += [f"NULLIF(p.{c}, '')" for c in ("casino_name", "site") if c in columns]
+    site_sources.append("'Unknown'")
+
+    expires = [c for c in ("expires_at", "expiry", "updated_at") if c in columns]
+
+    select_sql = ", ".join(
+        [
+            "p.id",
+            f"COALESCE({', '.join(site_sources)}) AS site",
+            f"{_first_of(columns, ('description', 'content', 'raw_text', 'clean_text'))} AS description",
+            f"{_first_of(columns, ('bonus_code', 'code'))} AS code",
+            f"{_first_of(columns, ('promo_url', 'url'))} AS url",
+            "p.created_at",
+        ]
+        + [f"p.{c} AS exp_{c}" for c in expires]
     )
 
+    def branch(kind: str, channels) -> str:
+        channel_list = ", ".join(f"'{c}'" for c in channels)
+        return f"""
+            (SELECT '{kind}' AS kind, {select_sql}
+             FROM promos p
+             {join_clause}
+             WHERE p.status = ANY($1::text[])
+               AND p.{channel_column} IN ({channel_list})
+             ORDER BY p.created_at DESC
+             LIMIT $2)
+        """
 
-def resolve_created_at(row: Dict[str, Any]) -> Optional[str]:
-    created = row.get("created_at")
-    if hasattr(created, "isoformat"):
-        return created.isoformat()
-    return str(created) if created else None
+    return branch("codes", CODE_CHANNELS) + " UNION ALL " + branch("links", LINK_CHANNELS)
 
 
-def resolve_expires_at(row: Dict[str, Any]) -> Optional[str]:
-    for key in ("expires_at", "expiry", "updated_at"):
-        value = row.get(key)
-        if value:
-            if hasattr(value, "isoformat"):
-                return value.isoformat()
-            return str(value)
-    return None
+def _iso(value: Any) -> Optional[str]:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value) if value else None
 
 
 @router.get("/live-dashboard")
+@cached("promos", ttl=5)
 async def live_dashboard(status: str = "live", limit: int = 20):
     db = await get_db()
     columns = await load_promo_columns(db)
@@ -91,102 +92,38 @@ async def live_dashboard(status: str = "live", limit: int = 20):
     if not columns:
         return {"promoCodes": [], "promoLinks": []}
 
-    if status == "live":
-        statuses = ["approved", "pending"]
-    elif status == "all":
-        statuses = ["approved", "pending", "denied", "archived"]
-    else:
-        statuses = [status]
-
-    status_clause = " OR ".join([f"p.status = ${idx + 1}" for idx in range(len(statuses))])
-    limit_param_index = len(statuses) + 1
-
-    channel_column = "channel" if "channel" in columns else "type" if "type" in columns else None
-    if not channel_column:
+    query = build_dashboard_query(columns)
+    if query is None:
         logger.warning("[LIVE] No channel/type column found on promos table")
         return {"promoCodes": [], "promoLinks": []}
 
-    join_clause = ""
-    if "affiliate_id" in columns:
-        join_clause = "LEFT JOIN affiliates_master am ON p.affiliate_id = am.id"
-
-    select_columns = ["p.id", "p.created_at", "p.updated_at"]
-    for col in (
-        "content",
-        "clean_text",
-        "raw_text",
-        "description",
-        "bonus_code",
-        "promo_url",
-        "url",
-        "code",
-        "casino_name",
-        "site",
-        "expires_at",
-        "expiry",
-    ):
-        if col in columns:
-            select_columns.append(f"p.{col}")
-
-    if join_clause:
-        select_columns.extend(["am.name AS affiliate_name", "am.affiliate_url AS affiliate_url"])
-
-    select_sql = ", ".join(select_columns)
-
-    promo_codes_query = f"""
-        SELECT {select_sql}
-        FROM promos p
-        {join_clause}
-        WHERE ({status_clause})
-          AND p.{channel_column} IN ('codes', 'code')
-        ORDER BY p.created_at DESC
-        LIMIT ${limit_param_index}
-    """
-
-    promo_links_query = f"""
-        SELECT {select_sql}
-        FROM promos p
-        {join_clause}
-        WHERE ({status_clause})
-          AND p.{channel_column} IN ('links', 'link', 'url')
-        ORDER BY p.created_at DESC
-        LIMIT ${limit_param_index}
-    """
-
-    params = statuses + [limit]
-
-    codes_rows = await db.fetch(promo_codes_query, *params)
-    links_rows = await db.fetch(promo_links_query, *params)
+    rows = await db.fetch(query, STATUS_FILTERS.get(status, [status]), limit)
+    expires_keys = [k for k in rows[0].keys() if k.startswith("exp_")] if rows else []
 
     promo_codes = []
-    for row in codes_rows:
-        row_dict = dict(row)
-        description = resolve_description(row_dict)
-        code = row_dict.get("bonus_code") or row_dict.get("code") or extract_code(description)
-        promo_codes.append(
-            {
-                "id": str(row_dict.get("id")),
-                "site": resolve_site(row_dict),
-                "code": code or "",
-                "description": description,
-                "expiresAt": resolve_expires_at(row_dict),
-                "createdAt": resolve_created_at(row_dict),
-            }
-        )
-
     promo_links = []
-    for row in links_rows:
-        row_dict = dict(row)
-        description = resolve_description(row_dict)
-        url = row_dict.get("promo_url") or row_dict.get("url") or extract_url(description)
-        promo_links.append(
-            {
-                "id": str(row_dict.get("id")),
-                "site": resolve_site(row_dict),
-                "url": url or "",
-                "description": description,
-                "createdAt": resolve_created_at(row_dict),
-            }
-        )
+    for row in rows:
+        if row["kind"] == "codes":
+            expires_at = next((row[k] for k in expires_keys if row[k]), None)
+            promo_codes.append(
+                {
+                    "id": str(row["id"]),
+                    "site": row["site"],
+                    "code": row["code"],
+                    "description": row["description"],
+                    "expiresAt": _iso(expires_at),
+                    "createdAt": _iso(row["created_at"]),
+                }
+            )
+        else:
+            promo_links.append(
+                {
+                    "id": str(row["id"]),
+                    "site": row["site"],
+                    "url": row["url"],
+                    "description": row["description"],
+                    "createdAt": _iso(row["created_at"]),
+                }
+            )
 
     return {"promoCodes": promo_codes, "promoLinks": promo_links}
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from services.db import get_db
 from backend.logger import get_logger
-from services.auth import verify_telegram_signature
+from services.auth import invalidate_user_profile, verify_telegram_signature
 
 router = APIRouter(prefix="/api/profile", tags=["Profile"])
 logger = get_logger("gcz-profile")
@@ -220,6 +220,9 @@ async def link_telegram_profile(request: Request):
                 cwallet_id,
             )
 
+        invalidate_user_profile(target_user_id)
+        invalidate_user_profile(telegram_id)
+
         logger.info(
             "[PROFILE] Telegram linked",
             extra={
@@ -1,17 +1,34 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from services.db import get_db
+from services.cache import cached
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Keyset,
+    cached_count,
+    fetch_page,
+    page_response,
+    parse_fields,
+)
 from services.promos_service import get_promo_codes, get_promo_links
 from backend.logger import get_logger
 
 router = APIRouter(prefix="/api/promos", tags=["Promos"])
 logger = get_logger("gcz-promos")
 
+RAW_PROMO_COLUMNS = ("id", "type", "site", "description", "created_at", "verified", "code", "url")
+RAW_PROMO_KEYSET = Keyset(("created_at", "DESC", "timestamp"), ("id", "DESC", "int"))
+RAW_PROMO_LIMIT = 200
+
 
 # ============================================================
 #  MASTER LIST (codes + links)
 # ============================================================
 
 @router.get("/")
+@cached("promos", ttl=60, stale_ttl=120)
 async def all_promos():
     """
     Returns both promo codes and promo links in GCZ format.
@@ -39,47 +56,64 @@ async def all_promos():
 #  RAW DB LIST (legacy consumers)
 # ============================================================
 
+def normalize_raw_promo(r, fields) -> dict:
+    promo = {
+        "id": r["id"],
+        "type": r["type"].lower() if r["type"] else None,
+        "site": r["site"].lower() if r["site"] else None,
+        "description": r["description"],
+        "created_at": r["created_at"],
+        "verified": bool(r["verified"]),
+        "code": r["code"],
+        "url": r["url"],
+    }
+    return {f: promo[f] for f in fields}
+
+
 @router.get("/raw")
-async def list_promos_raw():
+async def list_promos_raw(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Returns the latest active promos directly from DB.
     Normalized for GCZ frontend + bots.
+
+    Without limit/cursor: the latest 200 as a list (legacy shape). With
+    either: a keyset page on (created_at, id) as {items, nextCursor, limit, total}.
     """
+    output = parse_fields(fields, RAW_PROMO_COLUMNS)
     db = await get_db()
 
     try:
-        rows = await db.fetch(
-            """
-            SELECT
-                id,
-                type,
-                site,
-                description,
-                created_at,
-                verified,
-                code,
-                url
-            FROM promos
-            WHERE active = TRUE
-            ORDER BY created_at DESC
-            LIMIT 200
-            """
+        if limit is None and cursor is None:
+            rows = await db.fetch(
+                f"""
+                SELECT {", ".join(RAW_PROMO_COLUMNS)}
+                FROM promos
+                WHERE active = TRUE
+                ORDER BY created_at DESC
+                LIMIT {RAW_PROMO_LIMIT}
+                """
+            )
+            return [normalize_raw_promo(r, output) for r in rows]
+
+        limit = limit or DEFAULT_PAGE_SIZE
+        rows, next_cursor = await fetch_page(
+            db,
+            select=RAW_PROMO_COLUMNS,
+            from_sql="promos",
+            keyset=RAW_PROMO_KEYSET,
+            where="active = TRUE",
+            cursor=cursor,
+            limit=limit,
         )
+        total = await cached_count(db, "SELECT count(*) FROM promos WHERE active = TRUE")
+        return page_response([normalize_raw_promo(r, output) for r in rows], next_cursor, limit, total)
 
-        promos = []
-        for r in rows:
-            promos.append({
-                "id": r["id"],
-                "type": r["type"].lower() if r["type"] else None,
-                "site": r["site"].lower() if r["site"] else None,
-                "description": r["description"],
-                "created_at": r["created_at"],
-                "verified": bool(r["verified"]),
-                "code": r["code"],
-                "url": r["url"],
-            })
-
-        return promos
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"[PROMOS] Failed to load raw promos: {e}")
@@ -2,7 +2,7 @@
 # Enables imports like:
 #   from scripts import import_affiliates, rebuild_redirects, sync_casinos
 
-from .import_affiliates import import_affiliates
+from .import_affiliates_csv import import_affiliates
 from .rebuild_redirects import rebuild_redirects
 from .sync_casinos import sync_casinos
 from .sync_promos import sync_promos
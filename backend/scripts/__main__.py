@@ -0,0 +1,33 @@
+# backend/scripts/__main__.py
+#
+# One-shot runner for the maintenance scripts, used by the AI workflow
+# scheduler (ai/workflows/tasks.py):
+#   cd backend && python -m scripts sync_casinos
+
+import asyncio
+import sys
+
+import scripts
+from backend.logger import get_logger
+
+logger = get_logger("script-runner")
+
+
+async def run(name: str) -> int:
+    result = await getattr(scripts, name)()
+    # Scripts log their own errors and report failure by returning False;
+    # the exit code is what marks a scheduled job failed (and retried)
+    return 1 if result is False else 0
+
+
+def main(argv) -> int:
+    if len(argv) != 1 or argv[0] not in scripts.__all__:
+        print(f"usage: python -m scripts <{'|'.join(scripts.__all__)}>", file=sys.stderr)
+        return 2
+
+    logger.info(f"[SCRIPTS] Running {argv[0]}")
+    return asyncio.run(run(argv[0]))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
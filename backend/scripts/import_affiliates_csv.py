@@ -1,29 +1,93 @@
-import csv
-from services.affiliates_service import resolve_domain, generate_icon_url, upsert_affiliate
+from backend.catalog import get_catalog
+from services.affiliates_service import (
+    AFFILIATE_COLUMNS,
+    AFFILIATE_UPDATE_COLUMNS,
+    affiliate_content_hash,
+    build_affiliate_params,
+    generate_icon_url,
+    resolve_domains,
+)
+from services.cache import publish_invalidation
+from services.db import get_db
 from backend.logger import get_logger
 
-CSV_PATH = "/var/www/html/gcz/master_affiliates.csv"
 logger = get_logger("gcz-affiliates-import")
 
+IMPORT_COLUMNS = AFFILIATE_COLUMNS + ("content_hash",)
+
+# Staged rows are merged into affiliates_master in one statement
+MERGE_IMPORT_SQL = f"""
+    INSERT INTO affiliates_master ({", ".join(IMPORT_COLUMNS)})
+    SELECT {", ".join(IMPORT_COLUMNS)} FROM affiliates_import
+    ON CONFLICT (name)
+    DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in AFFILIATE_UPDATE_COLUMNS)},
+        content_hash = EXCLUDED.content_hash,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+async def build_import_rows(catalog):
+    """Normalized, hashed rows keyed by name (last CSV row wins on duplicates)."""
+    domains = await resolve_domains(
+        r.affiliate_url for r in catalog.records if not r.resolved_domain
+    )
+
+    rows = {}
+    for record in catalog.records:
+        row = record.as_row()
+        row["resolved_domain"] = record.resolved_domain or domains.get(record.affiliate_url)
+        row["icon_url"] = record.icon_url or await generate_icon_url(row["resolved_domain"])
+
+        params = build_affiliate_params(row)
+        rows[record.name] = (*params, affiliate_content_hash(params))
+    return rows
+
 
 async def import_affiliates():
     """
-    Reads master_affiliates.csv and syncs into affiliates_master table.
+    Syncs the shared affiliate catalog (master_affiliates.csv) into affiliates_master.
+
+    Rows whose content_hash already matches the DB are skipped; the rest
+    are COPY'd into a temp table and merged with one INSERT ... ON CONFLICT,
+    all in a single transaction.
     """
     try:
-        with open(CSV_PATH, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+        catalog = get_catalog().load_sync()
+        rows = await build_import_rows(catalog)
 
-            for row in reader:
-                domain = await resolve_domain(row["affiliate_url"])
-                icon = await generate_icon_url(domain)
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                existing = {
+                    r["name"]: r["content_hash"]
+                    for r in await conn.fetch("SELECT name, content_hash FROM affiliates_master")
+                }
+                changed = [
+                    row for name, row in rows.items()
+                    if existing.get(name) != row[-1]
+                ]
 
-                row["resolved_domain"] = domain
-                row["icon_url"] = icon
+                if changed:
+                    await conn.execute(
+                        "CREATE TEMP TABLE affiliates_import "
+                        "(LIKE affiliates_master INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await conn.copy_records_to_table(
+                        "affiliates_import", records=changed, columns=IMPORT_COLUMNS
+                    )
+                    await conn.execute(MERGE_IMPORT_SQL)
 
-                await upsert_affiliate(row)
+        if changed:
+            # The API's affiliate resolver picks the change up through its
+            # count/max(updated_at) probe (MERGE_IMPORT_SQL bumps updated_at)
+            await publish_invalidation("affiliates")
 
-        logger.info("[AFFILIATES] CSV import completed successfully")
+        logger.info(
+            f"[AFFILIATES] CSV import completed successfully "
+            f"({len(rows)} rows, {len(changed)} changed, {len(rows) - len(changed)} unchanged)"
+        )
 
     except Exception as e:
-        logger.error(f"[AFFILIATES] CSV import failed: {e}")
\ No newline at end of file
+        logger.error(f"[AFFILIATES] CSV import failed: {e}")
+        return False
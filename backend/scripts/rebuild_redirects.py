@@ -1,34 +1,62 @@
 # backend/scripts/rebuild_redirects.py
 
-from services.db import get_db
+from datetime import datetime
+from typing import Optional
+
+from services.db import get_db, rebuild_table
 from backend.logger import get_logger
 
 logger = get_logger("script-rebuild-redirects")
 
-
-async def rebuild_redirects():
+# One row per slug (redirects.slug is unique); same fallback as
+# backend.catalog.slugify.
+REDIRECT_SELECT = """
+    SELECT DISTINCT ON (s.slug) s.name, s.slug, s.affiliate_url
+    FROM (
+        SELECT id, name, affiliate_url, updated_at,
+               COALESCE(NULLIF(slug, ''), replace(replace(lower(btrim(name)), ' ', '-'), '_', '-')) AS slug
+        FROM affiliates_master
+    ) s
+    WHERE {where}
+    ORDER BY s.slug, s.id
+"""
+
+
+async def rebuild_redirects(since: Optional[datetime] = None):
     """
     Rebuilds redirect table from affiliates_master.
+
+    Full mode fills a shadow table with one INSERT ... SELECT and swaps
+    it in atomically. With `since`, only slugs of affiliates updated after
+    that time are replaced in place.
     """
-    db = await get_db()
+    pool = await get_db()
 
     logger.info("[REDIRECTS] Rebuilding redirect table...")
 
     try:
-        rows = await db.fetch("SELECT name, affiliate_url, slug FROM affiliates_master")
-
-        await db.execute("TRUNCATE TABLE redirects")
-
-        for r in rows:
-            await db.execute(
-                """
-                INSERT INTO redirects (name, slug, url)
-                VALUES ($1, $2, $3)
-                """,
-                r["name"], r["slug"], r["affiliate_url"]
-            )
-
-        logger.info(f"[REDIRECTS] Rebuilt {len(rows)} redirects")
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                if since is None:
+                    status = await rebuild_table(
+                        conn,
+                        "redirects",
+                        "INSERT INTO {shadow} (name, slug, url) "
+                        + REDIRECT_SELECT.format(where="TRUE"),
+                    )
+                else:
+                    changed = REDIRECT_SELECT.format(where="s.updated_at > $1")
+                    await conn.execute(
+                        f"DELETE FROM redirects WHERE slug IN (SELECT slug FROM ({changed}) c)",
+                        since,
+                    )
+                    status = await conn.execute(
+                        f"INSERT INTO redirects (name, slug, url) {changed}",
+                        since,
+                    )
+
+        logger.info(f"[REDIRECTS] Rebuilt {status.rsplit(' ', 1)[-1]} redirects")
 
     except Exception as e:
-        logger.error(f"[REDIRECTS] Failed: {e}")
\ No newline at end of file
+        logger.error(f"[REDIRECTS] Failed: {e}")
+        return False
@@ -1,43 +1,71 @@
 # backend/scripts/sync_casinos.py
 
-from services.db import get_db
+from datetime import datetime
+from typing import Optional
+
+from services.cache import publish_invalidation
+from services.db import get_db, rebuild_table
 from backend.logger import get_logger
 
 logger = get_logger("script-sync-casinos")
 
+CASINO_COLUMNS = """
+    name, slug, category, icon_url, priority, status, level,
+    bonus_code, bonus_description, redemption_speed,
+    redemption_minimum, redemption_type
+"""
+
+# Same fallback as backend.catalog.slugify
+CASINO_SELECT = """
+    SELECT name,
+           COALESCE(NULLIF(slug, ''), replace(replace(lower(btrim(name)), ' ', '-'), '_', '-')),
+           category, icon_url, priority, status, level,
+           bonus_code, bonus_description, redemption_speed,
+           redemption_minimum, redemption_type
+    FROM affiliates_master
+"""
+
 
-async def sync_casinos():
+async def sync_casinos(since: Optional[datetime] = None):
     """
     Syncs casinos table from affiliates_master.
+
+    Full mode builds a shadow table with one INSERT ... SELECT and swaps
+    it in, so /api/casinos never sees an empty table. With `since`, only
+    affiliates updated after that time are replaced in place (deletions
+    in affiliates_master are picked up by the next full sync).
     """
-    db = await get_db()
+    pool = await get_db()
 
     logger.info("[CASINOS] Syncing casinos from affiliates_master...")
 
     try:
-        rows = await db.fetch("""
-            SELECT name, slug, category, icon_url, priority, status, level,
-                   bonus_code, bonus_description, redemption_speed,
-                   redemption_minimum, redemption_type
-            FROM affiliates_master
-        """)
-
-        await db.execute("TRUNCATE TABLE casinos")
-
-        for r in rows:
-            await db.execute(
-                """
-                INSERT INTO casinos (
-                    name, slug, category, icon_url, priority, status, level,
-                    bonus_code, bonus_description, redemption_speed,
-                    redemption_minimum, redemption_type
-                )
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12)
-                """,
-                *r.values()
-            )
-
-        logger.info(f"[CASINOS] Synced {len(rows)} casinos")
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                if since is None:
+                    status = await rebuild_table(
+                        conn,
+                        "casinos",
+                        f"INSERT INTO {{shadow}} ({CASINO_COLUMNS}) {CASINO_SELECT}",
+                    )
+                else:
+                    await conn.execute(
+                        """
+                        DELETE FROM casinos c
+                        USING affiliates_master am
+                        WHERE am.updated_at > $1
+                          AND (c.name = am.name OR c.slug = am.slug)
+                        """,
+                        since,
+                    )
+                    status = await conn.execute(
+                        f"INSERT INTO casinos ({CASINO_COLUMNS}) {CASINO_SELECT} WHERE updated_at > $1",
+                        since,
+                    )
+
+        await publish_invalidation("casinos")
+        logger.info(f"[CASINOS] Synced {status.rsplit(' ', 1)[-1]} casinos")
 
     except Exception as e:
-        logger.error(f"[CASINOS] Sync failed: {e}")
\ No newline at end of file
+        logger.error(f"[CASINOS] Sync failed: {e}")
+        return False
@@ -32,4 +32,5 @@ async def sync_giveaways():
         logger.info("[GIVEAWAYS] Sync complete")
 
     except Exception as e:
-        logger.error(f"[GIVEAWAYS] Sync failed: {e}")
\ No newline at end of file
+        logger.error(f"[GIVEAWAYS] Sync failed: {e}")
+        return False
@@ -1,5 +1,6 @@
 # backend/scripts/sync_promos.py
 
+from services.cache import publish_invalidation
 from services.db import get_db
 from backend.logger import get_logger
 
@@ -16,7 +17,9 @@ async def sync_promos():
 
     try:
         await db.execute("REFRESH MATERIALIZED VIEW promos_view")
+        await publish_invalidation("promos")
         logger.info("[PROMOS] Materialized view refreshed")
 
     except Exception as e:
-        logger.error(f"[PROMOS] Sync failed: {e}")
\ No newline at end of file
+        logger.error(f"[PROMOS] Sync failed: {e}")
+        return False
@@ -23,4 +23,5 @@ async def sync_raffles():
         logger.info("[RAFFLES] Old raffles cleaned")
 
     except Exception as e:
-        logger.error(f"[RAFFLES] Sync failed: {e}")
\ No newline at end of file
+        logger.error(f"[RAFFLES] Sync failed: {e}")
+        return False
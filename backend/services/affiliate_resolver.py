@@ -0,0 +1,242 @@
+import asyncio
+import re
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from backend.catalog import AffiliateRecord, normalize_key
+from services.db import get_db
+from backend.logger import get_logger
+
+logger = get_logger("gcz-affiliate-resolver")
+
+# How often (seconds) the cheap change probe runs
+RESOLVER_CHECK_SECONDS = 30
+
+# Free-text mentions: keys shorter than this only match exactly via casino_name
+MENTION_MIN_KEY = 4
+MENTION_MAX_WORDS = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+_DOMAIN = re.compile(r"\b((?:[a-z0-9-]+\.)+[a-z]{2,})\b")
+_URL = re.compile(r"https?://[^\s]+", re.IGNORECASE)
+
+SIGNATURE_SQL = "SELECT count(*) AS n, max(updated_at) AS updated FROM affiliates_master"
+
+LOAD_SQL = """
+    SELECT id, name, slug, affiliate_url, url, resolved_domain
+    FROM affiliates_master
+    ORDER BY id
+"""
+
+
+def url_host(url: Optional[str]) -> str:
+    try:
+        host = urlsplit(url.strip()).hostname or ""
+    except (AttributeError, ValueError):
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _host_path(url: str) -> str:
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return ""
+    host = (parts.hostname or "").removeprefix("www.")
+    return host + parts.path.rstrip("/")
+
+
+class AffiliateIndex:
+    """
+    Immutable lookup tables over affiliates_master. Built off the event
+    loop and published by reference swap; every lookup is dict work.
+    """
+
+    __slots__ = ("by_name", "by_key", "by_domain", "by_url", "by_prefix", "signature", "built_at")
+
+    def __init__(self, rows: Iterable[dict], signature=None):
+        by_name: Dict[str, int] = {}
+        by_key: Dict[str, int] = {}
+        aliases: Dict[str, int] = {}
+        by_domain: Dict[str, int] = {}
+        by_url: Dict[str, int] = {}
+        by_prefix: Dict[str, List[Tuple[str, int]]] = {}
+
+        for row in rows:
+            affiliate_id = row["id"]
+            name = row.get("name")
+            if name:
+                by_name.setdefault(name.lower(), affiliate_id)
+
+            # Same key/alias rules as the CSV catalog (slug, domain, suffix-stripped name)
+            record = AffiliateRecord(row)
+            if record.key:
+                by_key.setdefault(record.key, affiliate_id)
+            for alias in record.aliases:
+                aliases.setdefault(alias, affiliate_id)
+
+            domain = (row.get("resolved_domain") or "").lower()
+            if domain:
+                by_domain.setdefault(domain, affiliate_id)
+
+            for url in (row.get("affiliate_url"), row.get("url")):
+                if not url:
+                    continue
+                by_url.setdefault(url, affiliate_id)
+                by_prefix.setdefault(_host_path(url), []).append((url.lower(), affiliate_id))
+                host = url_host(url)
+                if host:
+                    by_domain.setdefault(host, affiliate_id)
+
+        self.by_name = MappingProxyType(by_name)
+        self.by_key = MappingProxyType({**aliases, **by_key})
+        self.by_domain = MappingProxyType(by_domain)
+        self.by_url = MappingProxyType(by_url)
+        self.by_prefix = MappingProxyType(
+            {k: tuple(sorted(v, key=lambda e: -len(e[0]))) for k, v in by_prefix.items()}
+        )
+        self.signature = signature
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    # --------------------------------------------------
+    def match_name(self, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        return self.by_name.get(name.lower()) or self.by_key.get(normalize_key(name))
+
+    def match_domain(self, host: str) -> Optional[int]:
+        """Exact host, then each parent domain (promo.stake.us -> stake.us)."""
+        while host:
+            affiliate_id = self.by_domain.get(host)
+            if affiliate_id:
+                return affiliate_id
+            if "." not in host:
+                return None
+            host = host.split(".", 1)[1]
+            if "." not in host:
+                return None
+        return None
+
+    def match_url(self, url: Optional[str]) -> Optional[int]:
+        if not url:
+            return None
+        affiliate_id = self.by_url.get(url)
+        if affiliate_id:
+            return affiliate_id
+
+        # Longest stored affiliate URL that the given URL extends
+        lowered = url.lower()
+        for stored, candidate in self.by_prefix.get(_host_path(url), ()):
+            if lowered.startswith(stored):
+                return candidate
+
+        return self.match_domain(url_host(url))
+
+    def match_text(self, text: Optional[str]) -> Optional[int]:
+        """First casino mentioned in free text: URLs, bare domains, then 1-3 word names."""
+        if not text:
+            return None
+
+        for url in _URL.findall(text):
+            affiliate_id = self.match_url(url.rstrip(".,;!?"))
+            if affiliate_id:
+                return affiliate_id
+
+        lowered = text.lower()
+        for domain in _DOMAIN.findall(lowered):
+            affiliate_id = self.match_domain(domain.removeprefix("www."))
+            if affiliate_id:
+                return affiliate_id
+
+        words = _WORD.findall(lowered)
+        for size in range(MENTION_MAX_WORDS, 0, -1):
+            for i in range(len(words) - size + 1):
+                key = "".join(words[i : i + size])
+                if len(key) >= MENTION_MIN_KEY:
+                    affiliate_id = self.by_key.get(key)
+                    if affiliate_id:
+                        return affiliate_id
+        return None
+
+    def resolve(
+        self,
+        casino_name: Optional[str] = None,
+        affiliate_url: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Optional[int]:
+        """Explicit name, then URL, then a mention in the message text."""
+        return self.match_name(casino_name) or self.match_url(affiliate_url) or self.match_text(text)
+
+
+EMPTY_INDEX = AffiliateIndex([])
+
+
+class AffiliateResolver:
+    """
+    Lazily loaded, change-aware AffiliateIndex. At most every
+    RESOLVER_CHECK_SECONDS a caller runs a count/max(updated_at) probe and
+    the table is reloaded only if that changed. Concurrent callers share
+    one refresh, so writers in other processes (the CSV import) need no
+    signal. invalidate() forces a reload on next use in this process.
+    """
+
+    def __init__(self, check_seconds: int = RESOLVER_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._index: AffiliateIndex = EMPTY_INDEX
+        self._checked_at = 0.0
+        self._force = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> AffiliateIndex:
+        return self._index
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+        self._force = True
+
+    async def get(self) -> AffiliateIndex:
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return self._index
+
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.check_seconds:
+                return self._index
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.error(f"[AFFILIATES] Resolver refresh failed: {e}")
+            self._checked_at = time.monotonic()
+        return self._index
+
+    async def _refresh(self) -> None:
+        db = await get_db()
+        probe = await db.fetchrow(SIGNATURE_SQL)
+        signature = (probe["n"], probe["updated"])
+        if signature == self._index.signature and not self._force:
+            return
+
+        rows = [dict(r) for r in await db.fetch(LOAD_SQL)]
+        self._index = await asyncio.to_thread(AffiliateIndex, rows, signature)
+        self._force = False
+        logger.info(f"[AFFILIATES] Resolver loaded {len(self._index)} affiliates")
+
+    async def resolve(
+        self,
+        casino_name: Optional[str] = None,
+        affiliate_url: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Optional[int]:
+        return (await self.get()).resolve(casino_name, affiliate_url, text)
+
+
+AFFILIATE_RESOLVER = AffiliateResolver()
+
+
+def get_affiliate_resolver() -> AffiliateResolver:
+    return AFFILIATE_RESOLVER
@@ -1,4 +1,12 @@
+import asyncio
+import hashlib
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
 import tldextract
+from backend.catalog import slugify
 from services.db import get_db
 from backend.logger import get_logger
 
@@ -14,15 +22,39 @@ def normalize_bool(v):
 
 
 def normalize_slug(name: str) -> str:
-    return (
-        name.lower()
-        .strip()
-        .replace(" ", "-")
-        .replace("_", "-")
-    )
+    return slugify(name)
 
 
-async def resolve_domain(url: str) -> str:
+def normalize_int(v, default=None):
+    if v in (None, ""):
+        return default
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_numeric(v):
+    if v in (None, ""):
+        return None
+    try:
+        return Decimal(str(v))
+    except InvalidOperation:
+        return None
+
+
+def normalize_date(v):
+    if not v or isinstance(v, date):
+        return v or None
+    try:
+        return date.fromisoformat(str(v).strip())
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def extract_domain(url: str) -> Optional[str]:
+    """Registered domain for a URL. Cached: tldextract is the slow part of imports."""
     try:
         ext = tldextract.extract(url)
         domain = f"{ext.domain}.{ext.suffix}"
@@ -32,12 +64,113 @@ async def resolve_domain(url: str) -> str:
         return None
 
 
+async def resolve_domain(url: str) -> str:
+    return extract_domain(url)
+
+
+async def resolve_domains(urls: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Resolve many URLs in one worker-thread hop (deduped, cached)."""
+    unique = {u for u in urls if u}
+    return await asyncio.to_thread(lambda: {u: extract_domain(u) for u in unique})
+
+
 async def generate_icon_url(domain: str) -> str:
     if not domain:
         return None
     return f"https://www.google.com/s2/favicons?domain={domain}&sz=128"
 
 
+# Deterministic column order shared by the single-row and bulk upserts
+AFFILIATE_COLUMNS = (
+    "name",
+    "affiliate_url",
+    "priority",
+    "category",
+    "status",
+    "level",
+    "date_added",
+    "bonus_code",
+    "bonus_description",
+    "icon_url",
+    "resolved_domain",
+    "redemption_speed",
+    "redemption_minimum",
+    "redemption_type",
+    "created_by",
+    "source",
+    "top_pick",
+    "jurisdiction",
+    "sc_allowed",
+    "crypto_allowed",
+    "cwallet_allowed",
+    "lootbox_allowed",
+    "show_in_profile",
+    "sort_order",
+    "slug",
+    "description",
+)
+
+# Columns refreshed on conflict (date_added, created_by and source keep
+# their first-seen values)
+AFFILIATE_UPDATE_COLUMNS = tuple(
+    c for c in AFFILIATE_COLUMNS if c not in ("name", "date_added", "created_by", "source")
+)
+
+
+def build_affiliate_params(row: dict) -> List:
+    """
+    Normalize a CSV-style row into AFFILIATE_COLUMNS order, typed for asyncpg.
+    resolved_domain / icon_url must already be filled in by the caller.
+    """
+    name = row.get("name")
+
+    params = {
+        "name": name,
+        "affiliate_url": row.get("affiliate_url"),
+        "priority": normalize_int(row.get("priority"), 0),
+        "category": row.get("category"),
+        "status": row.get("status"),
+        "level": normalize_int(row.get("level")),
+        "date_added": normalize_date(row.get("date_added")),
+        "bonus_code": row.get("bonus_code"),
+        "bonus_description": row.get("bonus_description"),
+        "icon_url": row.get("icon_url"),
+        "resolved_domain": row.get("resolved_domain"),
+        "redemption_speed": row.get("redemption_speed"),
+        "redemption_minimum": normalize_numeric(row.get("redemption_minimum")),
+        "redemption_type": row.get("redemption_type"),
+        "created_by": row.get("created_by"),
+        "source": row.get("source"),
+        "top_pick": normalize_bool(row.get("top_pick")),
+        "jurisdiction": row.get("jurisdiction"),
+        "sc_allowed": normalize_bool(row.get("sc_allowed")),
+        "crypto_allowed": normalize_bool(row.get("crypto_allowed")),
+        "cwallet_allowed": normalize_bool(row.get("cwallet_allowed")),
+        "lootbox_allowed": normalize_bool(row.get("lootbox_allowed")),
+        "show_in_profile": normalize_bool(row.get("show_in_profile")),
+        "sort_order": normalize_int(row.get("sort_order")),
+        "slug": row.get("slug") or normalize_slug(name),
+        "description": row.get("description"),
+    }
+    return [params[c] for c in AFFILIATE_COLUMNS]
+
+
+def affiliate_content_hash(params: List) -> str:
+    """Stable fingerprint of a normalized row (stored in affiliates_master.content_hash)."""
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+UPSERT_AFFILIATE_SQL = f"""
+    INSERT INTO affiliates_master ({", ".join(AFFILIATE_COLUMNS)}, content_hash)
+    VALUES ({", ".join(f"${i + 1}" for i in range(len(AFFILIATE_COLUMNS) + 1))})
+    ON CONFLICT (name)
+    DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in AFFILIATE_UPDATE_COLUMNS)},
+        content_hash = EXCLUDED.content_hash,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
 async def upsert_affiliate(row: dict):
     """
     Inserts or updates a single affiliate row into affiliates_master.
@@ -46,124 +179,15 @@ async def upsert_affiliate(row: dict):
 
     db = await get_db()
 
-    # -----------------------------------------
-    # Normalize + auto-fill missing fields
-    # -----------------------------------------
-    name = row.get("name")
-    affiliate_url = row.get("affiliate_url")
-    priority = int(row.get("priority", 0))
-    category = row.get("category")
-    status = row.get("status")
-    level = row.get("level")
-    date_added = row.get("date_added")
+    # Domain + icon auto-generation
+    row = dict(row)
+    row["resolved_domain"] = row.get("resolved_domain") or await resolve_domain(row.get("affiliate_url"))
+    row["icon_url"] = row.get("icon_url") or await generate_icon_url(row["resolved_domain"])
 
-    bonus_code = row.get("bonus_code")
-    bonus_description = row.get("bonus_description")
+    params = build_affiliate_params(row)
 
-    # Domain + icon auto-generation
-    resolved_domain = row.get("resolved_domain") or await resolve_domain(affiliate_url)
-    icon_url = row.get("icon_url") or await generate_icon_url(resolved_domain)
-
-    redemption_speed = row.get("redemption_speed")
-    redemption_minimum = row.get("redemption_minimum")
-    redemption_type = row.get("redemption_type")
-
-    created_by = row.get("created_by")
-    source = row.get("source")
-    top_pick = normalize_bool(row.get("top_pick"))
-    jurisdiction = row.get("jurisdiction")
-
-    sc_allowed = normalize_bool(row.get("sc_allowed"))
-    crypto_allowed = normalize_bool(row.get("crypto_allowed"))
-    cwallet_allowed = normalize_bool(row.get("cwallet_allowed"))
-    lootbox_allowed = normalize_bool(row.get("lootbox_allowed"))
-    show_in_profile = normalize_bool(row.get("show_in_profile"))
-
-    sort_order = row.get("sort_order")
-    slug = row.get("slug") or normalize_slug(name)
-    description = row.get("description")
-
-    # -----------------------------------------
-    # Deterministic parameter order
-    # -----------------------------------------
-    params = [
-        name,
-        affiliate_url,
-        priority,
-        category,
-        status,
-        level,
-        date_added,
-        bonus_code,
-        bonus_description,
-        icon_url,
-        resolved_domain,
-        redemption_speed,
-        redemption_minimum,
-        redemption_type,
-        created_by,
-        source,
-        top_pick,
-        jurisdiction,
-        sc_allowed,
-        crypto_allowed,
-        cwallet_allowed,
-        lootbox_allowed,
-        show_in_profile,
-        sort_order,
-        slug,
-        description,
-    ]
-
-    # -----------------------------------------
-    # Execute upsert
-    # -----------------------------------------
     try:
-        await db.execute(
-            """
-            INSERT INTO affiliates_master (
-                name, affiliate_url, priority, category, status, level,
-                date_added, bonus_code, bonus_description, icon_url,
-                resolved_domain, redemption_speed, redemption_minimum,
-                redemption_type, created_by, source, top_pick, jurisdiction,
-                sc_allowed, crypto_allowed, cwallet_allowed, lootbox_allowed,
-                show_in_profile, sort_order, slug, description
-            )
-            VALUES (
-                $1,$2,$3,$4,$5,$6,
-                $7,$8,$9,$10,
-                $11,$12,$13,
-                $14,$15,$16,$17,$18,
-                $19,$20,$21,$22,
-                $23,$24,$25,$26
-            )
-            ON CONFLICT (name)
-            DO UPDATE SET
-                affiliate_url = EXCLUDED.affiliate_url,
-                priority = EXCLUDED.priority,
-                category = EXCLUDED.category,
-                status = EXCLUDED.status,
-                level = EXCLUDED.level,
-                bonus_code = EXCLUDED.bonus_code,
-                bonus_description = EXCLUDED.bonus_description,
-                icon_url = EXCLUDED.icon_url,
-                resolved_domain = EXCLUDED.resolved_domain,
-                redemption_speed = EXCLUDED.redemption_speed,
-                redemption_minimum = EXCLUDED.redemption_minimum,
-                redemption_type = EXCLUDED.redemption_type,
-                top_pick = EXCLUDED.top_pick,
-                jurisdiction = EXCLUDED.jurisdiction,
-                sc_allowed = EXCLUDED.sc_allowed,
-                crypto_allowed = EXCLUDED.crypto_allowed,
-                cwallet_allowed = EXCLUDED.cwallet_allowed,
-                lootbox_allowed = EXCLUDED.lootbox_allowed,
-                show_in_profile = EXCLUDED.show_in_profile,
-                sort_order = EXCLUDED.sort_order,
-                slug = EXCLUDED.slug,
-                description = EXCLUDED.description
-            """,
-            *params
-        )
+        await db.execute(UPSERT_AFFILIATE_SQL, *params, affiliate_content_hash(params))
 
     except Exception as e:
-        logger.error(f"[AFFILIATES] Upsert failed for {name}: {e}")
\ No newline at end of file
+        logger.error(f"[AFFILIATES] Upsert failed for {row.get('name')}: {e}")
@@ -1,15 +1,21 @@
 from .ask_perplexity import ask_perplexity
-from .perplexity_stream import stream_perplexity
+from .perplexity_stream import stream_perplexity, stream_perplexity_tokens
 from .perplexity_search import perplexity_search
 from .perplexity_embeddings import perplexity_embed
 from .perplexity_models import PERPLEXITY_MODELS
 from .mistral_chat import mistral_chat
+from .http_client import get_http_client, close_http_client, post_json, stream_events
 
 __all__ = [
     "ask_perplexity",
     "stream_perplexity",
+    "stream_perplexity_tokens",
     "perplexity_search",
     "perplexity_embed",
     "PERPLEXITY_MODELS",
     "mistral_chat",
+    "get_http_client",
+    "close_http_client",
+    "post_json",
+    "stream_events",
 ]
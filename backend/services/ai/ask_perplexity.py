@@ -1,6 +1,6 @@
 import os
-import httpx
 from backend.logger import get_logger
+from .http_client import post_json
 
 logger = get_logger("perplexity-ask")
 
@@ -16,13 +16,6 @@ async def ask_perplexity(prompt: str, model: str = "sonar-pro") -> str:
     Returns the final text response.
     """
 
-    url = "https://api.perplexity.ai/chat/completions"
-
-    headers = {
-        "Authorization": f"Bearer {PPLX_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "model": model,
         "messages": [
@@ -31,13 +24,9 @@ async def ask_perplexity(prompt: str, model: str = "sonar-pro") -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        data = await post_json("perplexity", "/chat/completions", payload)
+        return data["choices"][0]["message"]["content"]
 
     except Exception as e:
         logger.error(f"ask_perplexity error: {e}")
-        return "Error: Perplexity request failed"
\ No newline at end of file
+        return "Error: Perplexity request failed"
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+from backend.logger import get_logger
+
+logger = get_logger("ai-http")
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One pool for every provider: connections (and TLS sessions) are reused
+HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = 120  # seconds an idle connection is kept
+
+
+class Provider:
+    """
+    Endpoint, credentials, timeouts and concurrency cap for one AI provider.
+    Key and base URL are read from the environment on each request, so
+    they are right even if this module is imported before .env is loaded.
+    """
+
+    __slots__ = (
+        "name", "key_env", "base_url_env", "default_base_url",
+        "timeout", "stream_timeout", "max_concurrency", "_semaphore",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        key_env: str,
+        default_base_url: str,
+        base_url_env: Optional[str] = None,
+        timeout: float = 30,
+        stream_timeout: float = 120,
+        max_concurrency: int = 8,
+    ):
+        self.name = name
+        self.key_env = key_env
+        self.base_url_env = base_url_env
+        self.default_base_url = default_base_url
+        # connect stays short; read is per chunk, so streams get their own budget
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+        self.stream_timeout = httpx.Timeout(stream_timeout, connect=5.0)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return os.getenv(self.key_env) or None
+
+    @property
+    def base_url(self) -> str:
+        url = os.getenv(self.base_url_env) if self.base_url_env else None
+        return (url or self.default_base_url).rstrip("/")
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+
+PROVIDERS: Dict[str, Provider] = {
+    "perplexity": Provider(
+        "perplexity",
+        "PPLX_API_KEY",
+        "https://api.perplexity.ai",
+        timeout=30,
+        max_concurrency=int(os.getenv("PPLX_MAX_CONCURRENCY", "8")),
+    ),
+    "mistral": Provider(
+        "mistral",
+        "MISTRAL_API_KEY",
+        "https://api.mistral.ai",
+        base_url_env="MISTRAL_API_BASE",
+        timeout=int(os.getenv("MISTRAL_TIMEOUT_S", "90")),
+        max_concurrency=int(os.getenv("MISTRAL_MAX_CONCURRENCY", "4")),
+    ),
+}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The process-wide AsyncClient (HTTP/2 when h2 is installed)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        logger.info(f"[AI-HTTP] Client pool created (http2={HTTP2_AVAILABLE})")
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+# ============================================================
+#  REQUESTS
+# ============================================================
+
+async def post_json(provider: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """POST `payload` to the provider and return the decoded JSON body."""
+    p = PROVIDERS[provider]
+    async with p.semaphore:
+        response = await get_http_client().post(
+            f"{p.base_url}{path}",
+            headers=p.headers(),
+            json=payload,
+            timeout=p.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def stream_events(provider: str, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    POST a streaming request and yield each decoded SSE `data:` object
+    until `[DONE]`. The provider's concurrency slot is held for the
+    duration of the stream and released if the consumer stops early.
+    """
+    p = PROVIDERS[provider]
+    async with p.semaphore:
+        async with get_http_client().stream(
+            "POST",
+            f"{p.base_url}{path}",
+            headers=p.headers(),
+            json=payload,
+            timeout=p.stream_timeout,
+        ) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+
+                try:
+                    yield json.loads(data)
+                except json.JSONDecodeError as e:
+                    logger.error(f"[AI-HTTP] {provider} stream parse error: {e}")
+
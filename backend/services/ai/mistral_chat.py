@@ -4,13 +4,12 @@ import os
 import subprocess
 from typing import Any, Dict
 
-import httpx
 from backend.logger import get_logger
+from .http_client import post_json
 
 logger = get_logger("mistral")
 
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "")
-MISTRAL_API_BASE = os.getenv("MISTRAL_API_BASE", "https://api.mistral.ai")
 MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistral-large-2512")
 MISTRAL_USE_SH = os.getenv("MISTRAL_USE_SH", "1") == "1"
 MISTRAL_SH_PATH = os.getenv("MISTRAL_SH_PATH", "/var/www/html/gcz/mistral.sh")
@@ -66,17 +65,7 @@ def _mistral_via_script(prompt: str) -> Dict[str, Any]:
 async def _mistral_via_http(prompt: str) -> Dict[str, Any]:
     _ensure_config()
 
-    url = f"{MISTRAL_API_BASE.rstrip('/')}/v1/conversations"
-    headers = {
-        "Authorization": f"Bearer {MISTRAL_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = _build_payload(prompt)
-
-    async with httpx.AsyncClient(timeout=MISTRAL_TIMEOUT_S) as client:
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()
+    return await post_json("mistral", "/v1/conversations", _build_payload(prompt))
 
 
 async def mistral_chat(prompt: str) -> Dict[str, Any]:
@@ -1,6 +1,6 @@
 import os
-import httpx
 from backend.logger import get_logger
+from .http_client import post_json
 
 logger = get_logger("perplexity-embeddings")
 
@@ -16,25 +16,14 @@ async def perplexity_embed(text: str, model: str = "sonar-embed"):
     Returns the embedding list or None on failure.
     """
 
-    url = "https://api.perplexity.ai/embeddings"
-
-    headers = {
-        "Authorization": f"Bearer {PPLX_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "model": model,
         "input": text,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-
-            data = response.json()
-            return data["data"][0]["embedding"]
+        data = await post_json("perplexity", "/embeddings", payload)
+        return data["data"][0]["embedding"]
 
     except Exception as e:
         logger.error(f"Perplexity embedding error: {e}")
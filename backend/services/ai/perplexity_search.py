@@ -1,7 +1,6 @@
 import os
-import httpx
-import json
 from backend.logger import get_logger
+from .http_client import post_json
 
 logger = get_logger("perplexity-search")
 
@@ -17,13 +16,6 @@ async def perplexity_search(query: str) -> str:
     Returns the final text response.
     """
 
-    url = "https://api.perplexity.ai/chat/completions"
-
-    headers = {
-        "Authorization": f"Bearer {PPLX_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "model": "sonar-pro",
         "messages": [
@@ -33,12 +25,8 @@ async def perplexity_search(query: str) -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        data = await post_json("perplexity", "/chat/completions", payload)
+        return data["choices"][0]["message"]["content"]
 
     except Exception as e:
         logger.error(f"Perplexity search error: {e}")
@@ -1,10 +1,9 @@
 import os
 import json
-import asyncio
-import httpx
-from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 
 from backend.logger import get_logger
+from .http_client import stream_events
 
 logger = get_logger("perplexity-stream")
 
@@ -15,62 +14,43 @@ if not PPLX_API_KEY:
 
 
 # ============================================================
-# STREAM PERPLEXITY RESPONSE (SSE)
+# STREAM PERPLEXITY TOKENS
 # ============================================================
-async def stream_perplexity(prompt: str):
+async def stream_perplexity_tokens(prompt: str) -> AsyncIterator[str]:
     """
-    Streams Perplexity AI responses token-by-token.
-    Returns a FastAPI StreamingResponse generator.
+    Async generator of Perplexity output tokens.
+    Raises on transport / HTTP errors.
     """
+    payload = {
+        "model": "sonar-pro",
+        "stream": True,
+        "messages": [
+            {"role": "system", "content": "You are GambleCodez AI."},
+            {"role": "user", "content": prompt},
+        ],
+    }
+
+    async for event in stream_events("perplexity", "/chat/completions", payload):
+        delta = (event.get("choices") or [{}])[0].get("delta", {})
+        token = delta.get("content")
+        if token:
+            yield token
 
-    async def event_generator():
-        url = "https://api.perplexity.ai/chat/completions"
-
-        headers = {
-            "Authorization": f"Bearer {PPLX_API_KEY}",
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "model": "sonar-pro",
-            "stream": True,
-            "messages": [
-                {"role": "system", "content": "You are GambleCodez AI."},
-                {"role": "user", "content": prompt},
-            ],
-        }
-
-        try:
-            async with httpx.AsyncClient(timeout=None) as client:
-                async with client.stream("POST", url, headers=headers, json=payload) as response:
-
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
-
-                        if line.startswith("data: "):
-                            data = line.replace("data: ", "").strip()
-
-                            if data == "[DONE]":
-                                yield "data: [DONE]\n\n"
-                                break
-
-                            try:
-                                parsed = json.loads(data)
-                                delta = parsed.get("choices", [{}])[0].get("delta", {})
-                                token = delta.get("content")
-
-                                if token:
-                                    yield f"data: {json.dumps({'token': token})}\n\n"
 
-                            except Exception as e:
-                                logger.error(f"Perplexity stream parse error: {e}")
-                                continue
-
-                        await asyncio.sleep(0.01)
-
-        except Exception as e:
-            logger.error(f"Perplexity streaming error: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
\ No newline at end of file
+# ============================================================
+# STREAM PERPLEXITY RESPONSE (SSE)
+# ============================================================
+async def stream_perplexity(prompt: str) -> AsyncIterator[str]:
+    """
+    Streams Perplexity AI responses token-by-token.
+    Async generator of SSE-formatted chunks ("data: ...\\n\\n"), ending
+    with "data: [DONE]"; errors are reported as an `error` event.
+    """
+    try:
+        async for token in stream_perplexity_tokens(prompt):
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    except Exception as e:
+        logger.error(f"Perplexity streaming error: {e}")
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
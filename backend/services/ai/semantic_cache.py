@@ -0,0 +1,54 @@
+import os
+import time
+
+from ai.shared.semantic_cache import SemanticCache
+from services.db import get_db
+from backend.logger import get_logger
+
+logger = get_logger("ai-semantic-cache")
+
+DEFAULT_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+DEFAULT_THRESHOLD = float(os.getenv("AI_CACHE_SIMILARITY", "0.94"))
+
+# Per-endpoint TTLs (seconds); search answers go stale faster
+AI_CACHE_TTLS = {
+    "perplexity": 3600,
+    "perplexity-search": 600,
+}
+
+# Namespaces served by the near-match tier; the rest match exactly
+SEMANTIC_NAMESPACES = {"perplexity"}
+
+# How often the casino catalog pinned by the near-match tier is reloaded
+ENTITY_REFRESH_S = 600
+
+CATALOG_SQL = "SELECT name, slug FROM affiliates_master"
+
+AI_RESPONSE_CACHE = SemanticCache(DEFAULT_MAX_BYTES, DEFAULT_THRESHOLD)
+
+_entities_loaded_at = 0.0
+
+
+async def refresh_cache_entities(force: bool = False):
+    """
+    Loads casino names/slugs into AI_RESPONSE_CACHE so "stake" and
+    "roobet" never answer for each other, whatever their casing.
+    Keeps the previous catalog if the DB is unavailable.
+    """
+    global _entities_loaded_at
+
+    if not force and time.monotonic() - _entities_loaded_at < ENTITY_REFRESH_S:
+        return
+    _entities_loaded_at = time.monotonic()
+
+    try:
+        db = await get_db()
+        rows = await db.fetch(CATALOG_SQL)
+    except Exception as e:
+        logger.error(f"[AI-CACHE] Catalog load failed: {e}")
+        return
+
+    AI_RESPONSE_CACHE.set_entities(
+        name for row in rows for name in (row["name"], row["slug"]) if name
+    )
+    logger.info(f"[AI-CACHE] {AI_RESPONSE_CACHE.entity_count} catalog names pinned")
@@ -1,13 +1,17 @@
 import hashlib
 import hmac
+import time
 from datetime import datetime, timedelta
-from fastapi import HTTPException
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, Request
 import jwt
 
 from config import get_settings
 from services.db import get_db
 from backend.logger import get_logger
 from backend.utils.auth import require_admin, fetch_user_role
+from services.cache import TTLCache
+from services.roles import ROLE_SERVICE
 
 logger = get_logger("gcz-auth-service")
 settings = get_settings()
@@ -17,6 +21,24 @@ JWT_EXPIRE_DAYS = int(getattr(settings, "JWT_EXPIRE_DAYS", 7))
 TELEGRAM_BOT_TOKEN = getattr(settings, "TELEGRAM_BOT_TOKEN", None)
 ISSUER = "GambleCodez"
 
+# sha256(token) -> verified claims, each entry kept until the token's exp
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_NO_EXP_TTL = 300
+# user_id -> users row (None cached briefly for unknown users)
+PROFILE_TTL = 60
+PROFILE_NEGATIVE_TTL = 15
+
+_TOKENS = TTLCache(max_entries=TOKEN_CACHE_SIZE)
+_PROFILES = TTLCache(max_entries=TOKEN_CACHE_SIZE)
+_NO_PROFILE = object()
+
+PROFILE_SQL = """
+    SELECT user_id, telegram_id, telegram_username, username, cwallet_id, email
+    FROM users
+    WHERE user_id = $1
+    LIMIT 1
+"""
+
 
 def verify_telegram_signature(payload: dict) -> bool:
     """
@@ -70,13 +92,14 @@ async def telegram_login(telegram_id: int, username: str | None = None):
             username,
             username,
         )
+        invalidate_user_profile(tid)
 
         role = await get_role_for_user(telegram_id)
         token = jwt.encode(
             {
                 "telegram_id": telegram_id,
                 "username": username,
-                "role": role,
+                **ROLE_SERVICE.claims(telegram_id, role),
                 "iss": ISSUER,
                 "exp": datetime.utcnow() + timedelta(days=JWT_EXPIRE_DAYS),
             },
@@ -96,9 +119,26 @@ async def telegram_login(telegram_id: int, username: str | None = None):
         raise HTTPException(status_code=500, detail="Telegram login failed")
 
 
-async def verify_session(token: str):
+# ============================================================
+#  TOKEN VERIFICATION
+# ============================================================
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Verified claims for a session token. The HMAC/claims check runs once
+    per token; afterwards the claims are served from an LRU keyed by the
+    token's sha256 until the token's own exp. Failures are never cached.
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing token")
+
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _TOKENS.get(key)
+    if claims is not None:
+        return claims
+
     try:
-        decoded = jwt.decode(
+        claims = jwt.decode(
             token,
             JWT_SECRET,
             algorithms=["HS256"],
@@ -111,32 +151,116 @@ async def verify_session(token: str):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    telegram_id = decoded.get("telegram_id")
-    if not telegram_id:
+    if not claims.get("telegram_id"):
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    exp = claims.get("exp")
+    ttl = int(exp - time.time()) if exp else TOKEN_CACHE_NO_EXP_TTL
+    if ttl > 0:
+        _TOKENS.set(key, claims, ttl=ttl)
+    return claims
+
+
+def bearer_token(request: Request) -> str:
+    """Token from `Authorization: Bearer <token>` (401 if absent)."""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
+        raise HTTPException(status_code=401, detail="Missing token")
+    return auth_header.replace("Bearer ", "").strip()
+
+
+# ============================================================
+#  USER PROFILES
+# ============================================================
+
+async def get_user_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    """users row for user_id, cached for PROFILE_TTL seconds."""
+    key = str(user_id)
+    profile = _PROFILES.get(key)
+    if profile is not None:
+        return None if profile is _NO_PROFILE else profile
+
     db = await get_db()
-    user = await db.fetchrow(
-        """
-        SELECT user_id, telegram_id, telegram_username, username, cwallet_id, email
-        FROM users
-        WHERE user_id = $1
-        LIMIT 1
-        """,
-        str(telegram_id),
-    )
+    row = await db.fetchrow(PROFILE_SQL, key)
+    if row:
+        profile = dict(row)
+        _PROFILES.set(key, profile, ttl=PROFILE_TTL)
+        return profile
+
+    _PROFILES.set(key, _NO_PROFILE, ttl=PROFILE_NEGATIVE_TTL)
+    return None
+
+
+def invalidate_user_profile(user_id) -> None:
+    """Call after writing to users so /me reflects the change immediately."""
+    if user_id is not None:
+        _PROFILES.delete(str(user_id))
 
+
+# ============================================================
+#  PRINCIPAL (shared auth dependency)
+# ============================================================
+
+class Principal:
+    """The verified caller: token claims plus the current role."""
+
+    __slots__ = ("telegram_id", "username", "role", "claims")
+
+    def __init__(self, claims: Dict[str, Any], role: str):
+        self.telegram_id = claims["telegram_id"]
+        self.username = claims.get("username")
+        self.role = role
+        self.claims = claims
+
+    @property
+    def user_id(self) -> str:
+        return str(self.telegram_id)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role in ["admin", "super_admin"]
+
+
+async def principal_from_token(token: str) -> Principal:
+    claims = decode_token(token)
+    return Principal(claims, await ROLE_SERVICE.role_from_claims(claims))
+
+
+async def get_principal(request: Request) -> Principal:
+    """
+    FastAPI dependency: `principal: Principal = Depends(get_principal)`.
+    Reuses the principal set by auth_guard when the middleware ran.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        principal = await principal_from_token(bearer_token(request))
+        request.state.principal = principal
+    return principal
+
+
+async def session_response(principal: Principal) -> Dict[str, Any]:
     return {
         "valid": True,
-        "data": decoded,
-        "user": dict(user) if user else None,
+        "data": dict(principal.claims),
+        "user": await get_user_profile(principal.user_id),
     }
 
 
+async def verify_session(token: str):
+    return await session_response(await principal_from_token(token))
+
+
 __all__ = [
     "require_admin",
     "telegram_login",
     "verify_session",
+    "decode_token",
+    "bearer_token",
+    "get_principal",
+    "session_response",
+    "Principal",
+    "get_user_profile",
+    "invalidate_user_profile",
     "get_role",
     "verify_telegram_signature",
     "get_role_for_user",
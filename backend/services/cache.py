@@ -1,9 +1,241 @@
+import asyncio
+import functools
 import time
 import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-# Thread‑safe in‑memory cache
-_cache = {}
-_lock = threading.Lock()
+from services.db import connect, get_db
+from backend.logger import get_logger
+
+logger = get_logger("gcz-cache")
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60
+
+# NOTIFY channel carrying a namespace to invalidate ("" = everything), so
+# scripts running in their own process can reach the API's CACHE
+INVALIDATE_CHANNEL = "gcz_cache_invalidate"
+LISTEN_RETRY_S = 5.0
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU with per-entry TTL.
+
+    Entries live for `ttl` seconds and may be served stale for a further
+    `stale_ttl` seconds while one background task refreshes them
+    (stale-while-revalidate). Keys are namespaced ("affiliates:list") so
+    a whole namespace can be dropped after a sync.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, fresh_until, stale_until)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "evictions": 0,
+        }
+
+    # --------------------------------------------------
+    #  Plain get / set
+    # --------------------------------------------------
+    def _lookup(self, key: str):
+        """(value, is_fresh) or (_MISSING, False). Drops fully expired entries."""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING, False
+
+            value, fresh_until, stale_until = item
+            if now > stale_until:
+                del self._data[key]
+                return _MISSING, False
+
+            self._data.move_to_end(key)
+            return value, now <= fresh_until
+
+    def get(self, key: str, default=None):
+        value, fresh = self._lookup(key)
+        return value if fresh else default
+
+    def set(self, key: str, value, ttl: int = DEFAULT_TTL, stale_ttl: int = 0):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (value, now + ttl, now + ttl + stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Drop every key in `namespace` (or everything). Returns the count removed."""
+        with self._lock:
+            if namespace is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+
+            prefix = f"{namespace}:"
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        return {**self.stats, "size": size, "max_entries": self.max_entries, "inflight": len(self._inflight)}
+
+    # --------------------------------------------------
+    #  Read-through
+    # --------------------------------------------------
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = DEFAULT_TTL,
+        stale_ttl: int = 0,
+    ):
+        """
+        Return the cached value or load it. Concurrent misses for the same
+        key share one loader call; stale entries are returned immediately
+        and refreshed in the background. Loader errors are never cached.
+        """
+        value, fresh = self._lookup(key)
+        if value is not _MISSING:
+            if fresh:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader, ttl, stale_ttl).add_done_callback(
+                        functools.partial(self._log_background_error, key)
+                    )
+            return value
+
+        self.stats["misses"] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = self._start_load(key, loader, ttl, stale_ttl)
+        return await asyncio.shield(future)
+
+    def _start_load(self, key, loader, ttl, stale_ttl) -> asyncio.Future:
+        async def run():
+            try:
+                value = await loader()
+                self.stats["loads"] += 1
+                self.set(key, value, ttl, stale_ttl)
+                return value
+            except Exception:
+                self.stats["load_errors"] += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return task
+
+    @staticmethod
+    def _log_background_error(key: str, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"[CACHE] Background refresh failed for {key}: {task.exception()}")
+
+
+# Shared process-wide cache
+CACHE = TTLCache()
+
+
+def cached(namespace: str, ttl: int = DEFAULT_TTL, stale_ttl: int = 0, cache: TTLCache = CACHE):
+    """
+    Decorator for async functions (including FastAPI route handlers):
+    results are cached per call arguments under `namespace`.
+
+        @router.get("/")
+        @cached("casinos", ttl=300, stale_ttl=600)
+        async def casinos(): ...
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = f"{namespace}:{fn.__name__}:{args!r}:{sorted(kwargs.items())!r}"
+            return await cache.get_or_load(key, lambda: fn(*args, **kwargs), ttl, stale_ttl)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(namespace: Optional[str] = None) -> int:
+    removed = CACHE.invalidate(namespace)
+    logger.info(f"[CACHE] Invalidated {removed} entries ({namespace or 'all'})")
+    return removed
+
+
+# ============================================================
+#  CROSS-PROCESS INVALIDATION
+# ============================================================
+
+async def publish_invalidation(namespace: Optional[str] = None) -> None:
+    """
+    Invalidate `namespace` here and in every process running
+    invalidation_listener (the API workers). Used by backend/scripts,
+    whose own CACHE nobody reads.
+    """
+    invalidate(namespace)
+    try:
+        db = await get_db()
+        await db.execute("SELECT pg_notify($1, $2)", INVALIDATE_CHANNEL, namespace or "")
+    except Exception as e:
+        logger.error(f"[CACHE] Invalidation not published ({namespace or 'all'}): {e}")
+
+
+def _on_invalidation(connection, pid, channel, payload) -> None:
+    invalidate(payload or None)
+
+
+async def invalidation_listener() -> None:
+    """
+    Applies published invalidations to this process's CACHE until
+    cancelled, reconnecting if the LISTEN connection drops. Everything is
+    dropped on (re)connect, since notifications sent meanwhile are lost.
+    """
+    while True:
+        conn = None
+        try:
+            conn = await connect()
+            await conn.add_listener(INVALIDATE_CHANNEL, _on_invalidation)
+            invalidate()
+            while not conn.is_closed():
+                await asyncio.sleep(LISTEN_RETRY_S)
+            logger.warning("[CACHE] Invalidation listener connection closed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[CACHE] Invalidation listener failed: {e}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(LISTEN_RETRY_S)
 
 
 def cache_set(key: str, value, ttl: int = 60):
@@ -11,9 +243,7 @@ def cache_set(key: str, value, ttl: int = 60):
     Store a value with TTL (seconds).
     Overwrites safely and atomically.
     """
-    expires = time.time() + ttl
-    with _lock:
-        _cache[key] = {"value": value, "expires": expires}
+    CACHE.set(key, value, ttl)
 
 
 def cache_get(key: str):
@@ -21,13 +251,4 @@ def cache_get(key: str):
     Retrieve a cached value if not expired.
     Auto‑cleans expired entries.
     """
-    with _lock:
-        item = _cache.get(key)
-        if not item:
-            return None
-
-        if time.time() > item["expires"]:
-            del _cache[key]
-            return None
-
-        return item["value"]
\ No newline at end of file
+    return CACHE.get(key)
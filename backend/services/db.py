@@ -36,4 +36,91 @@ async def get_db():
         row = await db.fetchrow(...)
     """
     pool = await init_pool()
-    return pool
\ No newline at end of file
+    return pool
+
+
+async def connect():
+    """
+    A dedicated connection outside the pool, for long-lived LISTENs.
+    The caller closes it.
+    """
+    return await asyncpg.connect(dsn=settings.DATABASE_URL)
+
+# Indexes of a table keyed by definition, so the copy made by LIKE can be
+# matched to the original whatever name Postgres generated for it
+INDEX_SQL = """
+    SELECT ic.relname AS name,
+           i.indisunique,
+           i.indisprimary,
+           substring(pg_get_indexdef(i.indexrelid) from ' USING .*$') AS def
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    WHERE i.indrelid = $1::text::regclass
+    ORDER BY ic.relname
+"""
+
+# One GRANT statement per privilege held on the table (grantee 0 is PUBLIC),
+# replayed on the rebuilt copy
+GRANTS_SQL = """
+    SELECT format(
+        'GRANT %s ON %s TO %s%s',
+        a.privilege_type,
+        $1::text,
+        CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+        CASE WHEN a.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END
+    )
+    FROM pg_class c, aclexplode(c.relacl) a
+    WHERE c.oid = $1::text::regclass
+"""
+
+
+async def _index_names(conn, table: str) -> dict:
+    by_def = {}
+    for r in await conn.fetch(INDEX_SQL, table):
+        by_def.setdefault((r["indisunique"], r["indisprimary"], r["def"]), []).append(r["name"])
+    return by_def
+
+
+async def rebuild_table(conn, table: str, fill_sql: str, *args):
+    """
+    Zero-downtime full rebuild of a derived table.
+
+    fill_sql must be an INSERT ... SELECT that targets "{shadow}"; it is
+    run against a fresh copy of `table` (same columns, defaults, indexes),
+    which is then swapped in by rename. Index names (and with them the
+    primary key / unique constraints they back) and grants are carried
+    over to the rebuilt table.
+    Must be called inside a transaction: readers keep seeing the old rows
+    until COMMIT and are only blocked for the rename itself. Returns the
+    INSERT status.
+    """
+    shadow = f"{table}_next"
+    retired = f"{table}_old"
+
+    await conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+    await conn.execute(f"CREATE TABLE {shadow} (LIKE {table} INCLUDING ALL)")
+    status = await conn.execute(fill_sql.format(shadow=shadow), *args)
+
+    # LIKE copies serial defaults but the sequence stays owned by the old
+    # table; re-home it so dropping the old table does not take it along.
+    seq = await conn.fetchval("SELECT pg_get_serial_sequence($1, 'id')", table)
+    if seq:
+        await conn.execute(f"ALTER SEQUENCE {seq} OWNED BY {shadow}.id")
+
+    # LIKE names the copied indexes after the shadow (redirects_next_slug_idx)
+    renames = []
+    shadow_indexes = await _index_names(conn, shadow)
+    for key, names in (await _index_names(conn, table)).items():
+        renames.extend(zip(shadow_indexes.get(key, []), names))
+    grants = [r[0] for r in await conn.fetch(GRANTS_SQL, table)]
+
+    await conn.execute(f"ALTER TABLE {table} RENAME TO {retired}")
+    await conn.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+    await conn.execute(f"DROP TABLE {retired}")
+
+    # Renaming an index that backs a constraint renames the constraint too
+    for current, original in renames:
+        await conn.execute(f'ALTER INDEX "{current}" RENAME TO "{original}"')
+    for grant in grants:
+        await conn.execute(grant)
+    return status
@@ -0,0 +1,223 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from services.cache import TTLCache
+from backend.logger import get_logger
+
+logger = get_logger("gcz-pagination")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+ESTIMATE_TTL = 300   # pg_class.reltuples estimates
+COUNT_TTL = 60       # exact counts for filtered lists
+
+_COUNTS = TTLCache(max_entries=256)
+
+
+# ============================================================
+#  CURSORS
+# ============================================================
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+# Key types a Keyset column may declare -> accepts a decoded cursor value
+KEY_TYPES = {
+    "int": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "float": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "str": lambda v: isinstance(v, str),
+    "timestamp": lambda v: isinstance(v, datetime),
+    "date": lambda v: isinstance(v, date) and not isinstance(v, datetime),
+}
+
+
+def decode_cursor(cursor: str, types: Sequence[str]) -> List[Any]:
+    """
+    Cursor values, checked against the keyset's key types so a forged or
+    stale cursor is a 400 rather than an asyncpg error. NULL keys pass.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for value, kind in zip(values, types):
+        if value is not None and not KEY_TYPES[kind](value):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+# ============================================================
+#  KEYSET
+# ============================================================
+
+class Keyset:
+    """
+    Sort order for keyset pagination, e.g.
+
+        Keyset(("COALESCE(priority, 0)", "DESC", "int"), ("name", "ASC", "str"))
+
+    Each column is (expression, direction, key type from KEY_TYPES). The
+    last column must make the order total (unique). Cursor values are
+    selected alongside the page as _k0.._kN and stripped from the output.
+    """
+
+    def __init__(self, *order: Tuple[str, str, str]):
+        for _, _, kind in order:
+            if kind not in KEY_TYPES:
+                raise ValueError(f"Unknown keyset key type: {kind}")
+        self.order = tuple((expr, direction.upper()) for expr, direction, _ in order)
+        self.types = tuple(kind for _, _, kind in order)
+
+    def select_sql(self) -> str:
+        return ", ".join(f"{expr} AS _k{i}" for i, (expr, _) in enumerate(self.order))
+
+    def order_sql(self) -> str:
+        return ", ".join(f"{expr} {direction}" for expr, direction in self.order)
+
+    def after_sql(self, first_param: int) -> str:
+        """
+        Rows strictly after the cursor. A single direction becomes a row
+        comparison, which Postgres uses as an index range bound; mixed
+        ASC/DESC needs the OR-chain, led by a plain bound on the first
+        column so the index still limits the scan.
+        """
+        params = [f"${first_param + i}" for i in range(len(self.order))]
+        directions = {direction for _, direction in self.order}
+        if len(directions) == 1:
+            op = "<" if directions == {"DESC"} else ">"
+            exprs = ", ".join(expr for expr, _ in self.order)
+            return f"(({exprs}) {op} ({', '.join(params)}))"
+
+        clauses = []
+        for i, (expr, direction) in enumerate(self.order):
+            op = "<" if direction == "DESC" else ">"
+            parts = [f"{e} = {params[j]}" for j, (e, _) in enumerate(self.order[:i])]
+            parts.append(f"{expr} {op} {params[i]}")
+            clauses.append("(" + " AND ".join(parts) + ")")
+        first, direction = self.order[0]
+        bound = f"{first} {'<=' if direction == 'DESC' else '>='} {params[0]}"
+        return f"({bound} AND (" + " OR ".join(clauses) + "))"
+
+
+# ============================================================
+#  PROJECTION
+# ============================================================
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Optional[Sequence[str]] = None) -> List[str]:
+    """`fields=name,slug` -> validated column list (order preserved)."""
+    if not fields:
+        return list(default or allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+# ============================================================
+#  COUNTS
+# ============================================================
+
+async def estimate_rows(db, table: str) -> int:
+    """Planner row estimate for a whole table (no scan), cached."""
+
+    async def load():
+        value = await db.fetchval("SELECT reltuples::bigint FROM pg_class WHERE oid = $1::regclass", table)
+        if value is None or value < 0:  # never analyzed
+            value = await db.fetchval(f"SELECT count(*) FROM {table}")
+        return int(value)
+
+    return await _COUNTS.get_or_load(f"estimate:{table}", load, ttl=ESTIMATE_TTL)
+
+
+async def cached_count(db, sql: str, *args) -> int:
+    """Exact count for a filtered list, cached for COUNT_TTL seconds."""
+
+    async def load():
+        return int(await db.fetchval(sql, *args))
+
+    return await _COUNTS.get_or_load(f"count:{sql}:{args!r}", load, ttl=COUNT_TTL)
+
+
+# ============================================================
+#  PAGE
+# ============================================================
+
+async def fetch_page(
+    db,
+    *,
+    select: Sequence[str],
+    from_sql: str,
+    keyset: Keyset,
+    where: Optional[str] = None,
+    params: Sequence[Any] = (),
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One keyset page: rows after `cursor` in keyset order, plus the cursor
+    for the next page (None on the last page). `where` may reference
+    `params` as $1..$n.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    params = list(params)
+    conditions = [where] if where else []
+
+    if cursor:
+        values = decode_cursor(cursor, keyset.types)
+        conditions.append(keyset.after_sql(len(params) + 1))
+        params.extend(values)
+
+    params.append(limit + 1)
+    query = f"""
+        SELECT {", ".join(select)}, {keyset.select_sql()}
+        FROM {from_sql}
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY {keyset.order_sql()}
+        LIMIT ${len(params)}
+    """
+
+    rows = await db.fetch(query, *params)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    key_names = [f"_k{i}" for i in range(len(keyset.order))]
+    items = [{k: v for k, v in r.items() if k not in key_names} for r in rows]
+    next_cursor = encode_cursor([rows[-1][k] for k in key_names]) if has_more else None
+    return items, next_cursor
+
+
+def page_response(items: List[Dict[str, Any]], next_cursor: Optional[str], limit: int, total: int) -> Dict[str, Any]:
+    return {
+        "items": items,
+        "nextCursor": next_cursor,
+        "limit": limit,
+        "total": total,
+    }
@@ -0,0 +1,79 @@
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from backend.logger import get_logger
+
+logger = get_logger("gcz-promo-schema")
+
+_PROMO_COLUMNS: Optional[frozenset] = None
+
+CODE_REGEX = re.compile(r"\b[A-Z0-9]{4,20}\b")
+URL_REGEX = re.compile(r"https?://[^\s]+", re.IGNORECASE)
+
+# Query params that only track the click and never change the offer
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "si"})
+
+
+def extract_code(text: str) -> str:
+    match = CODE_REGEX.search(text or "")
+    return match.group(0) if match else ""
+
+
+def extract_url(text: str) -> str:
+    match = URL_REGEX.search(text or "")
+    if not match:
+        return ""
+    return match.group(0).rstrip(".,;!?")
+
+
+def canonical_url(url: str) -> str:
+    """Lowercase scheme/host, drop www./fragment/tracking params, sort the query."""
+    try:
+        parts = urlsplit(url.rstrip(".,;!?"))
+    except ValueError:
+        return url.lower()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def promo_fingerprint(text: str) -> str:
+    """
+    Normalized form used for duplicate detection: extracted code, then the
+    lowercased, whitespace-collapsed text with every URL canonicalized.
+    Reposts that differ only in case, spacing or tracking params collide.
+    """
+    code = extract_code(text)
+    body = URL_REGEX.sub(lambda m: canonical_url(m.group(0)), text or "")
+    return f"{code}\n{' '.join(body.lower().split())}"
+
+
+async def load_promo_columns(db) -> frozenset:
+    """
+    Column names of public.promos, read once per process and shared by
+    drops intake and the live dashboard (the table has grown columns via
+    migrations, so both adapt their SQL to what exists).
+    """
+    global _PROMO_COLUMNS
+    if _PROMO_COLUMNS is not None:
+        return _PROMO_COLUMNS
+    try:
+        rows = await db.fetch(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'promos'
+            """
+        )
+        _PROMO_COLUMNS = frozenset(row["column_name"] for row in rows)
+    except Exception as exc:
+        logger.warning("[PROMO] Failed to read promos columns: %s", exc)
+        _PROMO_COLUMNS = frozenset()
+    return _PROMO_COLUMNS
@@ -0,0 +1,167 @@
+from typing import Any, Dict, Optional
+
+from config import get_settings
+from services.cache import TTLCache
+from services.db import get_db
+from backend.logger import get_logger
+
+settings = get_settings()
+logger = get_logger("gcz-roles")
+
+# Canonical role hierarchy
+ROLE_LEVELS = {
+    "user": 0,
+    "mod": 1,
+    "manager": 2,
+    "admin": 3,
+    "super_admin": 4,
+}
+
+SUPER_ADMIN_ID = str(getattr(settings, "SUPER_ADMIN_ID", "")).strip()
+
+ROLE_TTL = 300            # users with a DB role
+ROLE_NEGATIVE_TTL = 60    # plain users (no telegramuserroles row)
+ROLE_CACHE_SIZE = 10000
+
+ROLE_SQL = """
+    SELECT tr.name AS role
+    FROM telegramuserroles tur
+    JOIN telegram_roles tr ON tr.id = tur.roleid
+    WHERE tur.telegram_id = $1
+    LIMIT 1
+"""
+
+SET_ROLE_SQL = """
+    INSERT INTO telegramuserroles (telegram_id, roleid)
+    SELECT $1, id FROM telegram_roles WHERE name = $2
+    ON CONFLICT (telegram_id) DO UPDATE SET roleid = EXCLUDED.roleid
+    RETURNING roleid
+"""
+
+CLEAR_ROLE_SQL = "DELETE FROM telegramuserroles WHERE telegram_id = $1"
+
+
+def normalize_role(role: Optional[str]) -> str:
+    if not role:
+        return "user"
+
+    role = role.lower().strip()
+
+    # Aliases
+    if role in ["mod", "moderator"]:
+        return "mod"
+
+    if role in ["manager", "mgr"]:
+        return "manager"
+
+    if role in ["admin", "administrator"]:
+        return "admin"
+
+    if role in ["superadmin", "super_admin", "owner", "root"]:
+        return "super_admin"
+
+    return "user"
+
+
+def role_level(role: Optional[str]) -> int:
+    return ROLE_LEVELS.get(normalize_role(role), 0)
+
+
+class RoleService:
+    """
+    Role lookups keyed by telegram_id, cached in-process.
+
+    Plain users are cached too (negative caching, shorter TTL) so bot
+    commands from ordinary members never hit the DB per message. Any code
+    that changes a role should go through set_role()/clear_role() or call
+    invalidate(). The cache is per process, so a change made elsewhere
+    (another worker, the bot, direct SQL) shows up within ROLE_TTL.
+
+    The role embedded in a token is informational only; authorization
+    always resolves it here, so a demotion is never outlived by a token.
+    """
+
+    def __init__(self, max_entries: int = ROLE_CACHE_SIZE):
+        self._cache = TTLCache(max_entries=max_entries)
+
+    # --------------------------------------------------
+    #  Lookups
+    # --------------------------------------------------
+    async def get_role(self, telegram_id) -> str:
+        tid = str(telegram_id).strip()
+        if SUPER_ADMIN_ID and tid == SUPER_ADMIN_ID:
+            return "super_admin"
+
+        cached = self._cache.get(tid)
+        if cached is not None:
+            self._cache.stats["hits"] += 1
+            return cached
+
+        self._cache.stats["misses"] += 1
+        try:
+            db = await get_db()
+            row = await db.fetchrow(ROLE_SQL, int(tid))
+        except Exception as e:
+            # Not cached: the next call retries the DB
+            logger.error(f"[ROLES] Failed to fetch role for {tid}: {e}")
+            return "user"
+
+        role = normalize_role(row["role"]) if row else "user"
+        self._cache.set(tid, role, ttl=ROLE_TTL if row else ROLE_NEGATIVE_TTL)
+        return role
+
+    async def get_level(self, telegram_id) -> int:
+        return ROLE_LEVELS[await self.get_role(telegram_id)]
+
+    # --------------------------------------------------
+    #  JWT claims
+    # --------------------------------------------------
+    def claims(self, telegram_id, role: str) -> Dict[str, Any]:
+        """Claims to embed in a session token for this user (display only)."""
+        return {"role": role}
+
+    async def role_from_claims(self, claims: Dict[str, Any]) -> str:
+        """The token subject's current role; the role claim itself is ignored."""
+        telegram_id = claims.get("telegram_id")
+        if telegram_id is None:
+            return "user"
+        return await self.get_role(telegram_id)
+
+    # --------------------------------------------------
+    #  Invalidation
+    # --------------------------------------------------
+    def invalidate(self, telegram_id=None) -> None:
+        """Drop one user's cached role, or everyone's."""
+        if telegram_id is None:
+            self._cache.invalidate()
+            logger.info("[ROLES] Invalidated all cached roles")
+            return
+
+        tid = str(telegram_id).strip()
+        self._cache.delete(tid)
+        logger.info(f"[ROLES] Invalidated cached role for {tid}")
+
+    async def set_role(self, telegram_id, role: str) -> str:
+        """Assign a DB role (by telegram_roles.name) and invalidate."""
+        db = await get_db()
+        roleid = await db.fetchval(SET_ROLE_SQL, int(telegram_id), role)
+        if roleid is None:
+            raise ValueError(f"Unknown role: {role}")
+        self.invalidate(telegram_id)
+        return normalize_role(role)
+
+    async def clear_role(self, telegram_id) -> None:
+        """Demote to plain user and invalidate."""
+        db = await get_db()
+        await db.execute(CLEAR_ROLE_SQL, int(telegram_id))
+        self.invalidate(telegram_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._cache.snapshot()
+
+
+ROLE_SERVICE = RoleService()
+
+
+def get_role_service() -> RoleService:
+    return ROLE_SERVICE
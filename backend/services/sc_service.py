@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from typing import Tuple, Dict, Optional
 
 from services.db import get_db
@@ -8,8 +9,25 @@ from utils.sc import (
     calculate_drop_reward,
     can_enter_raffle,
     raffle_entry_cost,
+    RAFFLE_DAILY_LIMIT,
 )
 
+
+# ============================================================
+#  CONNECTION HELPERS
+# ============================================================
+
+@asynccontextmanager
+async def sc_transaction():
+    """
+    Borrow one pooled connection and run a single transaction on it.
+    The pool itself is shared and must never be closed here.
+    """
+    pool = await get_db()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            yield conn
+
 # ============================================================
 #  RUNEWAGER TIP LOGIC (DECIDE + LOG, MANUAL TIP OFFSITE)
 # ============================================================
@@ -26,44 +44,36 @@ async def get_runewager_activity(telegram_id: int) -> Tuple[float, int, bool]:
     Returns:
       (total_usd_purchases, wager_7d_sc, already_tipped)
     """
-    db = await get_db()
+    pool = await get_db()
 
-    # total purchases (lifetime)
-    purchases_row = await db.fetchrow(
+    row = await pool.fetchrow(
         """
-        SELECT COALESCE(SUM(usd_amount), 0) AS total_usd
-        FROM runewager_purchases
-        WHERE telegram_id = $1
+        WITH purchases AS (
+            SELECT COALESCE(SUM(usd_amount), 0) AS total_usd
+            FROM runewager_purchases
+            WHERE telegram_id = $1
+        ),
+        wagers AS (
+            SELECT COALESCE(SUM(sc_amount), 0) AS total_sc
+            FROM runewager_wagers
+            WHERE telegram_id = $1
+              AND created_at >= (NOW() - INTERVAL '7 days')
+        )
+        SELECT
+            purchases.total_usd,
+            wagers.total_sc,
+            EXISTS (
+                SELECT 1 FROM runewager_tips WHERE telegram_id = $1
+            ) AS already_tipped
+        FROM purchases, wagers
         """,
         telegram_id,
     )
-    total_usd = float(purchases_row["total_usd"]) if purchases_row else 0.0
 
-    # wagers in last 7 days
-    wagers_row = await db.fetchrow(
-        """
-        SELECT COALESCE(SUM(sc_amount), 0) AS total_sc
-        FROM runewager_wagers
-        WHERE telegram_id = $1
-          AND created_at >= (NOW() - INTERVAL '7 days')
-        """,
-        telegram_id,
-    )
-    wager_7d_sc = int(wagers_row["total_sc"]) if wagers_row else 0
+    total_usd = float(row["total_usd"]) if row else 0.0
+    wager_7d_sc = int(row["total_sc"]) if row else 0
+    already_tipped = bool(row["already_tipped"]) if row else False
 
-    # already tipped?
-    tipped_row = await db.fetchrow(
-        """
-        SELECT 1
-        FROM runewager_tips
-        WHERE telegram_id = $1
-        LIMIT 1
-        """,
-        telegram_id,
-    )
-    already_tipped = tipped_row is not None
-
-    await db.close()
     return total_usd, wager_7d_sc, already_tipped
 
 
@@ -110,19 +120,17 @@ async def log_runewager_tip_granted(telegram_id: int, sc_amount: int, admin_id:
     Just logs in GCZ DB to prevent double dips.
     """
     validate_sc(sc_amount)
-    db = await get_db()
 
-    await db.execute(
-        """
-        INSERT INTO runewager_tips (telegram_id, sc_amount, granted_by, created_at)
-        VALUES ($1, $2, $3, NOW())
-        """,
-        telegram_id,
-        sc_amount,
-        admin_id,
-    )
-
-    await db.close()
+    async with sc_transaction() as conn:
+        await conn.execute(
+            """
+            INSERT INTO runewager_tips (telegram_id, sc_amount, granted_by, created_at)
+            VALUES ($1, $2, $3, NOW())
+            """,
+            telegram_id,
+            sc_amount,
+            admin_id,
+        )
 
 
 # ============================================================
@@ -146,20 +154,19 @@ async def create_drop_log(
     validate_sc(base_sc)
     final_sc = calculate_drop_reward(site, base_sc)
 
-    db = await get_db()
-    await db.execute(
-        """
-        INSERT INTO drops (telegram_id, site, base_sc, final_sc, reason, admin_id, created_at)
-        VALUES ($1, $2, $3, $4, $5, $6, NOW())
-        """,
-        telegram_id,
-        site,
-        base_sc,
-        final_sc,
-        drop_reason,
-        admin_id,
-    )
-    await db.close()
+    async with sc_transaction() as conn:
+        await conn.execute(
+            """
+            INSERT INTO drops (telegram_id, site, base_sc, final_sc, reason, admin_id, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, NOW())
+            """,
+            telegram_id,
+            site,
+            base_sc,
+            final_sc,
+            drop_reason,
+            admin_id,
+        )
 
     return {
         "telegram_id": telegram_id,
@@ -179,8 +186,8 @@ async def get_sc_balance(telegram_id: int) -> int:
     Reads internal SC balance from GCZ DB.
     Assumes table: user_balances(telegram_id, sc_balance)
     """
-    db = await get_db()
-    row = await db.fetchrow(
+    pool = await get_db()
+    row = await pool.fetchrow(
         """
         SELECT sc_balance
         FROM user_balances
@@ -188,7 +195,6 @@ async def get_sc_balance(telegram_id: int) -> int:
         """,
         telegram_id,
     )
-    await db.close()
 
     if not row:
         return 0
@@ -200,17 +206,17 @@ async def set_sc_balance(telegram_id: int, new_balance: int) -> None:
     Upserts internal SC balance.
     """
     validate_sc(new_balance)
-    db = await get_db()
-    await db.execute(
-        """
-        INSERT INTO user_balances (telegram_id, sc_balance)
-        VALUES ($1, $2)
-        ON CONFLICT (telegram_id) DO UPDATE SET sc_balance = EXCLUDED.sc_balance
-        """,
-        telegram_id,
-        new_balance,
-    )
-    await db.close()
+
+    async with sc_transaction() as conn:
+        await conn.execute(
+            """
+            INSERT INTO user_balances (telegram_id, sc_balance)
+            VALUES ($1, $2)
+            ON CONFLICT (telegram_id) DO UPDATE SET sc_balance = EXCLUDED.sc_balance
+            """,
+            telegram_id,
+            new_balance,
+        )
 
 
 async def get_daily_raffle_entries(telegram_id: int) -> int:
@@ -218,82 +224,102 @@ async def get_daily_raffle_entries(telegram_id: int) -> int:
     Counts how many raffle entries user made today.
     Assumes table: raffle_entries(telegram_id, created_at)
     """
-    db = await get_db()
-    row = await db.fetchrow(
+    pool = await get_db()
+    row = await pool.fetchrow(
         """
         SELECT COUNT(*) AS cnt
         FROM raffle_entries
         WHERE telegram_id = $1
-          AND DATE(created_at) = CURRENT_DATE
+          AND created_at >= CURRENT_DATE
+          AND created_at < CURRENT_DATE + 1
         """,
         telegram_id,
     )
-    await db.close()
     return int(row["cnt"]) if row else 0
 
 
+# Serializes a user's raffle entries: taken first in the transaction, so
+# ENTER_RAFFLE_SQL (a new statement, hence a new snapshot under READ
+# COMMITTED) counts every entry committed by a concurrent request.
+LOCK_BALANCE_SQL = """
+    SELECT 1 FROM user_balances WHERE telegram_id = $1 FOR UPDATE
+"""
+
+# Check + debit + log in one statement, run under LOCK_BALANCE_SQL. The
+# balance condition is also in the UPDATE's WHERE, so the balance can
+# never be overdrawn; the daily count is only exact because of the lock.
+# Nothing is written unless the debit succeeds.
+ENTER_RAFFLE_SQL = """
+    WITH balance AS (
+        SELECT sc_balance
+        FROM user_balances
+        WHERE telegram_id = $1
+    ),
+    today AS (
+        SELECT COUNT(*) AS cnt
+        FROM raffle_entries
+        WHERE telegram_id = $1
+          AND created_at >= CURRENT_DATE
+          AND created_at < CURRENT_DATE + 1
+    ),
+    debit AS (
+        UPDATE user_balances
+        SET sc_balance = sc_balance - $2
+        WHERE telegram_id = $1
+          AND sc_balance >= $2
+          AND (SELECT cnt FROM today) < $3
+        RETURNING sc_balance
+    ),
+    entry AS (
+        INSERT INTO raffle_entries (telegram_id, created_at)
+        SELECT $1, NOW() FROM debit
+    ),
+    balance_log AS (
+        INSERT INTO balance_logs (telegram_id, change_sc, reason, created_at)
+        SELECT $1, -$2::int, 'raffle_entry', NOW() FROM debit
+    )
+    SELECT
+        (SELECT sc_balance FROM balance) AS balance_before,
+        (SELECT cnt FROM today) AS entries_today,
+        (SELECT sc_balance FROM debit) AS balance_after
+"""
+
+
 async def enter_raffle(telegram_id: int) -> Dict:
     """
-    Full raffle entry flow:
+    Full raffle entry flow, in one transaction serialized per user:
       - Check internal SC balance
       - Check daily limit
       - Deduct SC
       - Log raffle entry + balance log
     Completely internal to GCZ.
     """
-    balance = await get_sc_balance(telegram_id)
-    entries_today = await get_daily_raffle_entries(telegram_id)
+    cost = raffle_entry_cost()
+
+    async with sc_transaction() as conn:
+        # No balance row means no debit below, so there is nothing to race
+        await conn.execute(LOCK_BALANCE_SQL, telegram_id)
+        row = await conn.fetchrow(ENTER_RAFFLE_SQL, telegram_id, cost, RAFFLE_DAILY_LIMIT)
+
+    entries_today = int(row["entries_today"] or 0)
 
-    eligible, reason = can_enter_raffle(balance, entries_today)
-    if not eligible:
+    if row["balance_after"] is None:
+        balance = int(row["balance_before"] or 0)
+        eligible, reason = can_enter_raffle(balance, entries_today)
         return {
             "success": False,
-            "reason": reason,
+            # Eligible here means a concurrent entry spent the balance first
+            "reason": reason if not eligible else "Not enough SC for raffle entry",
             "balance": balance,
             "entries_today": entries_today,
         }
 
-    cost = raffle_entry_cost()
-    new_balance = balance - cost
-
-    db = await get_db()
-
-    # raffle entry log
-    await db.execute(
-        """
-        INSERT INTO raffle_entries (telegram_id, created_at)
-        VALUES ($1, NOW())
-        """,
-        telegram_id,
-    )
-
-    # balance log
-    await db.execute(
-        """
-        INSERT INTO balance_logs (telegram_id, change_sc, reason, created_at)
-        VALUES ($1, -$2, 'raffle_entry', NOW())
-        """,
-        telegram_id,
-        cost,
-    )
-
-    # update balance
-    await db.execute(
-        """
-        INSERT INTO user_balances (telegram_id, sc_balance)
-        VALUES ($1, $2)
-        ON CONFLICT (telegram_id) DO UPDATE SET sc_balance = $2
-        """,
-        telegram_id,
-        new_balance,
-    )
-
-    await db.close()
+    new_balance = int(row["balance_after"])
 
     return {
         "success": True,
-        "balance_before": balance,
+        "balance_before": new_balance + cost,
         "balance_after": new_balance,
         "entries_today": entries_today + 1,
         "cost_sc": cost,
-    }
\ No newline at end of file
+    }
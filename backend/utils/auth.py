@@ -7,6 +7,7 @@ Supports:
 - SUPER_ADMIN_ID from .env
 - Multiple admin IDs (optional)
 - DB-backed role system via telegram_roles + telegramuserroles
+  (cached in services/roles.py)
 - Clean HTTPException handling
 - Logging for denied access
 """
@@ -14,7 +15,7 @@ Supports:
 from fastapi import HTTPException
 from config import get_settings
 from backend.logger import get_logger
-from services.db import get_db
+from services.roles import ROLE_LEVELS, ROLE_SERVICE
 
 settings = get_settings()
 logger = get_logger("permissions")
@@ -29,15 +30,6 @@ ADMIN_IDS = set(
     if x.strip()
 )
 
-# Canonical role hierarchy
-ROLE_LEVELS = {
-    "user": 0,
-    "mod": 1,
-    "manager": 2,
-    "admin": 3,
-    "super_admin": 4,
-}
-
 
 # ============================================================
 #  DB ROLE FETCHER
@@ -45,26 +37,10 @@ ROLE_LEVELS = {
 
 async def fetch_user_role(telegram_id: int) -> str:
     """
-    Fetches the user's role from the DB via telegram_roles table.
+    Returns the user's normalized role via the cached role service.
     Falls back to 'user' if not found.
     """
-    try:
-        db = await get_db()
-        row = await db.fetchrow(
-            """
-            SELECT tr.name AS role
-            FROM telegramuserroles tur
-            JOIN telegram_roles tr ON tr.id = tur.roleid
-            WHERE tur.telegram_id = $1
-            LIMIT 1
-            """,
-            int(telegram_id),
-        )
-        return row["role"] if row else "user"
-
-    except Exception as e:
-        logger.error(f"[PERMISSIONS] Failed to fetch role for {telegram_id}: {e}")
-        return "user"
+    return await ROLE_SERVICE.get_role(telegram_id)
 
 
 # ============================================================
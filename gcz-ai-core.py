@@ -19,7 +19,6 @@ from ai.ai_logger import get_logger
 from ai.config.loader import build_settings
 from ai.db import DB
 from ai.health_engine import run_health_scan
-from ai.memory_monitor import HealthMonitor
 
 logger = get_logger("gcz-ai.core")
 
@@ -171,9 +170,9 @@ async def main():
 
     await DB.init()
 
-    monitor = HealthMonitor()
-    await monitor.start()
-
+    # Periodic health scans run as the health_scan schedule in gcz-ai
+    # (ai/workflows/schedules.py); the scan in run_cycle only drives PM2
+    # recovery.
     logger.info("AI Core GOD MODE started", extra={"env": settings.environment})
 
     try:
@@ -184,7 +183,6 @@ async def main():
                 logger.exception("Unhandled AI Core error", extra={"error": str(e)})
             await asyncio.sleep(CYCLE_INTERVAL)
     finally:
-        await monitor.stop()
         await DB.close()
 
 # ============================================================
@@ -0,0 +1,16 @@
+-- ==========================================================
+-- Migration: Affiliate Import Fingerprints
+-- Date: 2026-10-18
+-- Purpose: Let import_affiliates_csv.py skip unchanged rows and
+--          bulk-upsert the rest with a single ON CONFLICT (name)
+-- ==========================================================
+
+-- Hash of the normalized CSV row last written for this affiliate
+ALTER TABLE affiliates_master
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- ON CONFLICT (name) needs a unique arbiter index
+CREATE UNIQUE INDEX IF NOT EXISTS idx_affiliates_master_name
+  ON affiliates_master(name);
+
+COMMENT ON COLUMN affiliates_master.content_hash IS 'sha1 of the normalized import row; unchanged rows are skipped on re-import';
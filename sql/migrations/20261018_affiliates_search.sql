@@ -0,0 +1,28 @@
+-- ==========================================================
+-- Migration: Affiliate Search Indexes
+-- Date: 2026-10-18
+-- Purpose: Back /api/affiliates/search/query with full-text and
+--          trigram indexes instead of LIKE '%q%' scans
+-- ==========================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Weighted document: name/slug (A), category/domain (B), description (C)
+ALTER TABLE affiliates_master
+  ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(slug, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(replace(category, ',', ' '), '') || ' ' || coalesce(resolved_domain, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_search
+  ON affiliates_master USING gin(search_vector);
+
+-- Typo tolerance on the fields people actually type
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_name_trgm
+  ON affiliates_master USING gin(lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_slug_trgm
+  ON affiliates_master USING gin(slug gin_trgm_ops);
+
+COMMENT ON COLUMN affiliates_master.search_vector IS 'Weighted tsvector for affiliate search (generated)';
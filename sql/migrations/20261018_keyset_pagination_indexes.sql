@@ -0,0 +1,19 @@
+-- ==========================================================
+-- Migration: Keyset Pagination Indexes
+-- Date: 2026-10-18
+-- Purpose: Serve the paged list endpoints (services/pagination.py)
+--          from an index in keyset order
+-- ==========================================================
+
+-- /api/affiliates, /api/affiliates/category/{category}
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_priority_name
+  ON affiliates_master ((COALESCE(priority, 0)) DESC, name ASC);
+
+-- /api/admin/users
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id
+  ON users (created_at DESC, id DESC);
+
+-- /api/promos/raw
+CREATE INDEX IF NOT EXISTS idx_promos_active_created_at_id
+  ON promos (created_at DESC, id DESC)
+  WHERE active = TRUE;
@@ -0,0 +1,33 @@
+-- ==========================================================
+-- Migration: Backfill Promo Codes and URLs
+-- Date: 2026-10-18
+-- Purpose: drops_intake.py now extracts bonus_code / promo_url at
+--          intake time and live_dashboard.py reads them directly;
+--          fill them in for promos stored before that change
+-- ==========================================================
+
+-- Same text precedence as the dashboard: description, content,
+-- raw_text, clean_text (empty strings skipped)
+
+-- Codes: first run of 4-20 uppercase letters/digits (CODE_REGEX)
+UPDATE promos
+SET bonus_code = substring(
+      COALESCE(NULLIF(description, ''), NULLIF(content, ''), NULLIF(raw_text, ''), NULLIF(clean_text, ''))
+      FROM '\y([A-Z0-9]{4,20})\y'
+    )
+WHERE channel IN ('codes', 'code')
+  AND COALESCE(bonus_code, '') = ''
+  AND COALESCE(code, '') = '';
+
+-- Links: first http(s) URL, trailing punctuation trimmed (URL_REGEX)
+UPDATE promos
+SET promo_url = rtrim(
+      substring(
+        COALESCE(NULLIF(description, ''), NULLIF(content, ''), NULLIF(raw_text, ''), NULLIF(clean_text, ''))
+        FROM '(?i)(https?://[^\s]+)'
+      ),
+      '.,;!?'
+    )
+WHERE channel IN ('links', 'link', 'url')
+  AND COALESCE(promo_url, '') = ''
+  AND COALESCE(url, '') = '';
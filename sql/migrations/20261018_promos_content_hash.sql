@@ -0,0 +1,18 @@
+-- ==========================================================
+-- Migration: Promo Intake Fingerprints
+-- Date: 2026-10-18
+-- Purpose: Index-backed duplicate detection for drops_intake.py
+--          (replaces the raw_text equality scan)
+-- ==========================================================
+
+-- sha1 of the normalized promo text (code, lowercased text, canonical
+-- URLs) suffixed with the PROMO_DEDUPE_DAYS window number
+ALTER TABLE promos
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- One promo per fingerprint per window; also the ON CONFLICT arbiter
+CREATE UNIQUE INDEX IF NOT EXISTS idx_promos_content_hash
+  ON promos(content_hash)
+  WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN promos.content_hash IS 'Intake dedupe fingerprint (<sha1>:<window>); NULL for promos stored before fingerprinting';
@@ -3,6 +3,9 @@
 -- Single source of truth for a fresh Neon Postgres database.
 -- ==========================================================
 
+-- Trigram indexes (affiliate search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================
 -- 1. CORE USERS + SETTINGS
 -- ============================
@@ -213,10 +216,21 @@ CREATE TABLE IF NOT EXISTS affiliates_master (
   sort_order INTEGER DEFAULT 0,
   created_by TEXT,
   source TEXT,
+  content_hash TEXT,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  -- Weighted document: name/slug (A), category/domain (B), description (C)
+  search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(slug, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(replace(category, ',', ' '), '') || ' ' || coalesce(resolved_domain, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+  ) STORED
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_affiliates_master_name ON affiliates_master(name);
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_search ON affiliates_master USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_name_trgm ON affiliates_master USING gin(lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_affiliates_master_slug_trgm ON affiliates_master USING gin(slug gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_affiliates_master_slug ON affiliates_master(slug);
 CREATE INDEX IF NOT EXISTS idx_affiliates_master_category ON affiliates_master(category);
 CREATE INDEX IF NOT EXISTS idx_affiliates_master_status ON affiliates_master(status);
@@ -411,13 +425,15 @@ CREATE TABLE IF NOT EXISTS promos (
   created_by_admin_id INTEGER REFERENCES admin_users(id) ON DELETE SET NULL,
   created_by_telegram_id BIGINT,
   created_by_discord_id TEXT,
-  site_user_id BIGINT
+  site_user_id BIGINT,
+  content_hash TEXT
 );
 
 CREATE INDEX IF NOT EXISTS idx_promos_status ON promos(status);
 CREATE INDEX IF NOT EXISTS idx_promos_channel ON promos(channel);
 CREATE INDEX IF NOT EXISTS idx_promos_created_at ON promos(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_promos_affiliate_id ON promos(affiliate_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_promos_content_hash ON promos(content_hash) WHERE content_hash IS NOT NULL;
 
 CREATE TABLE IF NOT EXISTS promo_decisions (
   id SERIAL PRIMARY KEY,